@@ -1,12 +1,24 @@
+from src.core.startup_profile import startup_profile
+from src.core.config import settings
+
+# Time every import below so slow modules show up in the startup report
+if settings.STARTUP_PROFILE:
+    startup_profile.install()
+
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import shutil
+import threading
 from pathlib import Path
 from src.services.rag_service import RAGService
+from src.services.ingestion_service import IngestionService
+from src.services.provider_swap_service import ProviderSwapService
 
 from src.api.v1.router import router as api_router
 from src.db.mongodb import MongoDB , get_database
+from src.stores.model_registry import model_registry
+from src.core.pdf_service import shutdown_extraction_pool
 
 # Initialize FastAPI
 app = FastAPI(
@@ -22,6 +34,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor of the PDF list endpoints, read by the browser frontend
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API routes
@@ -31,22 +45,85 @@ app.include_router(api_router)
 UPLOAD_DIR = Path("temp_uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-from src.core.config import settings
-
 # ==================== STARTUP/SHUTDOWN ====================
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database connection on startup"""
-    global rag_service 
-    mongodb = MongoDB()
-    settings.rag_service = RAGService(db=mongodb.db)
-    # rag_service =   
+    with startup_profile.phase("mongodb"):
+        mongodb = MongoDB()
     print(f"✅ Connected to MongoDB: {mongodb.db.name}")
 
+    settings.ingestion_service = IngestionService(db=mongodb.db)
+    settings.provider_swap_service = ProviderSwapService(db=mongodb.db)
+
+    settings.warmup = {"status": "warming_up", "attempts": 0, "error": None}
+    if settings.STARTUP_WARMUP == "blocking":
+        # A failure here fails startup
+        with startup_profile.phase("rag_service"):
+            settings.rag_service = RAGService(db=mongodb.db)
+        _on_rag_service_ready()
+    else:
+        _start_warmup()
+    startup_profile.mark("app_ready")
+
+
+_warmup_retry = None
+
+
+def _start_warmup(attempt: int = 1):
+    # The default providers are loaded and checked like a provider swap;
+    # chat/query answer 503 and ingestion jobs wait until it is live
+    settings.warmup.update(status="warming_up", attempts=attempt)
+    job = settings.provider_swap_service.submit({
+        "llm_provider": settings.LLM_PROVIDER,
+        "embedding_provider": settings.EMBEDDING_PROVIDER,
+        "vectordb_provider": settings.VECTORDB_PROVIDER
+    }, on_swapped=lambda providers: _on_rag_service_ready(),
+       on_failed=lambda error: _on_warmup_failed(attempt, error))
+    print(f"⏳ Warming up RAG service in the background ({job['swap_id']}, attempt {attempt})")
+
+
+def _on_warmup_failed(attempt: int, error: str):
+    global _warmup_retry
+    if attempt >= settings.STARTUP_WARMUP_ATTEMPTS:
+        settings.warmup.update(status="failed", error=error)
+        print(f"❌ RAG service warm-up failed after {attempt} attempts: {error}")
+        return
+    settings.warmup.update(status="retrying", error=error)
+    print(f"⚠️ RAG service warm-up failed, retrying in {settings.STARTUP_WARMUP_RETRY_SECONDS} s")
+    _warmup_retry = threading.Timer(settings.STARTUP_WARMUP_RETRY_SECONDS, _start_warmup, args=(attempt + 1,))
+    _warmup_retry.daemon = True
+    _warmup_retry.start()
+
+
+def _on_rag_service_ready():
+    settings.warmup.update(status="ready", error=None)
+    startup_profile.mark("rag_service_ready")
+    resumed = settings.ingestion_service.recover()
+    print(f"✅ Ingestion workers started ({resumed} pending jobs resumed)")
+    startup_profile.uninstall()
+    if settings.STARTUP_PROFILE:
+        startup_profile.log()
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    if _warmup_retry:
+        _warmup_retry.cancel()
+    # Stop ingestion workers; unfinished jobs resume on next startup
+    if settings.ingestion_service:
+        settings.ingestion_service.shutdown()
+    if settings.provider_swap_service:
+        settings.provider_swap_service.shutdown()
+    if settings.rag_service:
+        settings.rag_service.close()
+        # Closes the stores nothing borrows any more (e.g. final HNSW snapshot)
+        model_registry.unload_unused()
+    if settings.prediction_service:
+        settings.prediction_service.close()
+    shutdown_extraction_pool()
+
     # Cleanup temp files
     if UPLOAD_DIR.exists():
         shutil.rmtree(UPLOAD_DIR)
@@ -60,12 +137,24 @@ async def shutdown_event():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy", 
-        "message": "RAG System is running",
-        "version": "2.0.0"
+    """Health check endpoint; 503 once the RAG service warm-up has given up"""
+    warmup = settings.warmup or {}
+    if settings.rag_service:
+        state = "ready"
+    else:
+        state = warmup.get("status", "warming_up")
+    health = {
+        "status": "unhealthy" if state == "failed" else "healthy",
+        "message": "RAG service failed to start" if state == "failed" else "RAG System is running",
+        "version": "2.0.0",
+        "rag_service": state
     }
+    if state != "ready" and warmup.get("error"):
+        health["warmup_error"] = warmup["error"]
+        health["warmup_attempts"] = warmup.get("attempts")
+    if state == "failed":
+        return JSONResponse(status_code=503, content=health)
+    return health
 
 @app.get("/")
 async def root():
@@ -0,0 +1,21 @@
+"""
+Add PDFs ingested before hybrid retrieval existed to the BM25 lexical index.
+
+Chunk texts are read back from the chunk store through each PDF's manifest,
+so nothing is re-extracted or re-embedded. PDFs already in the index are
+skipped, so the script can be re-run safely.
+
+    python -m scripts.backfill_lexical_index
+"""
+from src.db.mongodb import MongoDB
+from src.services.rag_service import RAGService
+
+
+def main():
+    service = RAGService(db=MongoDB().db)
+    added = service.backfill_lexical_index()
+    print(f"✅ Added {added} chunks to the lexical index ({service.lexical_index.count()} total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Recall/latency benchmark of the HNSW vector store against exact search.
+
+Builds an HNSWDB and a NumpyDB over the same vectors and reports recall@k and
+mean query latency for several ef_search values.
+
+    python -m scripts.benchmark_ann_recall --n 20000 --dim 384 --ef 16 32 64 128
+    python -m scripts.benchmark_ann_recall --vectors embeddings.npy
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+from src.stores.vectordb.providers.hnsw_db import HNSWDB
+from src.stores.vectordb.providers.numpy_db import NumpyDB
+
+
+def clustered_vectors(n: int, dim: int, clusters: int, rng) -> np.ndarray:
+    """Gaussian blobs, closer to real embeddings than uniform noise"""
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=n)
+    return (centers[labels] + 0.3 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", help="optional .npy file of shape (n, dim) to index")
+    parser.add_argument("--n", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--M", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    data = np.load(args.vectors).astype(np.float32) if args.vectors \
+        else clustered_vectors(args.n, args.dim, args.clusters, rng)
+    queries = data[rng.choice(len(data), size=args.queries, replace=False)] \
+        + 0.05 * rng.normal(size=(args.queries, data.shape[1])).astype(np.float32)
+
+    ids = [f"doc_{i}" for i in range(len(data))]
+    texts = [""] * len(data)
+    metadata = [{"conversation_id": ""} for _ in range(len(data))]
+
+    with tempfile.TemporaryDirectory() as exact_dir, tempfile.TemporaryDirectory() as ann_dir:
+        exact = NumpyDB(exact_dir)
+        exact.add_documents(texts, data, metadata, ids)
+
+        ann = HNSWDB(ann_dir, M=args.M, ef_construction=args.ef_construction,
+                     snapshot_every=len(data) + 1, seed=args.seed)
+        start = time.perf_counter()
+        for i in range(0, len(data), 1000):
+            ann.add_documents(texts[i:i + 1000], data[i:i + 1000], metadata[i:i + 1000], ids[i:i + 1000])
+        build_time = time.perf_counter() - start
+        print(f"{len(data)} vectors, dim {data.shape[1]}: HNSW build {build_time:.1f}s "
+              f"({1000 * build_time / len(data):.2f} ms/insert)")
+
+        start = time.perf_counter()
+        truth = [{r["id"] for r in exact.search(q, args.k)} for q in queries]
+        exact_ms = 1000 * (time.perf_counter() - start) / len(queries)
+        print(f"exact search: {exact_ms:.2f} ms/query")
+
+        print(f"{'ef_search':>10} {'recall@' + str(args.k):>10} {'ms/query':>10}")
+        for ef in args.ef:
+            ann.set_ef_search(ef)
+            start = time.perf_counter()
+            found = [{r["id"] for r in ann.search(q, args.k)} for q in queries]
+            ann_ms = 1000 * (time.perf_counter() - start) / len(queries)
+            recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+            print(f"{ef:>10} {recall:>10.3f} {ann_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
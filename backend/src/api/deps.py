@@ -1,3 +1,4 @@
+import threading
 from src.repositories.conversations_repository import ConversationRepository
 from src.repositories.messages_repository import MessagesRepository
 from src.repositories.pdf_repository import PDFRepository
@@ -5,6 +6,10 @@ from src.services.conversation_service import ConversationService
 from src.services.prediction_service import PredictionService
 from src.services.pdf_service import PdfService
 from src.services.auth import AuthService
+from src.services.ingestion_service import IngestionService
+from src.services.vector_gc_service import VectorGarbageCollector
+from src.services.provider_swap_service import ProviderSwapService
+from src.core.config import settings
 
 from src.db.connection import get_database
 
@@ -21,18 +26,45 @@ async def get_pdf_repository():
     db=get_database()
     return PDFRepository(db)
 
+def _current_indexes():
+    """Vector store, lexical index and answer cache of the active RAG service"""
+    if not settings.rag_service:
+        return None, None, None
+    service = settings.rag_service
+    return service.vectordb, service.lexical_index, service.answer_cache
+
 async def get_conversation_service():
     db=get_database()
-    return ConversationService(db)
+    return ConversationService(db, *_current_indexes())
 
-async def get_prediction_service():
-    db=get_database()
-    return PredictionService(db)
+_prediction_lock = threading.Lock()
+
+def get_prediction_service() -> PredictionService:
+    # One shared service, so the model is loaded once, on the first prediction request
+    if settings.prediction_service is None:
+        with _prediction_lock:
+            if settings.prediction_service is None:
+                settings.prediction_service = PredictionService(get_database())
+    return settings.prediction_service
 
 async def get_pdf_service():
     db=get_database()
-    return PdfService(db)
+    return PdfService(db, *_current_indexes())
 
 async def get_auth_service():
     db=get_database()
     return AuthService(db)
+
+
+async def get_ingestion_service() -> IngestionService:
+    return settings.ingestion_service
+
+
+async def get_provider_swap_service() -> ProviderSwapService:
+    return settings.provider_swap_service
+
+
+async def get_vector_gc_service():
+    db=get_database()
+    vectordb, lexical_index, _ = _current_indexes()
+    return VectorGarbageCollector(db, vectordb, lexical_index)
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException , Depends
-from src.schemas.config_schema import ProviderConfig, CurrentConfigResponse
+from fastapi.concurrency import run_in_threadpool
+from src.schemas.config_schema import ProviderConfig, CurrentConfigResponse, ProviderSwapResponse
 from src.core.config import settings
-from src.services.rag_service import RAGService
-from src.db.mongodb import get_database
+from src.services.provider_swap_service import ProviderSwapService
+from src.stores.model_registry import model_registry
+from src.api.deps import get_provider_swap_service
 from src.core.config import settings
 
 
@@ -29,54 +31,71 @@ async def get_current_config():
     )
 
 
-@router.post("/providers", response_model=dict)
+@router.post("/providers", response_model=ProviderSwapResponse, status_code=202)
 async def configure_providers(
     config: ProviderConfig,
-    db=Depends(get_database)):
+    swap_service: ProviderSwapService = Depends(get_provider_swap_service)):
     """
-    Reconfigure LLM, Embedding, and Vector DB providers.
+    Reconfigure LLM, Embedding, and Vector DB providers without downtime.
+    The new providers are loaded and checked in the background, then swapped
+    in for new requests; poll GET /providers/swaps/{swap_id} for progress.
     Note: This will affect all subsequent requests until server restart.
     """
-    try:
-        # Update global configuration
-        if config.llm_provider:
-            _current_config["llm_provider"] = config.llm_provider
-        if config.embedding_provider:
-            _current_config["embedding_provider"] = config.embedding_provider
-        if config.vectordb_provider:
-            _current_config["vectordb_provider"] = config.vectordb_provider
+    providers = {
+        "llm_provider": config.llm_provider or _current_config["llm_provider"],
+        "embedding_provider": config.embedding_provider or _current_config["embedding_provider"],
+        "vectordb_provider": config.vectordb_provider or _current_config["vectordb_provider"],
+    }
+    # The active configuration only changes once the new service is live
+    job = swap_service.submit(providers, on_swapped=_current_config.update)
+    return ProviderSwapResponse(**job)
+
 
-        print(_current_config)
-        settings.rag_service = RAGService(
-            llm_provider=_current_config["llm_provider"],
-            embedding_provider=_current_config["embedding_provider"],
-            vectordb_provider=_current_config["vectordb_provider"],
-            db=db
-        )
-        
-        
-        return {
-            "message": "Providers updated successfully",
-            "config": _current_config,
-            "note": "Configuration will be applied to new requests. Existing connections remain unchanged."
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+@router.get("/providers/swaps/{swap_id}", response_model=ProviderSwapResponse)
+async def get_provider_swap(
+    swap_id: str,
+    swap_service: ProviderSwapService = Depends(get_provider_swap_service)):
+    """Status of a provider swap job"""
+    job = swap_service.get_job(swap_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Swap job not found")
+    return ProviderSwapResponse(**job)
 
-@router.post("/providers/reset")
-async def reset_providers():
-    """Reset providers to default configuration from environment"""
-    global _current_config
-    _current_config = {
+@router.post("/providers/reset", response_model=ProviderSwapResponse, status_code=202)
+async def reset_providers(
+    swap_service: ProviderSwapService = Depends(get_provider_swap_service)):
+    """
+    Reset providers to the default configuration from the environment. Runs
+    as a provider swap like POST /providers, so the reported configuration
+    only changes once the default providers are serving requests.
+    """
+    providers = {
         "llm_provider": settings.LLM_PROVIDER,
         "embedding_provider": settings.EMBEDDING_PROVIDER,
         "vectordb_provider": settings.VECTORDB_PROVIDER
     }
+    job = swap_service.submit(providers, on_swapped=_current_config.update)
+    return ProviderSwapResponse(**job)
+
+@router.get("/models")
+async def get_loaded_models():
+    """Providers loaded in the model registry, with the number of services using each"""
+    return {"models": model_registry.stats()}
+
+
+@router.post("/models/unload")
+async def unload_unused_models():
+    """Unload every registry model that no service is using"""
+    unloaded = await run_in_threadpool(model_registry.unload_unused)
     return {
-        "message": "Providers reset to default configuration",
-        "config": _current_config
+        "unloaded": [
+            {"kind": kind, "provider": provider, "model": model_name}
+            for kind, provider, model_name, _ in unloaded
+        ],
+        "models": model_registry.stats()
     }
 
+
 def get_current_providers():
     """Helper function to get current provider configuration"""
     return _current_config.copy()
\ No newline at end of file
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 
 from src.schemas.conversation_schema import ConversationResponse, ConversationCreate
@@ -70,11 +71,13 @@ async def get_conversation(conversation_id:str,db=Depends(get_database)):
     
 
 @router.delete('/{conversation_id}' )
-async def get_conversation(conversation_id:str,db=Depends(get_database)):
+async def delete_conversation(
+    conversation_id:str,
+    conversation_service: ConversationService = Depends(get_conversation_service)
+    ):
     """Delete a conversation and its associated data"""
     try:
-        service = ConversationService(db)
-        service.delete(conversation_id=conversation_id)
+        await run_in_threadpool(conversation_service.delete, conversation_id)
         return {"message": "Conversation deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,53 +1,53 @@
 from typing import List
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form , Depends , APIRouter
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form , Depends , APIRouter , Query , Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from src.schemas.pdf_schema import PDFUploadResponse , PDFInfo 
-from src.services.rag_service import RAGService
+from src.schemas.ingestion_job_schema import IngestionJobResponse
 from src.services.pdf_service import PdfService
+from src.services.ingestion_service import IngestionService
+from src.services.vector_gc_service import VectorGarbageCollector
 from typing import Optional 
-import shutil
-from pathlib import Path
 from src.db.mongodb import get_database
-from src.api.deps import get_pdf_service
+from src.api.deps import get_pdf_service , get_ingestion_service , get_vector_gc_service
 from src.core.config import settings
 
 router = APIRouter(prefix="/pdfs", tags=["pdfs"])
 
-# Temporary upload directory
-UPLOAD_DIR = Path("temp_uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+# Largest page accepted by the paginated listing endpoints
+MAX_PAGE_SIZE = 500
 
 
 @router.post("/upload", response_model=PDFUploadResponse)
 async def upload_pdf(
     file: UploadFile = File(...),
     conversation_id: Optional[str] = Form(None),
-    db=Depends(get_database)
+    ingestion_service: IngestionService = Depends(get_ingestion_service)
 ):
-    """Upload a PDF file (global or to specific conversation)"""
+    """
+    Upload a PDF file (global or to specific conversation) and queue it for processing.
+    Re-uploading a file already in the same scope returns its existing pdf_id
+    and a completed job. Otherwise pdf_id is tentative until the job completes:
+    read result.pdf_id of the job for the final id.
+    """
     try:
         # Validate file type
         if not file.filename.endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are allowed")
         
-        # Save temporarily
-        temp_path = UPLOAD_DIR / file.filename
-        with temp_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Process PDF
-        service = settings.rag_service
-        # service = RAGService(db)
-        pdf_id = service.upload_pdf(str(temp_path), conversation_id)
-        
-        print("helloooo")
-        # Cleanup
-        temp_path.unlink()
+        # Persist the upload and queue the ingestion job
+        job = await run_in_threadpool(
+            ingestion_service.submit, file.file, file.filename, conversation_id
+        )
         
         return PDFUploadResponse(
-            pdf_id=pdf_id,
+            pdf_id=job["pdf_id"],
             filename=file.filename,
             conversation_id=conversation_id,
-            message="PDF uploaded and processed successfully"
+            job_id=job["job_id"],
+            status=job["status"],
+            message="PDF already uploaded" if job["status"] == "completed"
+            else "PDF uploaded and queued for processing"
         )
     except HTTPException:
         raise
@@ -59,13 +59,10 @@ async def upload_pdf(
 async def upload_pdfs_batch(
     files: List[UploadFile] = File(...),
     conversation_id: Optional[str] = Form(None),
-    db = Depends(get_database)
+    ingestion_service: IngestionService = Depends(get_ingestion_service)
 ):
     """Upload multiple PDF files at once"""
     try:
-        service = settings.rag_service
-
-        # service = RAGService(db)
         results = []
         for file in files:
             if not file.filename.endswith('.pdf'):
@@ -77,17 +74,15 @@ async def upload_pdfs_batch(
                 continue
             
             try:
-                temp_path = UPLOAD_DIR / file.filename
-                with temp_path.open("wb") as buffer:
-                    shutil.copyfileobj(file.file, buffer)
-                
-                pdf_id = service.upload_pdf(str(temp_path), conversation_id)
-                temp_path.unlink()
+                job = await run_in_threadpool(
+                    ingestion_service.submit, file.file, file.filename, conversation_id
+                )
                 
                 results.append({
                     "filename": file.filename,
-                    "pdf_id": pdf_id,
-                    "status": "success"
+                    "pdf_id": job["pdf_id"],
+                    "job_id": job["job_id"],
+                    "status": job["status"]
                 })
             except Exception as e:
                 results.append({
@@ -101,15 +96,47 @@ async def upload_pdfs_batch(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/maintenance/vector-gc")
+async def collect_vector_garbage(
+    gc_service: VectorGarbageCollector = Depends(get_vector_gc_service)
+):
+    """Delete chunk vectors whose PDF no longer exists, compact the vector store and sweep unreferenced chunks"""
+    try:
+        return await run_in_threadpool(gc_service.run)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(
+    job_id: str,
+    ingestion_service: IngestionService = Depends(get_ingestion_service)
+):
+    """Get progress and result of a PDF ingestion job"""
+    try:
+        job = await run_in_threadpool(ingestion_service.get_job, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return IngestionJobResponse(**job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/conversation/{conversation_id}", response_model=List[PDFInfo])
 async def get_conversation_pdfs(conversation_id: str,
-                            # db = Depends(get_database),
+                            response: Response,
+                            limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                            after: Optional[str] = None,
                             pdf_service : PdfService = Depends(get_pdf_service)
                                 ):
-    """Get all PDFs for a specific conversation"""
+    """Get PDFs for a specific conversation (paginate with limit/after, next cursor in X-Next-Cursor)"""
     try:
-        # service = RAGService(db)
-        pdfs = pdf_service.get_conversation_pdfs(conversation_id)
+        pdfs = await run_in_threadpool(pdf_service.get_conversation_pdfs, conversation_id, limit, after)
+        next_cursor = pdf_service.next_cursor(pdfs, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return [
             PDFInfo(
                 pdf_id=pdf["pdf_id"],
@@ -119,19 +146,26 @@ async def get_conversation_pdfs(conversation_id: str,
             )
             for pdf in pdfs
         ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/global", response_model=List[PDFInfo])
 async def get_global_pdfs(
-    db=Depends(get_database),
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
     pdf_service : PdfService = Depends(get_pdf_service)
     ):
-    """Get all global PDFs (not associated with any conversation)"""
-    # try:
-
-        # service = settings.rag_service
-    pdfs = pdf_service.get_global_pdfs()
+    """Get global PDFs (not associated with any conversation)"""
+    try:
+        pdfs = await run_in_threadpool(pdf_service.get_global_pdfs, limit, after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = pdf_service.next_cursor(pdfs, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [
         PDFInfo(
             pdf_id=pdf["pdf_id"],
@@ -141,8 +175,6 @@ async def get_global_pdfs(
         )
         for pdf in pdfs
     ]
-    # except Exception as e:
-    #     raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{pdf_id}")
 async def get_pdf_info(
@@ -152,7 +184,7 @@ async def get_pdf_info(
     ):
     """Get information about a specific PDF"""
     try:
-        pdf = pdf_service.get_pdf(pdf_id)
+        pdf = await run_in_threadpool(pdf_service.get_pdf_info, pdf_id)
         if not pdf:
             raise HTTPException(status_code=404, detail="PDF not found")
         
@@ -167,6 +199,25 @@ async def get_pdf_info(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{pdf_id}/download")
+async def download_pdf(
+    pdf_id: str , 
+    pdf_service:PdfService=Depends(get_pdf_service),
+    ):
+    """Stream the original PDF file"""
+    pdf = await run_in_threadpool(pdf_service.get_pdf, pdf_id)
+    if not pdf:
+        raise HTTPException(status_code=404, detail="PDF not found")
+    
+    headers = {"Content-Disposition": f'attachment; filename="{pdf["filename"]}"'}
+    if pdf.get("size"):
+        headers["Content-Length"] = str(pdf["size"])
+    return StreamingResponse(
+        pdf_service.iter_pdf_content(pdf),
+        media_type="application/pdf",
+        headers=headers
+    )
+
 @router.delete("/{pdf_id}")
 async def delete_pdf(
     pdf_id: str , 
@@ -175,8 +226,7 @@ async def delete_pdf(
     ):
     """Delete a specific PDF"""
     try:
-        # service = RAGService(db)
-        pdf_service.delete_pdf(pdf_id)
+        await run_in_threadpool(pdf_service.delete_pdf, pdf_id)
         return {"message": "PDF deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
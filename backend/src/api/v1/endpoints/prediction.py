@@ -1,23 +1,43 @@
 from typing import List
-from fastapi import Depends , APIRouter
-from src.schemas.prediction_schema import PredictionInput , PredictionOutput
+from fastapi import Depends , APIRouter , HTTPException
+from src.schemas.prediction_schema import PredictionInput , PredictionOutput , PredictionBatchInput , PredictionBatchOutput
 from src.services.prediction_service import PredictionService
 from src.db.connection import get_database
 from src.api.deps import get_prediction_service
+from src.core.config import settings
 
 
 router = APIRouter(prefix="/predict", tags=["predict"])
 
 # ==================== ERROR HANDLERS ====================
 @router.post("/", response_model=PredictionOutput )
-def predict(
+async def predict(
     data: PredictionInput,
     prediction_service: PredictionService = Depends(get_prediction_service)
       ):
-    return prediction_service.predict(data)
+    # Concurrent requests are coalesced into one model call by the batcher
+    return await prediction_service.apredict(data)
+
+@router.post("/batch", response_model=PredictionBatchOutput)
+def predict_batch(
+    batch: PredictionBatchInput,
+    prediction_service: PredictionService = Depends(get_prediction_service)
+      ):
+    """Score many rows with one model call; predictions are returned in input order"""
+    if len(batch.items) > settings.PREDICTION_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.PREDICTION_BATCH_MAX_ROWS} rows per batch"
+        )
+    return PredictionBatchOutput(predictions=prediction_service.predict_many(batch.items))
+
+@router.get("/stats")
+def get_prediction_stats(
+        prediction_service: PredictionService = Depends(get_prediction_service)):
+    """Micro-batching metrics: queue depth, batch sizes, wait and predict times"""
+    return prediction_service.stats()
 
 @router.get("/predictions")
 def get_predictions(
         prediction_service: PredictionService = Depends(get_prediction_service)):
     return prediction_service.get_all_predictions()
-
@@ -1,5 +1,7 @@
+import json
 from typing import List
 from fastapi import HTTPException , Depends , APIRouter
+from fastapi.responses import StreamingResponse
 from src.schemas.chat_schema import ChatRequest , ChatResponse
 from src.schemas.query_schema import QueryRequest , QueryResponse
 from src.db.connection import get_database
@@ -7,42 +9,105 @@ from src.core.config import settings
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _rag_service():
+    """The active RAG service; 503 while it is still warming up or if the warm-up failed"""
+    service = settings.rag_service
+    if service is None:
+        warmup = settings.warmup or {}
+        if warmup.get("status") == "failed":
+            raise HTTPException(status_code=503, detail=f"RAG service failed to start: {warmup.get('error')}")
+        raise HTTPException(status_code=503, detail="RAG service is warming up")
+    return service
+
+
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest , db = Depends(get_database)):
+    service = _rag_service()
     try:
-        service = settings.rag_service
-        result = service.chat(
-            conversation_id=request.conversation_id,
-            message=request.message,
-            top_k=request.top_k,
-            history_limit=request.history_limit
-        )
+        with service.in_use():
+            result = await service.achat(
+                conversation_id=request.conversation_id,
+                message=request.message,
+                top_k=request.top_k,
+                history_limit=request.history_limit
+            )
         return ChatResponse(
             conversation_id=request.conversation_id,
             user_message_id=result["user_message_id"],
             assistant_message_id=result["assistant_message_id"],
-            answer=result["answer"]
+            answer=result["answer"],
+            prompt=result["prompt"],
+            debug=result["debug"]
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Chat with the answer streamed as Server-Sent Events (token events, then a done event)"""
+    service = _rag_service()
+
+    async def events():
+        try:
+            with service.in_use():
+                async for item in service.astream_chat(
+                    conversation_id=request.conversation_id,
+                    message=request.message,
+                    top_k=request.top_k,
+                    history_limit=request.history_limit
+                ):
+                    yield _sse(item["event"], item["data"])
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 # ==================== QUERY ENDPOINTS ====================
 
 @router.post("/query", response_model=QueryResponse)
 async def query_rag(request: QueryRequest , db=Depends(get_database)):
     """Query the RAG system (global or conversation-specific)"""
     # try:
-    service = settings.rag_service
-    answer = service.query(
-        question=request.question,
-        conversation_id=request.conversation_id,
-        top_k=request.top_k
-    )
+    service = _rag_service()
+    with service.in_use():
+        result = await service.aquery_with_usage(
+            question=request.question,
+            conversation_id=request.conversation_id,
+            top_k=request.top_k
+        )
     return QueryResponse(
-        answer=answer,
-        conversation_id=request.conversation_id
+        answer=result["answer"],
+        conversation_id=request.conversation_id,
+        prompt=result["prompt"]
     )
     # except Exception as e:
     #     raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.post("/query/stream")
+async def query_rag_stream(request: QueryRequest):
+    """Query the RAG system with the answer streamed as Server-Sent Events"""
+    service = _rag_service()
+
+    async def events():
+        try:
+            with service.in_use():
+                async for piece in service.astream_query(
+                    question=request.question,
+                    conversation_id=request.conversation_id,
+                    top_k=request.top_k
+                ):
+                    yield _sse("token", piece)
+            yield _sse("done", {"conversation_id": request.conversation_id})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
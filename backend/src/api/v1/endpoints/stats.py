@@ -1,14 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends
-from src.services.rag_service import RAGService
-from src.db.mongodb import get_database
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from src.core.config import settings
+from src.stores.model_registry import model_registry
+from src.core.startup_profile import startup_profile
 
 router = APIRouter(prefix="/stats", tags=["Statistics"])
 
 @router.get("")
-async def get_statistics(db=Depends(get_database)):
+async def get_statistics():
     """Get system statistics"""
+    service = settings.rag_service
+    if service is None:
+        raise HTTPException(status_code=503, detail="RAG service is not initialized")
     try:
-        service = RAGService(db)
-        return service.get_statistics()
+        statistics = await run_in_threadpool(service.get_statistics)
+        statistics["models"] = model_registry.stats()
+        return statistics
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/startup")
+async def get_startup_report(top: int = 20):
+    """Startup time broken down by imported package/module and startup phase"""
+    return startup_profile.report(top)
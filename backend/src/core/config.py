@@ -30,6 +30,99 @@ class Settings:
     CHUNK_SIZE = 1000
     CHUNK_OVERLAP = 200
 
+    # PDF text extraction
+    PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0"))  # 0 = one per CPU core
+    PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "25"))
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "50"))
+
+    # Gemini embedding requests
+    GEMINI_EMBED_BATCH_SIZE = int(os.getenv("GEMINI_EMBED_BATCH_SIZE", "100"))
+    GEMINI_EMBED_CONCURRENCY = int(os.getenv("GEMINI_EMBED_CONCURRENCY", "4"))
+
+    # Embedding cache (in-process LRU + on-disk SQLite tier)
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_MEMORY_SIZE = int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "10000"))
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache/embeddings.sqlite3")
+    EMBEDDING_CACHE_DISK_SIZE = int(os.getenv("EMBEDDING_CACHE_DISK_SIZE", "500000"))
+
+    # HNSW vector store (recall/latency knobs)
+    HNSW_M = int(os.getenv("HNSW_M", "16"))
+    HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+    HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+
+    # Retrieval: "dense" (vector store only) or "hybrid" (BM25 + dense, fused with RRF)
+    RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+    LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "./lexical_index")
+    HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))  # per ranker, before fusion
+    RRF_K = int(os.getenv("RRF_K", "60"))
+
+    # Optional cross-encoder rerank of over-fetched candidates
+    RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+    RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+    RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "10000"))
+    RERANK_BUDGET_MS = int(os.getenv("RERANK_BUDGET_MS", "300"))  # 0 = no budget
+
+    # Semantic answer cache of RAGService.query
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))  # cosine similarity
+    ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+    ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+
+    # Prompt token budget (history + context), answer tokens reserved on top
+    PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "6000"))
+    PROMPT_RESERVED_TOKENS = int(os.getenv("PROMPT_RESERVED_TOKENS", "512"))
+    PROMPT_CONTEXT_SHARE = float(os.getenv("PROMPT_CONTEXT_SHARE", "0.6"))  # when there is history
+
+    # Rolling conversation summaries: once more than KEEP_RECENT + FOLD_EVERY messages
+    # follow the summary, all but the latest KEEP_RECENT are folded into it
+    SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+    SUMMARY_KEEP_RECENT = int(os.getenv("SUMMARY_KEEP_RECENT", "6"))
+    SUMMARY_FOLD_EVERY = int(os.getenv("SUMMARY_FOLD_EVERY", "10"))
+    SUMMARY_MAX_WORDS = int(os.getenv("SUMMARY_MAX_WORDS", "250"))
+
+    # Longest wait for the next streamed piece from a local LLM, in seconds
+    LLM_STREAM_TIMEOUT = float(os.getenv("LLM_STREAM_TIMEOUT", "120"))
+
+    # Chunks embedded and upserted together during ingestion
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+    # Provider hot swap: how long a replaced service may drain, and whether the
+    # readiness check also generates with the new LLM
+    PROVIDER_SWAP_DRAIN_TIMEOUT = float(os.getenv("PROVIDER_SWAP_DRAIN_TIMEOUT", "300"))
+    PROVIDER_SWAP_CHECK_LLM = os.getenv("PROVIDER_SWAP_CHECK_LLM", "false").lower() == "true"
+
+    # Startup: "background" serves requests while the default providers load,
+    # "blocking" loads them before the app accepts requests
+    STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "background")
+    STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "true").lower() == "true"
+    # Background warm-up attempts before the service is reported as failed
+    STARTUP_WARMUP_ATTEMPTS = int(os.getenv("STARTUP_WARMUP_ATTEMPTS", "3"))
+    STARTUP_WARMUP_RETRY_SECONDS = float(os.getenv("STARTUP_WARMUP_RETRY_SECONDS", "30"))
+
+    # Chunk store garbage collection: unreferenced chunks unused for this long are deleted
+    CHUNK_GC_GRACE_HOURS = float(os.getenv("CHUNK_GC_GRACE_HOURS", "24"))
+
+    # Background PDF ingestion
+    INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+    INGESTION_UPLOAD_DIR = os.getenv("INGESTION_UPLOAD_DIR", "ingestion_uploads")
+    # A job interrupted this many times (e.g. a PDF that crashes the worker) is failed on restart
+    INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", "3"))
+    # Running jobs are leased to their process, which renews the lease every
+    # heartbeat; a job whose lease expired is recovered by the next startup
+    INGESTION_HEARTBEAT_SECONDS = float(os.getenv("INGESTION_HEARTBEAT_SECONDS", "30"))
+    INGESTION_LEASE_SECONDS = float(os.getenv("INGESTION_LEASE_SECONDS", "120"))
+
+    # Sleep disorder prediction (CatBoost)
+    PREDICTION_MODEL_PATH = os.getenv("PREDICTION_MODEL_PATH", "src/models/catBoost.keras")
+    PREDICTION_BATCH_MAX_ROWS = int(os.getenv("PREDICTION_BATCH_MAX_ROWS", "10000"))
+    # Concurrent single-row predictions are coalesced into batches
+    PREDICTION_BATCHING_ENABLED = os.getenv("PREDICTION_BATCHING_ENABLED", "true").lower() == "true"
+    PREDICTION_BATCH_MAX_SIZE = int(os.getenv("PREDICTION_BATCH_MAX_SIZE", "64"))
+    PREDICTION_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICTION_BATCH_MAX_WAIT_MS", "5"))
+    PREDICTION_QUEUE_MAX_SIZE = int(os.getenv("PREDICTION_QUEUE_MAX_SIZE", "10000"))
+
     # user security
     SECRET_KEY = os.getenv("SECRET_KEY", "ihebmbarek99360644")
     ALGORITHM = "HS256"
@@ -38,5 +131,17 @@ class Settings:
     # rag service
     rag_service = None
 
+    # ingestion service
+    ingestion_service = None
+
+    # prediction service (shared so the model is loaded once)
+    prediction_service = None
+
+    # provider hot swap
+    provider_swap_service = None
+
+    # startup warm-up: status (warming_up, retrying, ready, failed), attempts and last error
+    warmup = None
+
 settings = Settings()
 
@@ -1,24 +1,169 @@
+import os
 import PyPDF2
-from typing import List
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import threading
+import multiprocessing
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
 from src.core.config import settings
 
 # settings = Settings()
 
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    """Process pool shared by every extraction, created on first use"""
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            # The server is multithreaded (pymongo, torch, ingestion workers);
+            # forking it could copy a held lock into the children, so spawn them
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_EXTRACT_WORKERS or os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _extraction_pool
+
+
+def shutdown_extraction_pool():
+    """Stop the extraction worker processes (application shutdown)"""
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is not None:
+            _extraction_pool.shutdown(wait=True, cancel_futures=True)
+            _extraction_pool = None
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """Extract pages [start, end) of a PDF; runs inside a worker process"""
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [
+            (page_number + 1, pdf_reader.pages[page_number].extract_text() or "")
+            for page_number in range(start, end)
+        ]
+
+
 class PDFService:
     def __init__(self):
+        # langchain is slow to import; only load it once a service needs the splitter
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=settings.CHUNK_SIZE,
             chunk_overlap=settings.CHUNK_OVERLAP
         )
-    
-    def extract_text(self, pdf_path: str) -> str:
-        text = ""
+
+    def count_pages(self, pdf_path: str) -> int:
         with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-        return text
-    
+            return len(PyPDF2.PdfReader(file).pages)
+
+    def extract_pages(self, pdf_path: str) -> List[Tuple[int, str]]:
+        """
+        Extract text page by page, returning (page_number, text) pairs with
+        1-based page numbers. Large documents are split into page ranges that
+        are extracted in parallel by a process pool.
+        """
+        total_pages = self.count_pages(pdf_path)
+        if total_pages < settings.PDF_PARALLEL_MIN_PAGES:
+            return _extract_page_range(pdf_path, 0, total_pages)
+
+        step = settings.PDF_PAGES_PER_TASK
+        ranges = [(start, min(start + step, total_pages))
+                  for start in range(0, total_pages, step)]
+        pool = _get_extraction_pool()
+        futures = [pool.submit(_extract_page_range, pdf_path, start, end)
+                   for start, end in ranges]
+
+        pages = []
+        for future in futures:
+            pages.extend(future.result())
+        return pages
+
+    def iter_pages(self, pdf_path: str, total_pages: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_number, text) pairs in page order. Only a bounded window of
+        page ranges is in flight at once, so memory does not grow with the
+        size of the document.
+        """
+        if total_pages is None:
+            total_pages = self.count_pages(pdf_path)
+        if total_pages < settings.PDF_PARALLEL_MIN_PAGES:
+            for start in range(0, total_pages, settings.PDF_PAGES_PER_TASK):
+                end = min(start + settings.PDF_PAGES_PER_TASK, total_pages)
+                yield from _extract_page_range(pdf_path, start, end)
+            return
+
+        pool = _get_extraction_pool()
+        step = settings.PDF_PAGES_PER_TASK
+        window = 2 * (settings.PDF_EXTRACT_WORKERS or os.cpu_count() or 1)
+        pending = deque()
+        for start in range(0, total_pages, step):
+            pending.append(pool.submit(_extract_page_range, pdf_path, start,
+                                       min(start + step, total_pages)))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def iter_chunks(self, pages: Iterable[Tuple[int, str]]) -> Iterator[Tuple[str, int]]:
+        """
+        Incrementally split a stream of pages into (chunk, page_number) pairs,
+        where page_number is the page the chunk starts on. Text is buffered only
+        until a few chunks are ready; the tail is carried over so chunks keep
+        their overlap across page boundaries.
+        """
+        window = settings.CHUNK_SIZE * 4
+        buffer = ""
+        page_marks: List[Tuple[int, int]] = []  # (offset in buffer, page number)
+
+        def page_at(offset: int) -> int:
+            page_number = page_marks[0][1]
+            for mark_offset, mark_page in page_marks:
+                if mark_offset > offset:
+                    break
+                page_number = mark_page
+            return page_number
+
+        def locate(chunks: List[str]) -> List[int]:
+            offsets, cursor = [], 0
+            for chunk in chunks:
+                found = buffer.find(chunk, cursor)
+                offset = found if found >= 0 else cursor
+                offsets.append(offset)
+                cursor = offset + 1
+            return offsets
+
+        for page_number, text in pages:
+            page_marks.append((len(buffer), page_number))
+            buffer += text
+            if len(buffer) < window:
+                continue
+
+            chunks = self.split_text(buffer)
+            if len(chunks) < 2:
+                continue
+            offsets = locate(chunks)
+            for chunk, offset in zip(chunks[:-1], offsets[:-1]):
+                yield chunk, page_at(offset)
+
+            # Carry the last (possibly incomplete) chunk into the next round
+            cut = offsets[-1]
+            carried_page = page_at(cut)
+            buffer = buffer[cut:]
+            page_marks = [(0, carried_page)] + [
+                (mark_offset - cut, mark_page)
+                for mark_offset, mark_page in page_marks if mark_offset > cut
+            ]
+
+        if buffer.strip():
+            chunks = self.split_text(buffer)
+            for chunk, offset in zip(chunks, locate(chunks)):
+                yield chunk, page_at(offset)
+
+    def extract_text(self, pdf_path: str) -> str:
+        return "".join(text for _, text in self.extract_pages(pdf_path))
+
     def split_text(self, text: str) -> List[str]:
         return self.text_splitter.split_text(text)
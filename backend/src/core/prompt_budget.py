@@ -0,0 +1,89 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class PromptBudget:
+    """
+    Fits retrieved chunks and conversation history into a token budget.
+
+    The budget is max_tokens minus the tokens reserved for the answer and the
+    tokens of the prompt template itself. Chunks are taken in ranking order
+    (highest score first) up to context_share of the budget when there is
+    history; history is taken newest message first with whatever is left.
+    The first item that does not fit is truncated, the rest are dropped.
+    """
+
+    SEPARATOR_TOKENS = 2
+    MIN_TRUNCATED_TOKENS = 32
+
+    def __init__(self, count_tokens: Callable[[str], int], max_tokens: int = 6000,
+                 reserved_tokens: int = 512, context_share: float = 0.6,
+                 exact: bool = False):
+        self.count_tokens = count_tokens
+        self.max_tokens = max_tokens
+        self.reserved_tokens = reserved_tokens
+        self.context_share = context_share
+        self.exact = exact
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of text within max_tokens, cut at a word boundary"""
+        tokens = self.count_tokens(text)
+        if tokens <= max_tokens:
+            return text
+        cut = int(len(text) * max_tokens / tokens)
+        while cut > 0 and self.count_tokens(text[:cut]) > max_tokens:
+            cut = int(cut * 0.9)
+        space = text.rfind(" ", 0, cut)
+        return text[:space if space > cut // 2 else cut].rstrip() + " …"
+
+    def _take(self, texts: List[str], budget: int) -> Tuple[List[str], int, bool]:
+        """Texts that fit in budget, in order; returns (texts, tokens used, truncated)"""
+        taken, used = [], 0
+        for text in texts:
+            cost = self.count_tokens(text) + self.SEPARATOR_TOKENS
+            if used + cost <= budget:
+                taken.append(text)
+                used += cost
+                continue
+            remaining = budget - used - self.SEPARATOR_TOKENS
+            if remaining >= self.MIN_TRUNCATED_TOKENS:
+                text = self.truncate(text, remaining)
+                taken.append(text)
+                used += self.count_tokens(text) + self.SEPARATOR_TOKENS
+                return taken, used, True
+            return taken, used, False
+        return taken, used, False
+
+    def fit(self, template: str, results: List[dict],
+            history: Optional[List[dict]] = None) -> Tuple[List[str], List[dict], Dict]:
+        """
+        Select the context texts and history messages for a prompt.
+        - template: the prompt rendered without context and history
+        - results: retrieved chunks, best first
+        - history: messages in chronological order
+        Returns (context texts, history messages in chronological order, usage).
+        """
+        history = history or []
+        budget = max(0, self.max_tokens - self.reserved_tokens - self.count_tokens(template))
+
+        context_budget = int(budget * self.context_share) if history else budget
+        context, context_used, context_truncated = self._take([r["text"] for r in results], context_budget)
+
+        # Newest messages first; the oldest one that fits partially is truncated
+        lines = [f"{m['role'].upper()}: {m['content']}" for m in reversed(history)]
+        kept, _, history_truncated = self._take(lines, budget - context_used)
+        messages = list(reversed(history))[:len(kept)]
+        if history_truncated:
+            messages[-1] = {**messages[-1], "content": kept[-1].split(": ", 1)[1]}
+        messages.reverse()
+
+        usage = {
+            "budget_tokens": self.max_tokens - self.reserved_tokens,
+            "context_chunks": len(context),
+            "context_chunks_retrieved": len(results),
+            "history_messages": len(messages),
+            "history_messages_available": len(history),
+            "truncated": context_truncated or history_truncated
+                         or len(context) < len(results) or len(messages) < len(history),
+            "token_count": "tokenizer" if self.exact else "estimate",
+        }
+        return context, messages, usage
@@ -0,0 +1,144 @@
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class _ImportTimer:
+    """
+    Meta path hook that times module execution. It does not find anything
+    itself: it asks the remaining finders for the spec and wraps the loader's
+    exec_module, so each import is timed as self time (excluding the modules
+    it imports) and cumulative time.
+    """
+
+    def __init__(self, profile: "StartupProfile"):
+        self.profile = profile
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        loader = spec.loader
+        # Built-in and frozen importers are shared classes; they are fast anyway
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return spec
+        exec_module = loader.exec_module
+
+        def timed_exec_module(module):
+            stack = self._local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - started
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.profile._record_import(fullname, elapsed - children, elapsed)
+
+        loader.exec_module = timed_exec_module
+        return spec
+
+
+class StartupProfile:
+    """
+    Startup-time report: import time per module (grouped by top-level
+    package), named startup phases, and marks relative to process start
+    (e.g. when the background warm-up made the RAG service available).
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._timer: Optional[_ImportTimer] = None
+        self._imports: Dict[str, Dict[str, float]] = {}
+        self._phases: Dict[str, float] = {}
+        self._marks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def install(self):
+        """Start timing imports; call before the application modules are imported"""
+        if self._timer is None:
+            self._timer = _ImportTimer(self)
+            sys.meta_path.insert(0, self._timer)
+
+    def uninstall(self):
+        if self._timer is not None:
+            if self._timer in sys.meta_path:
+                sys.meta_path.remove(self._timer)
+            self._timer = None
+
+    def _record_import(self, module: str, self_seconds: float, cumulative_seconds: float):
+        with self._lock:
+            self._imports[module] = {"self": self_seconds, "cumulative": cumulative_seconds}
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a named startup step"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases[name] = time.perf_counter() - started
+
+    def mark(self, name: str):
+        """Record the time elapsed since process start under name"""
+        with self._lock:
+            self._marks[name] = time.perf_counter() - self.started_at
+
+    def report(self, top: int = 20) -> Dict:
+        with self._lock:
+            imports = dict(self._imports)
+            phases = dict(self._phases)
+            marks = dict(self._marks)
+
+        packages: Dict[str, Dict] = {}
+        for module, timing in imports.items():
+            package = packages.setdefault(module.split(".")[0], {"modules": 0, "seconds": 0.0})
+            package["modules"] += 1
+            package["seconds"] += timing["self"]
+
+        def ms(seconds: float) -> float:
+            return round(seconds * 1000, 1)
+
+        slowest: List = sorted(imports.items(), key=lambda item: item[1]["cumulative"], reverse=True)
+        return {
+            "import_ms": ms(sum(timing["self"] for timing in imports.values())),
+            "packages": [
+                {"package": name, "modules": package["modules"], "ms": ms(package["seconds"])}
+                for name, package in sorted(packages.items(), key=lambda item: item[1]["seconds"], reverse=True)
+            ][:top],
+            "modules": [
+                {"module": module, "self_ms": ms(timing["self"]), "cumulative_ms": ms(timing["cumulative"])}
+                for module, timing in slowest[:top]
+            ],
+            "phases_ms": {name: ms(seconds) for name, seconds in phases.items()},
+            "marks_ms": {name: ms(seconds) for name, seconds in marks.items()},
+        }
+
+    def log(self, top: int = 10):
+        report = self.report(top)
+        print(f"⏱️ Startup imports took {report['import_ms']} ms")
+        for package in report["packages"]:
+            print(f"   {package['package']:<28} {package['ms']:>9} ms  ({package['modules']} modules)")
+        for name, value in {**report["phases_ms"], **report["marks_ms"]}.items():
+            print(f"   {name:<28} {value:>9} ms")
+
+
+startup_profile = StartupProfile()
@@ -22,9 +22,14 @@ class MongoDB:
         """Create necessary indexes for collections"""
         self._db['pdfs'].create_index("pdf_id", unique=True)
         self._db['pdfs'].create_index("conversation_id")
+        self._db['pdfs'].create_index([("conversation_id", 1), ("uploaded_at", 1), ("pdf_id", 1)])
+        self._db['pdfs'].create_index("blob_id")
         self._db['conversations'].create_index("conversation_id", unique=True)
         self._db['messages'].create_index([("conversation_id", 1), ("created_at", 1)])
-        self._db['chunks'].create_index("chunk_id")
+        self._db['messages'].create_index([("conversation_id", 1), ("_id", 1)])
+        self._db['chunks'].create_index("chunk_id", unique=True)
+        self._db['ingestion_jobs'].create_index("job_id", unique=True)
+        self._db['ingestion_jobs'].create_index([("status", 1), ("created_at", 1)])
     
     @property
     def db(self):
@@ -0,0 +1,60 @@
+import hashlib
+from gridfs import GridFSBucket
+from gridfs.errors import NoFile
+from pymongo.database import Database
+from typing import Dict, Iterator, Optional
+
+
+class BlobRepository:
+    """
+    Content-addressed file storage on top of GridFS. Every blob is stored once
+    under the SHA-256 of its bytes, written and read in fixed-size chunks so
+    files of any size never have to sit in memory.
+    """
+    CHUNK_SIZE = 1024 * 1024  # 1MB
+
+    def __init__(self, db: Database, bucket_name: str = "pdf_blobs"):
+        self.bucket = GridFSBucket(db, bucket_name=bucket_name, chunk_size_bytes=self.CHUNK_SIZE)
+        self.files = db[f"{bucket_name}.files"]
+
+    @classmethod
+    def hash_file(cls, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(cls.CHUNK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def exists(self, blob_id: str) -> bool:
+        return self.files.count_documents({"_id": blob_id}, limit=1) > 0
+
+    def upload_file(self, path: str, filename: str, sha256: Optional[str] = None) -> Dict:
+        """Store a file unless identical bytes are already stored; returns its blob info"""
+        sha256 = sha256 or self.hash_file(path)
+        if not self.exists(sha256):
+            with open(path, "rb") as f, self.bucket.open_upload_stream_with_id(
+                sha256, filename, metadata={"sha256": sha256}
+            ) as upload:
+                for block in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                    upload.write(block)
+        info = self.files.find_one({"_id": sha256}, {"length": 1})
+        return {"blob_id": sha256, "sha256": sha256, "size": info["length"]}
+
+    def iter_chunks(self, blob_id: str) -> Iterator[bytes]:
+        """Stream a stored file chunk by chunk"""
+        download = self.bucket.open_download_stream(blob_id)
+        try:
+            while True:
+                chunk = download.readchunk()
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            download.close()
+
+    def delete(self, blob_id: str) -> bool:
+        try:
+            self.bucket.delete(blob_id)
+            return True
+        except NoFile:
+            return False
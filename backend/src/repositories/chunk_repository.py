@@ -1,4 +1,7 @@
-from typing import List , Dict
+from datetime import datetime
+from typing import Iterator, List , Dict , Tuple
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 
 class ChunkRepository :
@@ -11,16 +14,65 @@ class ChunkRepository :
         result = self.collection.insert_many(docs)
         return [str(_id) for _id in result.inserted_ids]
     
-    def find_by_pdf(self,pdf_id:str) -> List[Dict]:
-        return list(self.collection.find({"metadata.pdf_id":pdf_id}))
+    def find_by_hashes(self, chunk_hashes: List[str], embedding_key: str) -> Dict[str, Dict]:
+        """Chunks keyed by the hash of their text, with the embedding for one model if stored"""
+        cursor = self.collection.find(
+            {"chunk_id": {"$in": chunk_hashes}},
+            {"_id": 0, "chunk_id": 1, "text": 1, f"embeddings.{embedding_key}": 1}
+        )
+        return {doc["chunk_id"]: doc for doc in cursor}
     
-    def find_by_conversation(self,conversation_id:str) -> List[Dict]:
-        return list(self.collection.find({"metadata.conversation_id":conversation_id}))
+    def count_existing(self, chunk_hashes: List[str]) -> int:
+        return self.collection.count_documents({"chunk_id": {"$in": chunk_hashes}})
+    
+    def save_embeddings(self, records: List[Tuple[str, str, List[float]]], embedding_key: str) -> int:
+        """Store (chunk_hash, text, embedding) records, one document per distinct text"""
+        if not records:
+            return 0
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"chunk_id": chunk_hash},
+                {
+                    "$setOnInsert": {"text": text, "created_at": now},
+                    "$set": {f"embeddings.{embedding_key}": embedding, "used_at": now}
+                },
+                upsert=True
+            )
+            for chunk_hash, text, embedding in records
+        ]
+        try:
+            result = self.collection.bulk_write(operations, ordered=False)
+            return result.upserted_count + result.modified_count
+        except BulkWriteError as e:
+            # A concurrent upload inserted the same chunk first (unique chunk_id);
+            # the retried upserts match its document and set our embedding
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+            self.collection.bulk_write([operations[error["index"]] for error in errors], ordered=False)
+            return len(records)
 
-    def delete_by_pdf(self,pdf_id:str) -> int:
-        result = self.collection.delete_many({"metadata.pdf_id": pdf_id})
-        return result.deleted_count
+    def touch(self, chunk_hashes: List[str]):
+        """Mark stored chunks as used by an upload so garbage collection keeps them"""
+        if chunk_hashes:
+            self.collection.update_many({"chunk_id": {"$in": chunk_hashes}},
+                                        {"$set": {"used_at": datetime.utcnow()}})
+
+    @staticmethod
+    def _unused_since(cutoff: datetime) -> Dict:
+        return {"$or": [
+            {"used_at": {"$lt": cutoff}},
+            {"used_at": {"$exists": False}, "created_at": {"$lt": cutoff}}
+        ]}
 
-    def delete_by_conversation(self,conversation_id:str) -> int:
-        result = self.collection.delete_many({"metadata.conversation_id": conversation_id})
-        return result.deleted_count
\ No newline at end of file
+    def iter_ids_unused_since(self, cutoff: datetime) -> Iterator[str]:
+        cursor = self.collection.find(self._unused_since(cutoff), {"_id": 0, "chunk_id": 1})
+        return (doc["chunk_id"] for doc in cursor)
+
+    def delete_unused(self, chunk_hashes: List[str], cutoff: datetime) -> int:
+        """Delete chunks by hash unless an upload used them after cutoff"""
+        if not chunk_hashes:
+            return 0
+        result = self.collection.delete_many({"chunk_id": {"$in": chunk_hashes}, **self._unused_since(cutoff)})
+        return result.deleted_count
@@ -21,6 +21,33 @@ class ConversationRepository:
     def find_all(self) -> List[Dict]:
         return list(self.collection.find().sort("created_at", -1))
     
+    def find_summary(self, conversation_id: str) -> Optional[Dict]:
+        """Rolling summary fields of a conversation (summary, summarized_through, summarized_messages)"""
+        return self.collection.find_one(
+            {"conversation_id": conversation_id},
+            {"_id": 0, "summary": 1, "summarized_through": 1, "summarized_messages": 1}
+        )
+    
+    def update_summary(self, conversation_id: str, summary: str, summarized_through,
+                       folded: int, previous_through=None) -> bool:
+        """
+        Store a new summary covering messages up to summarized_through. Only
+        applies if the summary still covers previous_through, so a concurrent
+        update is never overwritten by an older one.
+        """
+        result = self.collection.update_one(
+            {"conversation_id": conversation_id, "summarized_through": previous_through},
+            {
+                "$set": {
+                    "summary": summary,
+                    "summarized_through": summarized_through,
+                    "summary_updated_at": datetime.utcnow()
+                },
+                "$inc": {"summarized_messages": folded}
+            }
+        )
+        return result.modified_count > 0
+    
     def delete(self, conversation_id: str) -> int:
         result = self.collection.delete_one({"conversation_id": conversation_id})
         return result.deleted_count
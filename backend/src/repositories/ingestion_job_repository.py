@@ -0,0 +1,122 @@
+from pymongo import ReturnDocument
+from pymongo.database import Database
+from datetime import datetime, timedelta
+from typing import List , Dict , Optional
+
+
+class IngestionJobRepository:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(self, db: Database):
+        self.collection = db["ingestion_jobs"]
+
+    def create(self, job_id: str, pdf_id: str, filename: str, file_path: str,
+               conversation_id: Optional[str] = None) -> str:
+        now = datetime.utcnow()
+        doc = {
+            "job_id": job_id,
+            "pdf_id": pdf_id,
+            "filename": filename,
+            "file_path": file_path,
+            "conversation_id": conversation_id,
+            "status": self.QUEUED,
+            "stage": "queued",
+            "progress": 0.0,
+            "error": None,
+            "result": None,
+            "attempts": 0,
+            "worker_id": None,
+            "heartbeat_at": None,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None
+        }
+        result = self.collection.insert_one(doc)
+        return str(result.inserted_id)
+
+    def find_by_id(self, job_id: str) -> Optional[Dict]:
+        return self.collection.find_one({"job_id": job_id}, {"_id": 0})
+
+    def find_unfinished(self) -> List[Dict]:
+        return list(self.collection.find(
+            {"status": {"$in": [self.QUEUED, self.RUNNING]}}, {"_id": 0}
+        ).sort("created_at", 1))
+
+    def find_queued(self) -> List[Dict]:
+        return list(self.collection.find({"status": self.QUEUED}, {"_id": 0}).sort("created_at", 1))
+
+    def claim(self, job_id: str, worker_id: str) -> Optional[Dict]:
+        """Atomically move a queued job to running under worker_id; returns None if another worker owns it"""
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {"job_id": job_id, "status": self.QUEUED},
+            {
+                "$set": {"status": self.RUNNING, "stage": "starting", "worker_id": worker_id,
+                         "heartbeat_at": now, "started_at": now, "updated_at": now},
+                "$inc": {"attempts": 1}
+            },
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    def heartbeat(self, worker_id: str) -> int:
+        """Renew the lease of every job worker_id is running"""
+        result = self.collection.update_many(
+            {"status": self.RUNNING, "worker_id": worker_id},
+            {"$set": {"heartbeat_at": datetime.utcnow()}}
+        )
+        return result.modified_count
+
+    def update_progress(self, job_id: str, stage: str, progress: float, **fields) -> int:
+        update = {"stage": stage, "progress": progress, "updated_at": datetime.utcnow(), **fields}
+        result = self.collection.update_one({"job_id": job_id}, {"$set": update})
+        return result.modified_count
+
+    def mark_completed(self, job_id: str, result: Dict) -> int:
+        now = datetime.utcnow()
+        update = self.collection.update_one(
+            {"job_id": job_id},
+            {"$set": {"status": self.COMPLETED, "stage": "done", "progress": 1.0,
+                      "result": result, "updated_at": now, "finished_at": now}}
+        )
+        return update.modified_count
+
+    def mark_failed(self, job_id: str, error: str) -> int:
+        now = datetime.utcnow()
+        update = self.collection.update_one(
+            {"job_id": job_id},
+            {"$set": {"status": self.FAILED, "error": error,
+                      "updated_at": now, "finished_at": now}}
+        )
+        return update.modified_count
+
+    @classmethod
+    def _expired(cls, lease_seconds: float) -> Dict:
+        """Running jobs whose worker stopped renewing the lease"""
+        cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+        return {"status": cls.RUNNING, "$or": [
+            {"heartbeat_at": {"$lt": cutoff}},
+            {"heartbeat_at": None}
+        ]}
+
+    def fail_interrupted(self, max_attempts: int, lease_seconds: float) -> List[Dict]:
+        """Jobs whose lease expired on their last attempt are marked failed"""
+        jobs = list(self.collection.find(
+            {**self._expired(lease_seconds), "attempts": {"$gte": max_attempts}}, {"_id": 0}
+        ))
+        for job in jobs:
+            self.mark_failed(job["job_id"], f"Interrupted {job['attempts']} times; giving up")
+        return jobs
+
+    def requeue_expired(self, lease_seconds: float) -> int:
+        """Jobs whose worker stopped renewing the lease are put back in the queue"""
+        result = self.collection.update_many(
+            self._expired(lease_seconds),
+            {"$set": {"status": self.QUEUED, "stage": "queued", "worker_id": None,
+                      "updated_at": datetime.utcnow()}}
+        )
+        return result.modified_count
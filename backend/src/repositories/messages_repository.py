@@ -21,12 +21,28 @@ class MessagesRepository :
 
     def find_by_conversation(self , conversation_id:str , limit:int =20 , 
                              ascending : bool =True ) -> List[Dict] : 
-        sort_order = 1 if ascending else 2
+        sort_order = 1 if ascending else -1
         cursor = self.collection.find(
             {"conversation_id":conversation_id}
         ).sort("created_at",sort_order).limit(limit)
         return list(cursor)
     
+    def find_recent(self , conversation_id:str , limit:int =20 , after=None) -> List[Dict] :
+        """Latest `limit` messages (inserted after the `after` message id, if given), oldest first"""
+        query = {"conversation_id":conversation_id}
+        if after is not None:
+            query["_id"] = {"$gt":after}
+        cursor = self.collection.find(query).sort("_id",-1).limit(limit)
+        return list(reversed(list(cursor)))
+    
+    def find_after(self , conversation_id:str , after=None , limit:int =0) -> List[Dict] :
+        """Messages inserted after the `after` message id (all if None), oldest first"""
+        query = {"conversation_id":conversation_id}
+        if after is not None:
+            query["_id"] = {"$gt":after}
+        cursor = self.collection.find(query,{"role":1,"content":1}).sort("_id",1).limit(limit)
+        return list(cursor)
+    
     def delete_by_conversation(self,conversation_id:str):
         result = self.collection.delete_many({"conversation_id":conversation_id})
         return result.deleted_count
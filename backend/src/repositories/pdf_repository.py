@@ -1,32 +1,100 @@
+import base64
 from pymongo.database import Database
 from datetime import datetime
-from typing import List , Dict , Optional
-from bson import Binary
+from typing import List , Dict , Optional , Iterator
 
 class PDFRepository:
+    # Fields needed to describe a PDF; never loads file content
+    METADATA_PROJECTION = {
+        "_id": 0, "pdf_id": 1, "filename": 1, "conversation_id": 1,
+        "uploaded_at": 1, "size": 1, "blob_id": 1
+    }
+    # Global PDFs are stored with either no conversation or an empty one
+    GLOBAL_SCOPE = {"$in": [None, ""]}
+
     def __init__(self, db: Database):
         self.collection = db["pdfs"]
 
-    def create(self, pdf_id: str, filename: str, content: bytes, 
-               conversation_id: Optional[str] = None) -> str:
+    @staticmethod
+    def encode_cursor(pdf: Dict) -> str:
+        raw = f"{pdf['uploaded_at'].isoformat()}|{pdf['pdf_id']}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Dict:
+        """Turn an opaque cursor into a filter for the documents after it"""
+        try:
+            uploaded_at, pdf_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+            uploaded_at = datetime.fromisoformat(uploaded_at)
+        except Exception:
+            raise ValueError("Invalid pagination cursor")
+        return {"$or": [
+            {"uploaded_at": {"$gt": uploaded_at}},
+            {"uploaded_at": uploaded_at, "pdf_id": {"$gt": pdf_id}}
+        ]}
+
+    def _find_metadata(self, query: Dict, limit: Optional[int] = None,
+                       after: Optional[str] = None) -> List[Dict]:
+        if after:
+            query = {"$and": [query, self.decode_cursor(after)]}
+        cursor = self.collection.find(query, self.METADATA_PROJECTION).sort(
+            [("uploaded_at", 1), ("pdf_id", 1)]
+        )
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+    def create(self, pdf_id: str, filename: str, blob_id: str, size: int,
+               conversation_id: Optional[str] = None,
+               chunks: Optional[List[List]] = None) -> str:
         doc = {
             "pdf_id": pdf_id,
             "filename": filename,
-            "content": Binary(content),
+            "blob_id": blob_id,
+            "size": size,
             "conversation_id": conversation_id,
             "uploaded_at": datetime.utcnow()
         }
+        if chunks is not None:
+            # [chunk_hash, page] pairs, in chunk order
+            doc["chunks"] = chunks
         result = self.collection.insert_one(doc)
         return str(result.inserted_id)
     
     def find_by_id(self, pdf_id: str) -> Optional[Dict]:
         return self.collection.find_one({"pdf_id": pdf_id})
     
-    def find_by_conversation(self, conversation_id: str) -> List[Dict]:
-        return list(self.collection.find({"conversation_id": conversation_id}))
+    def find_metadata_by_id(self, pdf_id: str) -> Optional[Dict]:
+        return self.collection.find_one({"pdf_id": pdf_id}, self.METADATA_PROJECTION)
+    
+    def find_by_blob(self, blob_id: str, conversation_id: Optional[str] = None) -> Optional[Dict]:
+        """PDF with the same bytes already uploaded to the given conversation (or globally)"""
+        scope = conversation_id if conversation_id else self.GLOBAL_SCOPE
+        return self.collection.find_one(
+            {"blob_id": blob_id, "conversation_id": scope}, self.METADATA_PROJECTION
+        )
+    
+    def find_manifest_by_blob(self, blob_id: str) -> Optional[Dict]:
+        """Chunk manifest of any indexed PDF with the given bytes"""
+        return self.collection.find_one(
+            {"blob_id": blob_id, "chunks": {"$exists": True}},
+            {"_id": 0, "pdf_id": 1, "chunks": 1}
+        )
     
-    def find_global_pdfs(self) -> List[Dict]:
-        return list(self.collection.find({"conversation_id": ""}))
+    def iter_manifests(self) -> Iterator[Dict]:
+        """pdf_id, filename, conversation_id and chunk manifest of every indexed PDF"""
+        return self.collection.find(
+            {"chunks": {"$exists": True}},
+            {"_id": 0, "pdf_id": 1, "filename": 1, "conversation_id": 1, "chunks": 1}
+        )
+    
+    def find_by_conversation(self, conversation_id: str, limit: Optional[int] = None,
+                             after: Optional[str] = None) -> List[Dict]:
+        return self._find_metadata({"conversation_id": conversation_id}, limit, after)
+    
+    def find_global_pdfs(self, limit: Optional[int] = None,
+                         after: Optional[str] = None) -> List[Dict]:
+        return self._find_metadata({"conversation_id": self.GLOBAL_SCOPE}, limit, after)
     
     def delete(self, pdf_id: str) -> int:
         result = self.collection.delete_one({"pdf_id": pdf_id})
@@ -36,5 +104,16 @@ class PDFRepository:
         result = self.collection.delete_many({"conversation_id": conversation_id})
         return result.deleted_count
     
+    def existing_ids(self, pdf_ids: List[str]) -> set:
+        """The subset of pdf_ids that still have a document"""
+        cursor = self.collection.find({"pdf_id": {"$in": pdf_ids}}, {"_id": 0, "pdf_id": 1})
+        return {doc["pdf_id"] for doc in cursor}
+    
+    def count_by_blob(self, blob_id: str) -> int:
+        return self.collection.count_documents({"blob_id": blob_id})
+    
+    def count_global(self) -> int:
+        return self.collection.count_documents({"conversation_id": self.GLOBAL_SCOPE})
+    
     def count_all(self) -> int:
         return self.collection.count_documents({})
\ No newline at end of file
@@ -1,6 +1,7 @@
 from pymongo.database import Database
+from pymongo.errors import BulkWriteError
 from datetime import datetime
-from typing import List , Dict
+from typing import List , Dict , Optional
 
 class PredictionRepository:
     def __init__(self, db: Database):
@@ -18,6 +19,38 @@ class PredictionRepository:
         document['_id'] = str(result.inserted_id)
         return document
     
+    def save_predictions(self, input_data: List[Dict], predicted_sleep_discords: List[str],
+                         request_ids: Optional[List] = None) -> List[Dict]:
+        """
+        Save a batch of predictions with a single insert_many. With request_ids
+        (used as _id) the insert is idempotent: rows already saved by an
+        earlier, partly failed attempt are skipped instead of duplicated.
+        """
+        created_at = datetime.utcnow()
+        documents = [
+            {
+                **data,
+                "predicted_sleep_discord": predicted,
+                "created_at": created_at
+            }
+            for data, predicted in zip(input_data, predicted_sleep_discords)
+        ]
+        if not documents:
+            return []
+        if request_ids is not None:
+            for document, request_id in zip(documents, request_ids):
+                document['_id'] = request_id
+
+        try:
+            self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys are rows a previous attempt already saved
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+        for document in documents:
+            document['_id'] = str(document['_id'])
+        return documents
+    
     def get_all_predictions(self)->List[Dict]:
         predictions = list(self.collection.find().sort("created_at",-1))
         for pred in predictions:
@@ -6,6 +6,7 @@ from .pdf_schema import PDFUploadResponse , PDFInfo
 from .provider_schema import ProviderConfig
 from .error_schema import ErrorResponse
 from .prediction_schema import PredictionInput , PredictionOutput
+from .ingestion_job_schema import IngestionJobResponse
 
 
 __all__ = [
@@ -15,6 +16,7 @@ __all__ = [
     "ProviderConfig","ErrorResponse",
     "MessageCreate", "MessageResponse",
     "ChatRequest", "ChatResponse" , 
-    "PredictionInput", "PredictionOutput" 
+    "PredictionInput", "PredictionOutput" ,
+    "IngestionJobResponse"
     
 ]
\ No newline at end of file
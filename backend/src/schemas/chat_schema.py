@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Dict
 
 class ChatRequest(BaseModel):
     conversation_id: str
@@ -12,3 +12,5 @@ class ChatResponse(BaseModel):
     user_message_id: Optional[str] = None
     assistant_message_id: Optional[str] = None
     answer: str
+    prompt: Optional[Dict] = None  # prompt size: tokens, chunks and messages included
+    debug: Optional[Dict] = None  # per-stage timings in ms
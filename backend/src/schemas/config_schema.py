@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 # ==================== Configuration Schemas ====================
@@ -16,3 +16,18 @@ class CurrentConfigResponse(BaseModel):
     llm_model: Optional[str] = None
     embedding_model: Optional[str] = None
     vectordb_index: Optional[str] = None
+
+
+class ProviderSwapResponse(BaseModel):
+    swap_id: str
+    status: str  # queued | warming | checking | draining | completed | failed
+    providers: Dict[str, str]
+    created_at: datetime
+    updated_at: datetime
+    swapped_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    checks_ms: Optional[Dict[str, float]] = None
+    drained: Optional[bool] = None
+    unloaded: Optional[List[Dict]] = None
+    retired_at: Optional[datetime] = None
+    error: Optional[str] = None
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    pdf_id: str
+    filename: str
+    conversation_id: Optional[str] = None
+    status: str  # "queued", "running", "completed" or "failed"
+    stage: str
+    progress: float
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
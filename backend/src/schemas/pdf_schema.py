@@ -6,6 +6,8 @@ class PDFUploadResponse(BaseModel):
     pdf_id: str
     filename: str
     conversation_id: Optional[str] = None
+    job_id: Optional[str] = None
+    status: Optional[str] = None
     message: str
 
 class PDFInfo(BaseModel):
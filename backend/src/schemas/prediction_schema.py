@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 
 class PredictionInput(BaseModel):
     gender: str
@@ -18,4 +18,12 @@ class PredictionInput(BaseModel):
 
 
 class PredictionOutput(BaseModel):
-    predictedSleep: str
\ No newline at end of file
+    predictedSleep: str
+
+
+class PredictionBatchInput(BaseModel):
+    items: List[PredictionInput]
+
+
+class PredictionBatchOutput(BaseModel):
+    predictions: List[PredictionOutput]
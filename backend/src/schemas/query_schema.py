@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 class QueryRequest(BaseModel):
@@ -9,4 +9,5 @@ class QueryRequest(BaseModel):
 
 class QueryResponse(BaseModel):
     answer: str
-    conversation_id: Optional[str] = None
\ No newline at end of file
+    conversation_id: Optional[str] = None
+    prompt: Optional[Dict] = None  # prompt size; None when the answer came from the cache
\ No newline at end of file
@@ -3,13 +3,21 @@ from datetime import datetime
 from src.repositories.conversations_repository import ConversationRepository
 from src.repositories.messages_repository import MessagesRepository
 from src.repositories.pdf_repository import PDFRepository
+from src.services.pdf_service import PdfService
+from src.stores.vectordb.vectordb_interface import VectorDBInterface
+from src.stores.lexical.bm25_index import BM25Index
+from src.stores.llm.semantic_cache import SemanticAnswerCache
 
 
 class ConversationService:
-    def __init__(self, db):
+    def __init__(self, db, vectordb: Optional[VectorDBInterface] = None,
+                 lexical_index: Optional[BM25Index] = None,
+                 answer_cache: Optional[SemanticAnswerCache] = None):
         self.conversation_repo = ConversationRepository(db)
         self.message_repo = MessagesRepository(db)
         self.pdf_repo = PDFRepository(db)
+        self.pdf_service = PdfService(db, vectordb, lexical_index, answer_cache)
+        self.answer_cache = answer_cache
 
     def create(self, title: str) -> str:
         """Create a new conversation"""
@@ -27,14 +35,22 @@ class ConversationService:
     
     def delete(self, conversation_id: str):
         """Delete conversation and associated data"""
-        # Delete conversation
-        self.conversation_repo.delete(conversation_id)
+        # Delete the PDFs first, each with its indexed chunks and unshared
+        # stored file. Chunks are deleted by pdf_id, which every vector store
+        # supports (Pinecone serverless rejects other metadata-filter deletes),
+        # and the parent records below are removed only once nothing fails
+        for pdf in self.pdf_repo.find_by_conversation(conversation_id):
+            self.pdf_service.delete_pdf(pdf["pdf_id"])
+        
+        # Delete the answers cached for this conversation
+        if self.answer_cache is not None:
+            self.answer_cache.delete_by_metadata({"conversation_id": conversation_id})
         
         # Delete messages
         self.message_repo.delete_by_conversation(conversation_id)
         
-        # Delete PDFs
-        self.pdf_repo.delete_by_conversation(conversation_id)
+        # Delete conversation
+        self.conversation_repo.delete(conversation_id)
     
     def add_message(self, conversation_id: str, role: str, content: str):
         """Add a message to conversation"""
@@ -0,0 +1,138 @@
+import os
+import hashlib
+import socket
+import threading
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from src.repositories.ingestion_job_repository import IngestionJobRepository
+from src.repositories.pdf_repository import PDFRepository
+from src.repositories.blob_repository import BlobRepository
+from src.services.rag_service import RAGService
+from src.core.config import settings
+
+
+class IngestionService:
+    """
+    Runs the extract -> split -> embed -> upsert pipeline of uploaded PDFs on a
+    bounded worker pool. Jobs are persisted in Mongo so that queued or interrupted
+    uploads are picked up again when the application restarts, unless they
+    have already been interrupted max_attempts times.
+
+    A running job is leased to the process that claimed it (worker_id), which
+    renews the lease every heartbeat. recover() only takes back jobs whose
+    lease expired, so it never re-runs a job this or another live process is
+    still working on.
+    """
+
+    def __init__(self, db, max_workers: int = None, upload_dir: str = None,
+                 max_attempts: int = None):
+        self.job_repo = IngestionJobRepository(db)
+        self.pdf_repo = PDFRepository(db)
+        self.max_attempts = max_attempts or settings.INGESTION_MAX_ATTEMPTS
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.upload_dir = Path(upload_dir or settings.INGESTION_UPLOAD_DIR)
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.INGESTION_WORKERS,
+            thread_name_prefix="pdf-ingestion"
+        )
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._renew_leases, name="ingestion-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def submit(self, fileobj: BinaryIO, filename: str,
+               conversation_id: Optional[str] = None) -> Dict:
+        """
+        Persist the upload to disk, record a queued job and schedule it. A file
+        already uploaded to the same scope is not queued: the job is recorded
+        as completed with the existing pdf_id. The pdf_id of a queued job is
+        tentative; if an identical upload finishes first, result.pdf_id of
+        the completed job holds the existing one.
+        """
+        job_id = f"job_{uuid.uuid4().hex}"
+        pdf_id = RAGService.new_pdf_id()
+
+        file_path = self.upload_dir / f"{job_id}.pdf"
+        digest = hashlib.sha256()
+        with file_path.open("wb") as buffer:
+            for block in iter(lambda: fileobj.read(BlobRepository.CHUNK_SIZE), b""):
+                digest.update(block)
+                buffer.write(block)
+
+        duplicate = self.pdf_repo.find_by_blob(digest.hexdigest(), conversation_id)
+        if duplicate:
+            os.remove(file_path)
+            self.job_repo.create(job_id, duplicate["pdf_id"], filename, str(file_path), conversation_id)
+            self.job_repo.mark_completed(job_id, {"pdf_id": duplicate["pdf_id"], "duplicate": True})
+            return self.job_repo.find_by_id(job_id)
+
+        self.job_repo.create(job_id, pdf_id, filename, str(file_path), conversation_id)
+        self.executor.submit(self._run, job_id)
+        return self.job_repo.find_by_id(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        return self.job_repo.find_by_id(job_id)
+
+    def recover(self) -> int:
+        """Re-schedule queued jobs and jobs whose worker stopped (lease expired)"""
+        lease = settings.INGESTION_LEASE_SECONDS
+        # A job that keeps taking the process down must not crash-loop it
+        for job in self.job_repo.fail_interrupted(self.max_attempts, lease):
+            print(f"❌ Ingestion job {job['job_id']} failed after {job['attempts']} interrupted attempts")
+            if os.path.exists(job["file_path"]):
+                os.remove(job["file_path"])
+        self.job_repo.requeue_expired(lease)
+        resumed = 0
+        for job in self.job_repo.find_queued():
+            if not os.path.exists(job["file_path"]):
+                self.job_repo.mark_failed(job["job_id"], "Uploaded file is no longer available")
+                continue
+            self.executor.submit(self._run, job["job_id"])
+            resumed += 1
+        return resumed
+
+    def shutdown(self, wait: bool = False):
+        self._stopped.set()
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _renew_leases(self):
+        while not self._stopped.wait(settings.INGESTION_HEARTBEAT_SECONDS):
+            try:
+                self.job_repo.heartbeat(self.worker_id)
+            except Exception as e:
+                print(f"⚠️ Ingestion heartbeat failed: {e}")
+
+    def _run(self, job_id: str):
+        # Still warming up: the job stays queued and recover() schedules it
+        # again once the RAG service is live
+        if settings.rag_service is None:
+            return
+        job = self.job_repo.claim(job_id, self.worker_id)
+        if not job:
+            return
+
+        def report(stage: str, progress: float, **fields):
+            self.job_repo.update_progress(job_id, stage, progress, **fields)
+
+        try:
+            service = settings.rag_service
+            with service.in_use():
+                pdf_id = service.upload_pdf(
+                    job["file_path"],
+                    job["conversation_id"],
+                    pdf_id=job["pdf_id"],
+                    filename=job["filename"],
+                    progress_callback=report
+                )
+            self.job_repo.mark_completed(job_id, {
+                "pdf_id": pdf_id,
+                "duplicate": pdf_id != job["pdf_id"]
+            })
+        except Exception as e:
+            print(f"❌ Ingestion job {job_id} failed: {e}")
+            self.job_repo.mark_failed(job_id, str(e))
+        finally:
+            if os.path.exists(job["file_path"]):
+                os.remove(job["file_path"])
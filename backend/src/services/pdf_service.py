@@ -1,27 +1,63 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 from datetime import datetime
 from src.repositories.conversations_repository import ConversationRepository
 from src.repositories.messages_repository import MessagesRepository
 from src.repositories.pdf_repository import PDFRepository
+from src.repositories.blob_repository import BlobRepository
+from src.stores.vectordb.vectordb_interface import VectorDBInterface
+from src.stores.lexical.bm25_index import BM25Index
+from src.stores.llm.semantic_cache import SemanticAnswerCache
 
 
 class PdfService:
-    def __init__(self, db):
+    def __init__(self, db, vectordb: Optional[VectorDBInterface] = None,
+                 lexical_index: Optional[BM25Index] = None,
+                 answer_cache: Optional[SemanticAnswerCache] = None):
         self.pdf_repo = PDFRepository(db)
+        self.blob_repo = BlobRepository(db)
+        # Chunk indexes and cached answers to keep in sync with PDF deletes
+        self.indexes = [index for index in (vectordb, lexical_index, answer_cache) if index is not None]
 
     def get_pdf(self, pdf_id: str) -> Optional[Dict]:
         return self.pdf_repo.find_by_id(pdf_id=pdf_id)
 
-    def get_conversation_pdfs(self, conversation_id: str) -> List:
-        """Get all PDFs for a conversation"""
-        return self.pdf_repo.find_by_conversation(conversation_id)
+    def get_pdf_info(self, pdf_id: str) -> Optional[Dict]:
+        """Get PDF metadata without its content"""
+        return self.pdf_repo.find_metadata_by_id(pdf_id)
+
+    def get_conversation_pdfs(self, conversation_id: str, limit: Optional[int] = None,
+                              after: Optional[str] = None) -> List:
+        """Get PDFs for a conversation, one page at a time when limit is set"""
+        return self.pdf_repo.find_by_conversation(conversation_id, limit, after)
+    
+    def get_global_pdfs(self, limit: Optional[int] = None, after: Optional[str] = None) -> List:
+        """Get global PDFs, one page at a time when limit is set"""
+        return self.pdf_repo.find_global_pdfs(limit, after)
+    
+    def next_cursor(self, pdfs: List[Dict], limit: Optional[int]) -> Optional[str]:
+        """Cursor for the page after `pdfs`, or None when there is no next page"""
+        if not limit or len(pdfs) < limit:
+            return None
+        return self.pdf_repo.encode_cursor(pdfs[-1])
+    
+    def iter_pdf_content(self, pdf: Dict) -> Iterator[bytes]:
+        """Stream the bytes of a PDF document"""
+        if pdf.get("blob_id"):
+            return self.blob_repo.iter_chunks(pdf["blob_id"])
+        # Documents stored before the blob store kept their bytes inline
+        return iter([bytes(pdf.get("content") or b"")])
     
-    def get_global_pdfs(self) -> List:
-        """Get all global PDFs"""
-        return self.pdf_repo.find_global_pdfs()
+    def release_blob(self, blob_id: Optional[str]):
+        """Delete a stored file once no PDF references it anymore"""
+        if blob_id and self.pdf_repo.count_by_blob(blob_id) == 0:
+            self.blob_repo.delete(blob_id)
     
     def delete_pdf(self, pdf_id: str):
-        """Delete a PDF"""
+        """Delete a PDF, its indexed chunks and, if unshared, its stored file"""
+        pdf = self.pdf_repo.find_metadata_by_id(pdf_id)
+        for index in self.indexes:
+            index.delete_by_metadata({"pdf_id": pdf_id})
         self.pdf_repo.delete(pdf_id)
-        # TODO: Also delete from vector DB
+        if pdf:
+            self.release_blob(pdf.get("blob_id"))
     
\ No newline at end of file
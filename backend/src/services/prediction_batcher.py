@@ -0,0 +1,135 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+from fastapi import HTTPException
+
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent single-row predictions into batches. Rows queue up
+    while a worker thread scores the previous batch; a batch is flushed when
+    it reaches max_batch_size or when its oldest row has waited max_wait_ms.
+    Each batch is scored with one predict_many call and the results are
+    handed back to the waiting callers through futures.
+
+    If a batch fails, its rows are retried one by one so that one bad row
+    only fails its own request. A batch can fail after some of its side
+    effects happened (e.g. part of an insert), so predict_many must be safe to
+    call again for the same rows; PredictionService keys each saved row by a
+    request id assigned on submit.
+    """
+
+    def __init__(self, predict_many: Callable[[List], List], max_batch_size: int = 64,
+                 max_wait_ms: float = 5, max_queue_size: int = 10000):
+        self.predict_many = predict_many
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._counters = {"rows": 0, "batches": 0, "full_batches": 0, "failed_batches": 0,
+                          "rejected": 0, "max_queue_depth": 0}
+        self._wait_seconds = 0.0
+        self._predict_seconds = 0.0
+
+        self._worker = threading.Thread(target=self._loop, name="prediction-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, row) -> Future:
+        """Queue one row; the future resolves to its prediction"""
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Prediction batcher is shut down")
+            if len(self._queue) >= self.max_queue_size:
+                self._counters["rejected"] += 1
+                raise HTTPException(status_code=503, detail="Prediction queue is full")
+            self._queue.append((row, future, time.monotonic()))
+            self._counters["max_queue_depth"] = max(self._counters["max_queue_depth"], len(self._queue))
+            self._cond.notify()
+        return future
+
+    def predict(self, row):
+        return self.submit(row).result()
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting rows; queued rows are still scored"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if wait:
+            self._worker.join()
+
+    def _next_batch(self) -> List:
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return []
+
+            # Give concurrent requests up to max_wait after the oldest row to join
+            deadline = self._queue[0][2] + self.max_wait
+            while len(self._queue) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._run(batch)
+
+    def _run(self, batch: List):
+        started = time.monotonic()
+        rows = [row for row, _, _ in batch]
+        failed = False
+        try:
+            outcomes = [(True, result) for result in self.predict_many(rows)]
+        except Exception as e:
+            failed = True
+            outcomes = [(False, e)] if len(rows) == 1 else [self._predict_one(row) for row in rows]
+
+        # Metrics are updated before callers are woken up
+        with self._cond:
+            self._counters["rows"] += len(batch)
+            self._counters["batches"] += 1
+            self._counters["full_batches"] += len(batch) == self.max_batch_size
+            self._counters["failed_batches"] += failed
+            self._wait_seconds += sum(started - enqueued_at for _, _, enqueued_at in batch)
+            self._predict_seconds += time.monotonic() - started
+
+        for (_, future, _), (ok, value) in zip(batch, outcomes):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _predict_one(self, row):
+        try:
+            return True, self.predict_many([row])[0]
+        except Exception as e:
+            return False, e
+
+    def stats(self) -> Dict:
+        with self._cond:
+            batches = self._counters["batches"]
+            rows = self._counters["rows"]
+            return {
+                **self._counters,
+                "queue_depth": len(self._queue),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "avg_batch_size": rows / batches if batches else 0.0,
+                "avg_wait_ms": self._wait_seconds * 1000 / rows if rows else 0.0,
+                "avg_predict_ms": self._predict_seconds * 1000 / batches if batches else 0.0,
+            }
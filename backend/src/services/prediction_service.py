@@ -1,75 +1,124 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
 from src.repositories.prediction_repository import PredictionRepository
 from src.schemas.prediction_schema import PredictionInput, PredictionOutput
-import joblib
+from src.services.prediction_batcher import PredictionBatcher
+from src.stores.model_registry import model_registry
+from src.core.config import settings
 import numpy as np
+from bson import ObjectId
 from fastapi import HTTPException
 import os
-import pandas as pd
-import warnings
-import pickle
-from catboost import CatBoostClassifier, Pool
+
+# Model feature column -> PredictionInput field, in the order the model was trained on
+FEATURES = {
+    "Gender": "gender",
+    "Age": "age",
+    "Occupation": "occupation",
+    "Sleep Duration": "sleepDuration",
+    "Quality of Sleep": "sleepQuality",
+    "Physical Activity Level": "physicalActivityLevel",
+    "Stress Level": "stressLevel",
+    "BMI Category": "bmiCategory",
+    "Heart Rate": "heartRate",
+    "Daily Steps": "dailySteps",
+    "Systolic_BP": "systolicBP",
+    "Diastolic_BP": "diastolicBP",
+}
+
+NO_SLEEP_DISORDER = 'No Sleep Disorder Detected'
+
+
+def _load_model(model_path: str):
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model file '{model_path}' not found")
+
+    # catboost is imported on first use, not at application startup
+    from catboost import CatBoostClassifier
+    return CatBoostClassifier().load_model(model_path)
 
 
 class PredictionService:
-    def __init__(self, db):
+    """
+    Sleep disorder predictions with a CatBoost classifier. The model is
+    borrowed from the model registry, so it is read from disk once per
+    process however many services use it.
+
+    With batching enabled, single-row predict() calls go through a
+    PredictionBatcher so that concurrent requests share one model call and
+    one insert. Every row gets its document id when it is submitted, so when
+    the batcher retries the rows of a failed batch one by one, rows the
+    batch already saved are not inserted twice.
+    """
+
+    def __init__(self, db, model_path: str = None):
         self.repository = PredictionRepository(db)
-        model_path = "src/models/catBoost.keras"
-        
-        if not os.path.exists(model_path):
-            raise FileNotFoundError(f"Model file '{model_path}' not found")
-        
-        self.model = CatBoostClassifier()
+        model_path = model_path or settings.PREDICTION_MODEL_PATH
+        self._model_key = model_registry.key("prediction", "catboost", model_path)
+        self.model = model_registry.acquire(self._model_key, lambda: _load_model(model_path))
 
-        self.model = self.model.load_model(model_path)
+        self.batcher: Optional[PredictionBatcher] = None
+        if settings.PREDICTION_BATCHING_ENABLED:
+            self.batcher = PredictionBatcher(
+                self._predict_requests,
+                max_batch_size=settings.PREDICTION_BATCH_MAX_SIZE,
+                max_wait_ms=settings.PREDICTION_BATCH_MAX_WAIT_MS,
+                max_queue_size=settings.PREDICTION_QUEUE_MAX_SIZE
+            )
 
+    def close(self):
+        if self.batcher:
+            self.batcher.shutdown()
+        model_registry.release(self._model_key)
 
     def predict(self , data : PredictionInput) -> PredictionOutput:
+        if self.batcher:
+            return self.batcher.predict((ObjectId(), data))
+        return self.predict_many([data])[0]
+
+    async def apredict(self, data: PredictionInput) -> PredictionOutput:
+        """Async predict; waits for the batch without holding a worker thread"""
+        if self.batcher:
+            return await asyncio.wrap_future(self.batcher.submit((ObjectId(), data)))
+        return (await asyncio.to_thread(self.predict_many, [data]))[0]
+
+    def predict_many(self, rows: List[PredictionInput]) -> List[PredictionOutput]:
+        """Score all rows with one predict call and save them with one insert"""
+        return self._predict_requests([(ObjectId(), row) for row in rows])
+
+    def _predict_requests(self, requests: List[Tuple[ObjectId, PredictionInput]]) -> List[PredictionOutput]:
+        """Score (request id, row) pairs and save each under its request id"""
+        if not requests:
+            return []
+        import pandas as pd
+        request_ids = [request_id for request_id, _ in requests]
+        rows = [row for _, row in requests]
+        try:
+            features = pd.DataFrame(
+                [{column: getattr(row, field) for column, field in FEATURES.items()} for row in rows],
+                columns=list(FEATURES)
+            )
+            predicted = self._labels(self.model.predict(features), len(rows))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
+
         try:
-            
-            features =[
-                    "Gender",
-                    "Age",
-                    "Occupation",
-                    "Sleep Duration",
-                    "Quality of Sleep",
-                    "Physical Activity Level",
-                    "Stress Level",
-                    "BMI Category",
-                    "Heart Rate",
-                    "Daily Steps",
-                    "Systolic_BP",           
-                    "Diastolic_BP", 
-                ]
-
-            test_data = pd.DataFrame([{
-                    "Gender": data.gender,
-                    "Age": data.age,
-                    "Occupation": data.occupation,
-                    "Sleep Duration": data.sleepDuration,
-                    "Quality of Sleep": data.sleepQuality,
-                    "Physical Activity Level": data.physicalActivityLevel,
-                    "Stress Level": data.stressLevel,
-                    "BMI Category": data.bmiCategory,
-                    "Heart Rate": data.heartRate,
-                    "Daily Steps": data.dailySteps,
-                    "Systolic_BP": data.systolicBP,           
-                    "Diastolic_BP": data.diastolicBP, 
-                }])
-            
-            # print(test_data)
-            test_data = test_data[features]
-            prediction = self.model.predict(test_data)
-            predicted_sleep_discord = str(prediction[0][0])
-            
-            if predicted_sleep_discord =='None':
-                predicted_sleep_discord = 'No Sleep Disorder Detected'
-            
-            self.repository.save_prediction(data.dict(), predicted_sleep_discord)
-            
-            return PredictionOutput(predictedSleep=predicted_sleep_discord)
-        
+            self.repository.save_predictions([row.dict() for row in rows], predicted, request_ids)
         except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-        
+            raise HTTPException(status_code=500, detail=f"Saving predictions failed: {e}")
+
+        return [PredictionOutput(predictedSleep=label) for label in predicted]
+
+    @staticmethod
+    def _labels(prediction, count: int) -> List[str]:
+        # Multiclass predict returns one [label] row per input
+        labels = np.asarray(prediction, dtype=object).reshape(count, -1)[:, 0]
+        return [NO_SLEEP_DISORDER if str(label) == 'None' else str(label) for label in labels]
+
+    def stats(self) -> Dict:
+        return {
+            "batching": self.batcher.stats() if self.batcher else None,
+        }
+
     def get_all_predictions(self):
-        return self.repository.get_all_predictions()
\ No newline at end of file
+        return self.repository.get_all_predictions()
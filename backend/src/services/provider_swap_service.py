@@ -0,0 +1,134 @@
+import uuid
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from src.services.rag_service import RAGService
+from src.stores.model_registry import model_registry
+from src.core.config import settings
+
+
+class ProviderSwapService:
+    """
+    Replaces the running RAGService without downtime. A swap job builds the
+    new service in the background (loading its providers through the model
+    registry), checks that it answers, then swaps settings.rag_service in
+    one assignment. Requests that already hold the old service finish on
+    it; once it is idle it is closed and the models no service uses any
+    more are unloaded. If it is still busy after drain_timeout the job
+    completes with drained=False and the old service is closed later, as
+    soon as its last request finishes.
+
+    Swaps run one at a time. Job states: queued, warming, checking,
+    draining, completed, failed.
+    """
+
+    QUEUED = "queued"
+    WARMING = "warming"
+    CHECKING = "checking"
+    DRAINING = "draining"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(self, db, drain_timeout: float = None, check_llm: bool = None):
+        self.db = db
+        self.drain_timeout = drain_timeout if drain_timeout is not None else settings.PROVIDER_SWAP_DRAIN_TIMEOUT
+        self.check_llm = check_llm if check_llm is not None else settings.PROVIDER_SWAP_CHECK_LLM
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="provider-swap")
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, providers: Dict[str, str], on_swapped=None, on_failed=None) -> Dict:
+        """
+        Schedule a swap to the given llm/embedding/vectordb providers.
+        on_swapped(providers) is called right after the new service goes live,
+        on_failed(error) when the new service could not be built or checked.
+        """
+        swap_id = f"swap_{uuid.uuid4().hex}"
+        job = {
+            "swap_id": swap_id,
+            "status": self.QUEUED,
+            "providers": dict(providers),
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[swap_id] = job
+        self.executor.submit(self._run, swap_id, on_swapped, on_failed)
+        return self.get_job(swap_id)
+
+    def get_job(self, swap_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(swap_id)
+            return dict(job) if job else None
+
+    def shutdown(self, wait: bool = False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _update(self, swap_id: str, status: str, **fields):
+        with self._lock:
+            self._jobs[swap_id].update(status=status, updated_at=datetime.utcnow(), **fields)
+
+    def _run(self, swap_id: str, on_swapped, on_failed):
+        providers = self.get_job(swap_id)["providers"]
+        service = None
+        try:
+            self._update(swap_id, self.WARMING)
+            service = RAGService(
+                self.db,
+                llm_provider=providers.get("llm_provider"),
+                embedding_provider=providers.get("embedding_provider"),
+                vectordb_provider=providers.get("vectordb_provider")
+            )
+
+            self._update(swap_id, self.CHECKING)
+            checks = service.check_ready(check_llm=self.check_llm)
+        except Exception as e:
+            print(f"❌ Provider swap {swap_id} failed: {e}")
+            if service:
+                service.close()
+            model_registry.unload_unused()
+            self._update(swap_id, self.FAILED, error=str(e))
+            if on_failed:
+                on_failed(str(e))
+            return
+
+        # Requests that already picked up the old service keep using it
+        previous, settings.rag_service = settings.rag_service, service
+        if on_swapped:
+            on_swapped(providers)
+        self._update(swap_id, self.DRAINING, checks_ms=checks, swapped_at=datetime.utcnow())
+        print(f"🔁 Provider swap {swap_id}: new service is live")
+
+        drained = True
+        unloaded = []
+        if previous:
+            drained = previous.wait_idle(self.drain_timeout)
+            if drained:
+                unloaded = self._retire(previous)
+            else:
+                # Still in use: close it only once the last request or job lets go
+                print(f"⏳ Provider swap {swap_id}: previous service still busy, closing it when idle")
+                threading.Thread(
+                    target=self._retire_when_idle, args=(swap_id, previous),
+                    name="provider-swap-retire", daemon=True
+                ).start()
+        self._update(
+            swap_id, self.COMPLETED,
+            drained=drained,
+            unloaded=unloaded,
+            completed_at=datetime.utcnow()
+        )
+
+    def _retire(self, service: RAGService) -> List[Dict]:
+        """Close an idle service and unload the models nothing uses any more"""
+        service.close()
+        return [{"kind": kind, "provider": provider, "model": model_name}
+                for kind, provider, model_name, _ in model_registry.unload_unused()]
+
+    def _retire_when_idle(self, swap_id: str, service: RAGService):
+        service.wait_idle()
+        unloaded = self._retire(service)
+        with self._lock:
+            self._jobs[swap_id].update(unloaded=unloaded, retired_at=datetime.utcnow())
@@ -1,18 +1,44 @@
 # src/services/rag_service.py
 import os
-from typing import Optional, List
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+import uuid
+import hashlib
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Callable, Iterable, Iterator, Tuple, AsyncIterator
 from datetime import datetime
 from src.repositories.pdf_repository import PDFRepository
 from src.repositories.conversations_repository import ConversationRepository
 from src.repositories.messages_repository import MessagesRepository
 from src.repositories.chunk_repository import ChunkRepository
+from src.repositories.blob_repository import BlobRepository
 from src.stores.llm.llm_factory import LLMFactory
+from src.stores.llm.semantic_cache import SemanticAnswerCache
 from src.stores.embedding.embedding_factory import EmbeddingFactory
+from src.stores.embedding.cached_embedding import CachedEmbedding
 from src.stores.vectordb.vectordb_factory import VectorDBFactory
+from src.stores.model_registry import model_registry
+from src.stores.lexical.bm25_index import BM25Index, reciprocal_rank_fusion
+from src.stores.reranker.cross_encoder_reranker import CrossEncoderReranker
 from src.core.pdf_service import PDFService
+from src.core.prompt_budget import PromptBudget
+from src.services.summary_service import ConversationSummarizer
 from src.core.config import settings
 
 
+def _batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Group an iterable into lists of at most `size` items"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
 class RAGService:
     def __init__(self, db, llm_provider: str = None, embedding_provider: str = None, 
                  vectordb_provider: str = None):
@@ -21,7 +47,24 @@ class RAGService:
         self.conversation_repo = ConversationRepository(db)
         self.message_repo = MessagesRepository(db)
         self.chunk_repo = ChunkRepository(db)
+        self.blob_repo = BlobRepository(db)
         
+        # Requests currently using this service, so a replaced service can drain
+        self._active = 0
+        self._usage = threading.Condition()
+        
+        # Providers borrowed so far; given back if the rest of the setup fails
+        self._leases = []
+        self.summarizer = None
+        self._stage_executor = None
+        try:
+            self._setup(db, llm_provider, embedding_provider, vectordb_provider)
+        except BaseException:
+            self.close()
+            raise
+
+    def _setup(self, db, llm_provider: Optional[str], embedding_provider: Optional[str],
+               vectordb_provider: Optional[str]):
         # Initialize factories
         llm_prov = llm_provider or settings.LLM_PROVIDER
         emb_prov = embedding_provider or settings.EMBEDDING_PROVIDER
@@ -31,56 +74,328 @@ class RAGService:
         print(emb_prov)
         print(vec_prov)
         
-        self.llm = LLMFactory.create(
-            llm_prov, 
-            settings.GEMINI_API_KEY if llm_prov == "gemini" else None
+        # Providers are borrowed from the process-wide registry, so they are
+        # loaded once however many services are created
+        self.llm = self._borrow(
+            "llm", llm_prov, None, {},
+            lambda: LLMFactory.create(
+                llm_prov, 
+                settings.GEMINI_API_KEY if llm_prov == "gemini" else None,
+                stream_timeout=settings.LLM_STREAM_TIMEOUT
+            )
         )
-        self.embedding = EmbeddingFactory.create(
-            emb_prov,
-            settings.GEMINI_API_KEY if emb_prov == "gemini" else None
+        emb_model = settings.EMBEDDING_MODEL if emb_prov == "huggingface" else None
+        self.embedding = self._borrow(
+            "embedding", emb_prov, emb_model, {"cache": settings.EMBEDDING_CACHE_ENABLED},
+            lambda: EmbeddingFactory.create(
+                emb_prov,
+                settings.GEMINI_API_KEY if emb_prov == "gemini" else None,
+                **({"model_name": emb_model} if emb_model else {})
+            )
         )
-        self.vectordb = VectorDBFactory.create(
-            vec_prov,
-            api_key=settings.PINECONE_API_KEY if vec_prov == "pinecone" else None
+        self.vectordb = self._borrow(
+            "vectordb", vec_prov, None, {},
+            lambda: VectorDBFactory.create(
+                vec_prov,
+                api_key=settings.PINECONE_API_KEY if vec_prov == "pinecone" else None
+            )
         )
+        # Stored chunk embeddings are only reused with the provider and model
+        # that made them ("." would nest the Mongo field path)
+        model_name = getattr(self.embedding, "model_name", None) or "default"
+        self.embedding_key = f"{emb_prov}:{model_name}".replace(".", "_")
         
-        # Initialize PDF service
-        self.pdf_service = PDFService()
-
-    def upload_pdf(self, pdf_path: str, conversation_id: Optional[str] = None) -> str:
-        """Process and upload a PDF file"""
-        # Extract and process text
-        text = self.pdf_service.extract_text(pdf_path)
-        chunks = self.pdf_service.split_text(text)
+        # Lexical index kept alongside the vector store for hybrid retrieval
+        self.lexical_index = self._borrow(
+            "lexical", "bm25", settings.LEXICAL_INDEX_PATH, {},
+            lambda: BM25Index(settings.LEXICAL_INDEX_PATH)
+        )
+        self.retrieval_mode = settings.RETRIEVAL_MODE
         
-        # Generate embeddings
-        embeddings = self.embedding.embed(chunks)
+        # Optional rerank of over-fetched candidates
+        self.reranker = self._borrow(
+            "reranker", "cross-encoder", settings.RERANK_MODEL,
+            {"batch_size": settings.RERANK_BATCH_SIZE, "cache_size": settings.RERANK_CACHE_SIZE},
+            lambda: CrossEncoderReranker(
+                settings.RERANK_MODEL,
+                batch_size=settings.RERANK_BATCH_SIZE,
+                cache_size=settings.RERANK_CACHE_SIZE
+            )
+        ) if settings.RERANK_ENABLED else None
         
-        # Generate PDF ID
-        pdf_id = f"pdf_{datetime.now().timestamp()}"
+        # Answers of near-identical questions, reused while their chunks are unchanged
+        self.answer_cache = SemanticAnswerCache(
+            threshold=settings.ANSWER_CACHE_THRESHOLD,
+            ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+            max_entries=settings.ANSWER_CACHE_SIZE
+        ) if settings.ANSWER_CACHE_ENABLED else None
+        
+        # Rolling conversation summaries, updated in the background
+        self.summarizer = ConversationSummarizer(
+            db, self.llm,
+            keep_recent=settings.SUMMARY_KEEP_RECENT,
+            fold_every=settings.SUMMARY_FOLD_EVERY,
+            max_words=settings.SUMMARY_MAX_WORDS
+        ) if settings.SUMMARY_ENABLED else None
         
-        # Save PDF to MongoDB
-        with open(pdf_path, 'rb') as f:
-            content = f.read()
-        filename = os.path.basename(pdf_path)
+        # Workers for the concurrent stages of the synchronous chat pipeline
+        self._stage_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix="chat-stage")
+        
+        # Token budget of generated prompts
+        self.prompt_budget = PromptBudget(
+            self.llm.count_tokens,
+            max_tokens=settings.PROMPT_MAX_TOKENS,
+            reserved_tokens=settings.PROMPT_RESERVED_TOKENS,
+            context_share=settings.PROMPT_CONTEXT_SHARE,
+            exact=self.llm.exact_token_count
+        )
         
-        self.pdf_repo.create(pdf_id, filename, content, conversation_id)
+        # Initialize PDF service
+        self.pdf_service = PDFService()
+
+    def _borrow(self, kind: str, provider: str, model_name: Optional[str], options: dict,
+                factory: Callable):
+        key = model_registry.key(kind, provider, model_name, options)
+        instance = model_registry.acquire(key, factory)
+        self._leases.append(key)
+        return instance
+    
+    @contextmanager
+    def in_use(self):
+        """Mark the service busy for the duration of a request or job"""
+        with self._usage:
+            self._active += 1
+        try:
+            yield self
+        finally:
+            with self._usage:
+                self._active -= 1
+                self._usage.notify_all()
+    
+    @property
+    def active_requests(self) -> int:
+        return self._active
+    
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no request uses the service; False if the timeout expired first"""
+        with self._usage:
+            return self._usage.wait_for(lambda: self._active == 0, timeout)
+    
+    def check_ready(self, check_llm: bool = False) -> dict:
+        """
+        Exercise the providers once: embed a probe text, search the vector
+        store and lexical index with it and, if check_llm, generate a reply.
+        Raises if any of them fails; returns the time each check took in ms.
+        """
+        timings = {}
+        probe = "readiness check"
+        embedding = self._timed(timings, "embedding", self.embedding.embed, [probe])[0]
+        if not len(embedding):
+            raise RuntimeError("Embedding provider returned an empty vector")
+        self._timed(timings, "vectordb", self.vectordb.search, embedding, 1)
+        self._timed(timings, "lexical_index", self.lexical_index.search, probe, 1)
+        if check_llm:
+            self._timed(timings, "llm", self.llm.generate, "Reply with OK.")
+        return timings
+    
+    def close(self):
+        """Stop background work and give the borrowed providers back to the registry"""
+        if self.summarizer:
+            self.summarizer.shutdown()
+        if self._stage_executor:
+            self._stage_executor.shutdown(wait=False)
+        for key in self._leases:
+            model_registry.release(key)
+        self._leases = []
+    
+    @staticmethod
+    def new_pdf_id() -> str:
+        """Generate a unique PDF ID"""
+        return f"pdf_{datetime.now().timestamp()}_{uuid.uuid4().hex[:8]}"
+
+    def upload_pdf(self, pdf_path: str, conversation_id: Optional[str] = None,
+                   pdf_id: Optional[str] = None, filename: Optional[str] = None,
+                   progress_callback: Optional[Callable[..., None]] = None) -> str:
+        """
+        Process and upload a PDF file as a stream: pages are extracted and
+        chunked incrementally, then embedded and upserted in fixed-size batches
+        so memory stays bounded regardless of document size.
+
+        Documents are deduplicated by the SHA-256 of their bytes: re-uploading a
+        file to the same scope returns the existing PDF ID, and a file already
+        indexed elsewhere is linked from its stored chunks without extraction.
+        Chunks are keyed by the hash of their text so each one is embedded once.
+        """
+        report = progress_callback or (lambda stage, progress, **fields: None)
+
+        # Generate PDF ID
+        pdf_id = pdf_id or self.new_pdf_id()
+        filename = filename or os.path.basename(pdf_path)
+
+        sha256 = BlobRepository.hash_file(pdf_path)
+        duplicate = self.pdf_repo.find_by_blob(sha256, conversation_id)
+        if duplicate:
+            report("duplicate", 1.0, duplicate_of=duplicate["pdf_id"])
+            return duplicate["pdf_id"]
+
+        source = self.pdf_repo.find_manifest_by_blob(sha256)
+        if source and self._chunks_available(source["chunks"]):
+            report("linking", 0.0, duplicate_of=source["pdf_id"])
+            batches = self._iter_manifest_batches(source["chunks"])
+            total_chunks = len(source["chunks"])
+            progress = lambda processed, page: processed / max(total_chunks, 1)
+        else:
+            report("extracting", 0.0)
+            total_pages = self.pdf_service.count_pages(pdf_path)
+            pages = self.pdf_service.iter_pages(pdf_path, total_pages)
+            chunks = self.pdf_service.iter_chunks(pages)
+            batches = _batched(chunks, settings.EMBEDDING_BATCH_SIZE)
+            progress = lambda processed, page: page / max(total_pages, 1)
+
+        manifest = []
+        processed_chunks = 0
+        for batch in batches:
+            texts = [text for text, _ in batch]
+
+            # Generate embeddings for chunks not embedded before
+            chunk_hashes, embeddings = self._embed_chunks(texts)
+
+            # Prepare metadata for vector DB
+            metadata = [
+                {
+                    "source": filename, 
+                    "pdf_id": pdf_id, 
+                    "conversation_id": conversation_id or "",
+                    "page": page
+                }
+                for _, page in batch
+            ]
+            ids = [f"{pdf_id}_chunk_{processed_chunks + i}" for i in range(len(batch))]
+
+            # Store in vector database and lexical index
+            self.vectordb.add_documents(texts, embeddings, metadata, ids)
+            self.lexical_index.add_documents(texts, metadata, ids)
+
+            manifest.extend([chunk_hash, page] for chunk_hash, (_, page) in zip(chunk_hashes, batch))
+            processed_chunks += len(batch)
+            report("embedding", min(progress(processed_chunks, batch[-1][1]), 0.99),
+                   processed_chunks=processed_chunks)
         
-        # Prepare metadata for vector DB
-        metadata = [
-            {
-                "source": filename, 
-                "pdf_id": pdf_id, 
-                "conversation_id": conversation_id or ""
-            }
-            for _ in chunks
-        ]
-        ids = [f"{pdf_id}_chunk_{i}" for i in range(len(chunks))]
+        # Save PDF bytes to the blob store and its metadata to MongoDB
+        report("storing", 0.99, processed_chunks=processed_chunks)
+        blob = self.blob_repo.upload_file(pdf_path, filename, sha256)
         
-        # Store in vector database
-        self.vectordb.add_documents(chunks, embeddings, metadata, ids)
+        self.pdf_repo.create(pdf_id, filename, blob["blob_id"], blob["size"],
+                             conversation_id, chunks=manifest)
+        report("indexed", 1.0, processed_chunks=processed_chunks)
         
         return pdf_id
+
+    def _embed_chunks(self, texts: List[str]) -> Tuple[List[str], List[List[float]]]:
+        """Embed chunk texts, reusing stored embeddings of identical chunks"""
+        chunk_hashes = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts]
+        texts_by_hash = dict(zip(chunk_hashes, texts))
+
+        stored = self.chunk_repo.find_by_hashes(list(texts_by_hash), self.embedding_key)
+        known = {
+            chunk_hash: doc["embeddings"][self.embedding_key]
+            for chunk_hash, doc in stored.items()
+            if self.embedding_key in doc.get("embeddings", {})
+        }
+
+        self.chunk_repo.touch(list(known))
+        missing = [chunk_hash for chunk_hash in texts_by_hash if chunk_hash not in known]
+        if missing:
+            new_embeddings = self.embedding.embed([texts_by_hash[h] for h in missing])
+            self.chunk_repo.save_embeddings(
+                [(h, texts_by_hash[h], emb) for h, emb in zip(missing, new_embeddings)],
+                self.embedding_key
+            )
+            known.update(zip(missing, new_embeddings))
+
+        return chunk_hashes, [known[chunk_hash] for chunk_hash in chunk_hashes]
+
+    def _chunks_available(self, manifest: List[List]) -> bool:
+        chunk_hashes = list({chunk_hash for chunk_hash, _ in manifest})
+        return self.chunk_repo.count_existing(chunk_hashes) == len(chunk_hashes)
+
+    def _iter_manifest_batches(self, manifest: List[List]) -> Iterator[List[Tuple[str, int]]]:
+        """Rebuild (text, page) batches of an indexed PDF from the chunk store"""
+        for entries in _batched(manifest, settings.EMBEDDING_BATCH_SIZE):
+            stored = self.chunk_repo.find_by_hashes(
+                list({chunk_hash for chunk_hash, _ in entries}), self.embedding_key
+            )
+            yield [(stored[chunk_hash]["text"], page) for chunk_hash, page in entries]
+    
+    def backfill_lexical_index(self) -> int:
+        """Add PDFs indexed before the lexical index existed; returns the chunks added"""
+        indexed = {chunk_id.rsplit("_chunk_", 1)[0] for chunk_id in self.lexical_index.list_ids()}
+        added = 0
+        for pdf in self.pdf_repo.iter_manifests():
+            if pdf["pdf_id"] in indexed:
+                continue
+            processed_chunks = 0
+            for batch in self._iter_manifest_batches(pdf["chunks"]):
+                metadata = [
+                    {
+                        "source": pdf["filename"],
+                        "pdf_id": pdf["pdf_id"],
+                        "conversation_id": pdf.get("conversation_id") or "",
+                        "page": page
+                    }
+                    for _, page in batch
+                ]
+                ids = [f"{pdf['pdf_id']}_chunk_{processed_chunks + i}" for i in range(len(batch))]
+                self.lexical_index.add_documents([text for text, _ in batch], metadata, ids)
+                processed_chunks += len(batch)
+            added += processed_chunks
+        return added
+    
+    def _retrieve(self, question: str, query_embedding: List[float], top_k: int,
+                  conversation_id: Optional[str]) -> List[dict]:
+        """Search the conversation and global documents, then rerank if enabled"""
+        started = time.perf_counter()
+        filter = self._scope_filter(conversation_id)
+        fetch_k = self._fetch_k(top_k)
+        if self.retrieval_mode != "hybrid":
+            results = self.vectordb.search(query_embedding, fetch_k, filter)
+        else:
+            candidates = max(fetch_k, settings.HYBRID_CANDIDATES)
+            dense = self.vectordb.search(query_embedding, candidates, filter)
+            lexical = self.lexical_index.search(question, candidates, filter)
+            results = reciprocal_rank_fusion([dense, lexical], fetch_k, settings.RRF_K)
+        return self._rerank(question, results, top_k, started)
+    
+    async def _aretrieve(self, question: str, query_embedding: List[float], top_k: int,
+                         conversation_id: Optional[str]) -> List[dict]:
+        started = time.perf_counter()
+        filter = self._scope_filter(conversation_id)
+        fetch_k = self._fetch_k(top_k)
+        if self.retrieval_mode != "hybrid":
+            results = await self.vectordb.asearch(query_embedding, fetch_k, filter)
+        else:
+            candidates = max(fetch_k, settings.HYBRID_CANDIDATES)
+            dense, lexical = await asyncio.gather(
+                self.vectordb.asearch(query_embedding, candidates, filter),
+                asyncio.to_thread(self.lexical_index.search, question, candidates, filter)
+            )
+            results = reciprocal_rank_fusion([dense, lexical], fetch_k, settings.RRF_K)
+        if not self.reranker:
+            return results[:top_k]
+        return await asyncio.to_thread(self._rerank, question, results, top_k, started)
+    
+    def _fetch_k(self, top_k: int) -> int:
+        """Number of candidates to retrieve; over-fetched when reranking"""
+        return max(top_k, settings.RERANK_CANDIDATES) if self.reranker else top_k
+    
+    def _rerank(self, question: str, results: List[dict], top_k: int, started: float) -> List[dict]:
+        """Keep the best top_k by cross-encoder score, unless that would exceed the latency budget"""
+        if not self.reranker:
+            return results[:top_k]
+        budget = None
+        if settings.RERANK_BUDGET_MS:
+            budget = settings.RERANK_BUDGET_MS / 1000 - (time.perf_counter() - started)
+        return self.reranker.rerank(question, results, top_k, budget)
     
     def query(self, question: str, conversation_id: Optional[str] = None, 
               top_k: int = 3) -> str:
@@ -88,19 +403,94 @@ class RAGService:
         # Embed question
         query_embedding = self.embedding.embed([question])[0]
         
-        # Search vector database
-        results = self.vectordb.search(query_embedding, top_k)
+        # Search within the conversation and global documents
+        results = self._retrieve(question, query_embedding, top_k, conversation_id)
         
-        # Filter by conversation if specified
-        if conversation_id:
-            results = [r for r in results 
-                      if r['metadata'].get('conversation_id') == conversation_id or r['metadata'].get('conversation_id') == ""]
+        # Reuse the answer of a similar question backed by the same chunks
+        cached = self._cached_answer(conversation_id, query_embedding, results)
+        if cached is not None:
+            return cached
+        
+        # Generate response
+        prompt, _ = self._build_query_prompt(question, results)
+        answer = self.llm.generate(prompt)
+        self._cache_answer(conversation_id, query_embedding, results, answer)
+        return answer
+    
+    async def aquery(self, question: str, conversation_id: Optional[str] = None, 
+                     top_k: int = 3) -> str:
+        """Query the RAG system without blocking the event loop"""
+        result = await self.aquery_with_usage(question, conversation_id, top_k)
+        return result["answer"]
+    
+    async def aquery_with_usage(self, question: str, conversation_id: Optional[str] = None, 
+                                top_k: int = 3) -> dict:
+        """
+        Like aquery, returning {"answer": ..., "prompt": usage}, where usage
+        describes the size of the prompt sent (None for a cached answer).
+        """
+        query_embedding, results = await self._aprepare_query(question, conversation_id, top_k)
+        cached = self._cached_answer(conversation_id, query_embedding, results)
+        if cached is not None:
+            return {"answer": cached, "prompt": None}
         
-        # Build context
-        context = "\n\n".join([r['text'] for r in results])
+        prompt, usage = self._build_query_prompt(question, results)
+        answer = await self.llm.agenerate(prompt)
+        self._cache_answer(conversation_id, query_embedding, results, answer)
+        return {"answer": answer, "prompt": usage}
+    
+    async def astream_query(self, question: str, conversation_id: Optional[str] = None, 
+                            top_k: int = 3) -> AsyncIterator[str]:
+        """Query the RAG system, yielding the answer as it is generated"""
+        query_embedding, results = await self._aprepare_query(question, conversation_id, top_k)
+        cached = self._cached_answer(conversation_id, query_embedding, results)
+        if cached is not None:
+            yield cached
+            return
         
+        prompt, _ = self._build_query_prompt(question, results)
+        pieces = []
+        async for piece in self.llm.astream(prompt):
+            pieces.append(piece)
+            yield piece
+        self._cache_answer(conversation_id, query_embedding, results, "".join(pieces))
+    
+    async def _aprepare_query(self, question: str, conversation_id: Optional[str],
+                              top_k: int) -> Tuple[List[float], List[dict]]:
+        query_embedding = (await self.embedding.aembed([question]))[0]
+        results = await self._aretrieve(question, query_embedding, top_k, conversation_id)
+        return query_embedding, results
+    
+    def _cached_answer(self, conversation_id: Optional[str], query_embedding: List[float],
+                       results: List[dict]) -> Optional[str]:
+        if not self.answer_cache or not results:
+            return None
+        return self.answer_cache.lookup(conversation_id or "", query_embedding,
+                                        [r["id"] for r in results])
+    
+    def _cache_answer(self, conversation_id: Optional[str], query_embedding: List[float],
+                      results: List[dict], answer: str):
+        if self.answer_cache and results:
+            self.answer_cache.put(conversation_id or "", query_embedding, results, answer)
+    
+    @staticmethod
+    def _scope_filter(conversation_id: Optional[str]) -> Optional[dict]:
+        """Vector store filter for a conversation's documents plus global ones"""
+        if not conversation_id:
+            return None
+        return {"conversation_id": [conversation_id, ""]}
+    
+    def _build_query_prompt(self, question: str, results: List[dict]) -> Tuple[str, dict]:
+        """Prompt with as many of the best chunks as fit the token budget, and its size"""
+        context, _, usage = self.prompt_budget.fit(self._render_query_prompt(question, ""), results)
+        prompt = self._render_query_prompt(question, "\n\n".join(context))
+        usage["prompt_tokens"] = self.llm.count_tokens(prompt)
+        return prompt, usage
+    
+    @staticmethod
+    def _render_query_prompt(question: str, context: str) -> str:
         # Generate prompt
-        prompt = f"""
+        return f"""
             You are an expert driving assistant knowledgeable about driving laws, road safety, and car maintenance.
 
             Use ONLY the context below to answer. 
@@ -116,56 +506,206 @@ class RAGService:
             Provide a short, accurate, and helpful answer in one paragraph. 
             If it's a legal question, mention what driving law or rule applies.
         """
-        print(prompt)
-        # return ""
-        
-        # Generate response
-        return self.llm.generate(prompt)
     
     def chat(self, conversation_id: str, message: str, top_k: int = 3, 
              history_limit: int = 20) -> dict:
-        """Chat with context and history"""
-        # Save user message
-        user_msg_id = self.message_repo.create(conversation_id, "user", message)
-        
-        # Get query embedding and search
-        query_embedding = self.embedding.embed([message])[0]
-        results = self.vectordb.search(query_embedding, top_k)
-        
-        # Filter by conversation
-        results = [r for r in results 
-                  if r['metadata'].get('conversation_id') == conversation_id]
-        
-        # Build context
-        context = "\n\n".join([r['text'] for r in results])
+        """
+        Chat with context and history. Saving the user message, retrieval and
+        the history fetch are independent, so they run concurrently.
+        """
+        timings = {}
+        started = time.perf_counter()
         
-        # Get conversation history
-        history = self.message_repo.find_by_conversation(
-            conversation_id, limit=history_limit, ascending=True
+        # Save user message, search the conversation and global documents and
+        # get the conversation summary and latest turns, all at once
+        save = self._stage_executor.submit(
+            self._timed, timings, "save_user_message",
+            self.message_repo.save_messages, conversation_id, "user", message
+        )
+        retrieve = self._stage_executor.submit(
+            self._timed, timings, "retrieve",
+            self._embed_and_retrieve, message, top_k, conversation_id
+        )
+        load_history = self._stage_executor.submit(
+            self._timed, timings, "history",
+            self._load_history, conversation_id, history_limit
         )
+        user_msg_id, results, (summary, recent) = save.result(), retrieve.result(), load_history.result()
         
         # Build prompt with history and context
-        prompt = self._build_prompt_with_history_and_context(history, context, message)
+        history = self._without_message(recent, user_msg_id, history_limit)
+        prompt, usage = self._timed(timings, "prompt", self._build_chat_prompt, message, results, history, summary)
         
         # Generate answer
-        answer = self.llm.generate(prompt)
+        answer = self._timed(timings, "generate", self.llm.generate, prompt)
         
         # Save assistant message
-        assistant_msg_id = self.message_repo.create(conversation_id, "assistant", answer)
+        assistant_msg_id = self._timed(
+            timings, "save_answer", self.message_repo.save_messages, conversation_id, "assistant", answer
+        )
+        self._schedule_summary(conversation_id)
+        timings["total"] = self._elapsed_ms(started)
+        
+        return {
+            "user_message_id": user_msg_id,
+            "assistant_message_id": assistant_msg_id,
+            "answer": answer,
+            "prompt": usage,
+            "debug": {"timings_ms": timings},
+        }
+    
+    async def achat(self, conversation_id: str, message: str, top_k: int = 3, 
+                    history_limit: int = 20) -> dict:
+        """Chat with context and history without blocking the event loop"""
+        started = time.perf_counter()
+        user_msg_id, prompt, usage, timings = await self._aprepare_chat(
+            conversation_id, message, top_k, history_limit
+        )
+        answer = await self._atimed(timings, "generate", self.llm.agenerate(prompt))
+        
+        assistant_msg_id = await self._atimed(timings, "save_answer", asyncio.to_thread(
+            self.message_repo.save_messages, conversation_id, "assistant", answer
+        ))
+        self._schedule_summary(conversation_id)
+        timings["total"] = self._elapsed_ms(started)
         
         return {
             "user_message_id": user_msg_id,
             "assistant_message_id": assistant_msg_id,
             "answer": answer,
+            "prompt": usage,
+            "debug": {"timings_ms": timings},
         }
     
+    async def astream_chat(self, conversation_id: str, message: str, top_k: int = 3, 
+                           history_limit: int = 20) -> AsyncIterator[dict]:
+        """
+        Chat with context and history, yielding {"event": "token", "data": text}
+        items as the answer is generated. Once generation completes the answer is
+        saved and a final {"event": "done", "data": {...message ids}} is yielded.
+        """
+        started = time.perf_counter()
+        user_msg_id, prompt, usage, timings = await self._aprepare_chat(
+            conversation_id, message, top_k, history_limit
+        )
+        
+        pieces = []
+        generation_started = time.perf_counter()
+        async for piece in self.llm.astream(prompt):
+            if not pieces:
+                timings["first_token"] = self._elapsed_ms(started)
+            pieces.append(piece)
+            yield {"event": "token", "data": piece}
+        timings["generate"] = self._elapsed_ms(generation_started)
+        answer = "".join(pieces)
+        
+        assistant_msg_id = await self._atimed(timings, "save_answer", asyncio.to_thread(
+            self.message_repo.save_messages, conversation_id, "assistant", answer
+        ))
+        self._schedule_summary(conversation_id)
+        timings["total"] = self._elapsed_ms(started)
+        yield {"event": "done", "data": {
+            "user_message_id": user_msg_id,
+            "assistant_message_id": assistant_msg_id,
+            "answer": answer,
+            "prompt": usage,
+            "debug": {"timings_ms": timings},
+        }}
+    
+    async def _aprepare_chat(self, conversation_id: str, message: str, top_k: int,
+                             history_limit: int) -> Tuple[str, str, dict, dict]:
+        """
+        Save the user message and build the chat prompt. The user message
+        insert, embed + search and history fetch run concurrently; returns
+        (user message id, prompt, prompt usage, stage timings in ms).
+        """
+        timings = {}
+        user_msg_id, results, (summary, recent) = await asyncio.gather(
+            self._atimed(timings, "save_user_message", asyncio.to_thread(
+                self.message_repo.save_messages, conversation_id, "user", message
+            )),
+            self._atimed(timings, "retrieve", self._aembed_and_retrieve(message, top_k, conversation_id)),
+            self._atimed(timings, "history", asyncio.to_thread(
+                self._load_history, conversation_id, history_limit
+            ))
+        )
+        
+        history = self._without_message(recent, user_msg_id, history_limit)
+        prompt, usage = self._timed(timings, "prompt", self._build_chat_prompt, message, results, history, summary)
+        return user_msg_id, prompt, usage, timings
+    
+    def _embed_and_retrieve(self, message: str, top_k: int,
+                            conversation_id: Optional[str]) -> List[dict]:
+        query_embedding = self.embedding.embed([message])[0]
+        return self._retrieve(message, query_embedding, top_k, conversation_id)
+    
+    async def _aembed_and_retrieve(self, message: str, top_k: int,
+                                   conversation_id: Optional[str]) -> List[dict]:
+        query_embedding = (await self.embedding.aembed([message]))[0]
+        return await self._aretrieve(message, query_embedding, top_k, conversation_id)
+    
+    def _load_history(self, conversation_id: str, limit: int) -> Tuple[Optional[str], List[dict]]:
+        """
+        Rolling summary of the conversation and the latest messages not folded
+        into it. One extra message is fetched, as the message being answered
+        may or may not be among them.
+        """
+        summary = self.conversation_repo.find_summary(conversation_id) or {}
+        messages = self.message_repo.find_recent(
+            conversation_id, limit=limit + 1, after=summary.get("summarized_through")
+        )
+        return summary.get("summary"), messages
+    
+    @staticmethod
+    def _without_message(messages: List[dict], message_id: str, limit: int) -> List[dict]:
+        """Latest `limit` messages, without the message being answered"""
+        history = [m for m in messages if str(m.get("_id")) != message_id]
+        return history[-limit:] if limit > 0 else []
+    
+    @staticmethod
+    def _elapsed_ms(started: float) -> float:
+        return round((time.perf_counter() - started) * 1000, 2)
+    
+    def _timed(self, timings: dict, stage: str, fn: Callable, *args):
+        """Call fn, recording its duration in timings[stage]"""
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            timings[stage] = self._elapsed_ms(started)
+    
+    async def _atimed(self, timings: dict, stage: str, awaitable):
+        """Await awaitable, recording its duration in timings[stage]"""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[stage] = self._elapsed_ms(started)
+    
+    def _schedule_summary(self, conversation_id: str):
+        if self.summarizer:
+            self.summarizer.schedule(conversation_id)
+    
+    def _build_chat_prompt(self, message: str, results: List[dict], history: List[dict],
+                           summary: Optional[str] = None) -> Tuple[str, dict]:
+        """Prompt with the latest turns and best chunks that fit the token budget, and its size"""
+        template = self._build_prompt_with_history_and_context([], "", message, summary)
+        context, history, usage = self.prompt_budget.fit(template, results, history)
+        
+        prompt = self._build_prompt_with_history_and_context(history, "\n\n".join(context), message, summary)
+        usage["prompt_tokens"] = self.llm.count_tokens(prompt)
+        usage["summary"] = bool(summary)
+        return prompt, usage
+    
     def _build_prompt_with_history_and_context(self, history: List[dict], 
-                                              context: str, question: str) -> str:
-        """Build a prompt with conversation history and context"""
+                                              context: str, question: str,
+                                              summary: Optional[str] = None) -> str:
+        """Build a prompt with conversation summary, recent history and context"""
         history_str = "\n".join([f"{m['role'].upper()}: {m['content']}" for m in history])
+        summary_str = f"Conversation Summary:\n            {summary}\n\n            " if summary else ""
         
         prompt = f"""
-            Conversation History:
+            {summary_str}Conversation History:
             {history_str}
 
             Context:
@@ -177,29 +717,25 @@ class RAGService:
         """
         return prompt
     
-    # def get_conversation_pdfs(self, conversation_id: str) -> List:
-    #     """Get all PDFs for a conversation"""
-    #     return self.pdf_repo.find_by_conversation(conversation_id)
-    
-    # def get_global_pdfs(self) -> List:
-    #     """Get all global PDFs"""
-    #     return self.pdf_repo.find_global_pdfs()
-    
-    # def delete_pdf(self, pdf_id: str):
-    #     """Delete a PDF"""
-    #     self.pdf_repo.delete(pdf_id)
-    #     # TODO: Also delete from vector DB
-    
     def get_statistics(self) -> dict:
         """Get system statistics"""
         conversations = self.conversation_repo.find_all()
-        global_pdfs = self.pdf_repo.find_global_pdfs()
+        global_pdfs = self.pdf_repo.count_global()
         total_pdfs = self.pdf_repo.count_all()
         
-        return {
+        statistics = {
             "total_conversations": len(conversations),
             "total_pdfs": total_pdfs,
-            "global_pdfs": len(global_pdfs),
-            "conversation_pdfs": total_pdfs - len(global_pdfs)
+            "global_pdfs": global_pdfs,
+            "conversation_pdfs": total_pdfs - global_pdfs
         }
+        statistics["retrieval_mode"] = self.retrieval_mode
+        statistics["lexical_index_chunks"] = self.lexical_index.count()
+        if isinstance(self.embedding, CachedEmbedding):
+            statistics["embedding_cache"] = self.embedding.stats()
+        if self.reranker:
+            statistics["reranker"] = self.reranker.stats()
+        if self.answer_cache:
+            statistics["answer_cache"] = self.answer_cache.stats()
+        return statistics
 
@@ -0,0 +1,108 @@
+import threading
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from src.repositories.conversations_repository import ConversationRepository
+from src.repositories.messages_repository import MessagesRepository
+from src.stores.llm.llm_interface import LLMInterface, FALLBACK_ANSWER
+
+
+class ConversationSummarizer:
+    """
+    Keeps a rolling summary of each conversation on its document. Once more
+    than keep_recent + fold_every messages follow the summary, everything but
+    the latest keep_recent is folded into it with one LLM call that rewrites
+    the previous summary together with the new messages.
+
+    Summaries are computed on a background worker; schedule() only queues
+    the conversation, so chat requests never wait for them.
+    """
+
+    def __init__(self, db, llm: LLMInterface, keep_recent: int = 6, fold_every: int = 10,
+                 max_words: int = 250):
+        self.conversation_repo = ConversationRepository(db)
+        self.message_repo = MessagesRepository(db)
+        self.llm = llm
+        self.keep_recent = keep_recent
+        self.fold_every = fold_every
+        self.max_words = max_words
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversation-summary")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def schedule(self, conversation_id: str):
+        """Queue a summary update; a conversation is queued at most once at a time"""
+        with self._lock:
+            if conversation_id in self._pending:
+                return
+            self._pending.add(conversation_id)
+        self.executor.submit(self._run, conversation_id)
+
+    def shutdown(self, wait: bool = False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, conversation_id: str):
+        with self._lock:
+            self._pending.discard(conversation_id)
+        try:
+            self.update(conversation_id)
+        except Exception as e:
+            print(f"❌ Summary of conversation {conversation_id} failed: {e}")
+
+    def update(self, conversation_id: str) -> bool:
+        """Fold old messages into the summary if enough have accumulated; returns True if updated"""
+        current = self.conversation_repo.find_summary(conversation_id)
+        if current is None:
+            return False
+        through = current.get("summarized_through")
+        messages = self.message_repo.find_after(conversation_id, through)
+        if len(messages) <= self.keep_recent + self.fold_every:
+            return False
+
+        folded = messages[:len(messages) - self.keep_recent]
+        prompt = self._build_prompt(current.get("summary"), folded)
+        summary = self._clean(prompt, self.llm.generate(prompt))
+        if summary is None:
+            # Keep the watermark so these messages stay in the prompt and are folded next time
+            print(f"⚠️ Discarded an unusable summary of conversation {conversation_id}")
+            return False
+        updated = self.conversation_repo.update_summary(
+            conversation_id, summary, folded[-1]["_id"], len(folded), previous_through=through
+        )
+        if updated:
+            print(f"📝 Folded {len(folded)} messages into the summary of {conversation_id}")
+        return updated
+
+    @staticmethod
+    def _clean(prompt: str, output: Optional[str]) -> Optional[str]:
+        """
+        The summary text of an LLM reply, or None if the reply is unusable:
+        empty, the provider's fallback answer, or the prompt echoed back.
+        """
+        text = (output or "").strip()
+        # Hugging Face text-generation pipelines return the prompt followed by the completion
+        if text.startswith(prompt.strip()):
+            text = text[len(prompt.strip()):].strip()
+        for label in ("Answer:", "Summary:"):
+            if text.startswith(label):
+                text = text[len(label):].strip()
+        if not text or text == FALLBACK_ANSWER:
+            return None
+        if "New messages:" in text or "Summary of the conversation so far:" in text:
+            return None
+        return text
+
+    def _build_prompt(self, summary: Optional[str], messages: List[Dict]) -> str:
+        transcript = "\n".join(f"{m['role'].upper()}: {m['content']}" for m in messages)
+        return f"""
+            Context:
+            Summary of the conversation so far:
+            {summary or "(none)"}
+
+            New messages:
+            {transcript}
+
+            Question: Rewrite the summary so it also covers the new messages. Keep the user's
+            goals, facts they stated (vehicle, location, situation) and the conclusions reached.
+            Use at most {self.max_words} words and reply with the summary only.
+        """
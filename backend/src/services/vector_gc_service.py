@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+from src.repositories.pdf_repository import PDFRepository
+from src.repositories.chunk_repository import ChunkRepository
+from src.repositories.ingestion_job_repository import IngestionJobRepository
+from src.stores.vectordb.vectordb_interface import VectorDBInterface
+from src.stores.lexical.bm25_index import BM25Index
+from src.core.config import settings
+
+
+def _batches(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class VectorGarbageCollector:
+    """
+    Removes chunk vectors whose PDF document no longer exists, e.g. PDFs
+    deleted before vector deletion was wired in or uploads that failed after
+    their vectors were written, then compacts the vector store. The lexical
+    index, which holds the same chunk ids, is swept the same way.
+
+    The content-addressed chunk store is swept too: chunks no PDF manifest
+    references are deleted once no upload has used them for
+    CHUNK_GC_GRACE_HOURS (or since the oldest unfinished ingestion job).
+    """
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, db, vectordb: Optional[VectorDBInterface],
+                 lexical_index: Optional[BM25Index] = None):
+        self.pdf_repo = PDFRepository(db)
+        self.chunk_repo = ChunkRepository(db)
+        self.job_repo = IngestionJobRepository(db)
+        self.vectordb = vectordb
+        self.lexical_index = lexical_index
+
+    @staticmethod
+    def pdf_id_of(chunk_id: str) -> str:
+        return chunk_id.rsplit("_chunk_", 1)[0]
+
+    def run(self) -> Dict:
+        if self.vectordb is None:
+            raise RuntimeError("No vector store configured")
+
+        # Vectors of PDFs still being ingested have no PDF document yet
+        unfinished = self.job_repo.find_unfinished()
+        in_progress = {job["pdf_id"] for job in unfinished}
+
+        stats = self._collect(self.vectordb, in_progress)
+        print(f"🧹 Vector GC: {stats['orphaned']} orphaned of {stats['scanned']} vectors deleted")
+        if self.lexical_index is not None:
+            stats["lexical_index"] = self._collect(self.lexical_index, in_progress)
+
+        # Chunks of uploads still running are not in any manifest yet
+        cutoff = datetime.utcnow() - timedelta(hours=settings.CHUNK_GC_GRACE_HOURS)
+        if unfinished:
+            cutoff = min(cutoff, min(job["created_at"] for job in unfinished))
+        stats["chunk_store"] = self._collect_chunks(cutoff)
+        print(f"🧹 Chunk GC: {stats['chunk_store']['deleted']} unreferenced chunks deleted")
+        return stats
+
+    def _collect_chunks(self, cutoff: datetime) -> Dict:
+        referenced = set()
+        for pdf in self.pdf_repo.iter_manifests():
+            referenced.update(chunk_hash for chunk_hash, _ in pdf["chunks"])
+
+        scanned = 0
+        orphans: List[str] = []
+        for batch in _batches(self.chunk_repo.iter_ids_unused_since(cutoff), self.BATCH_SIZE):
+            scanned += len(batch)
+            orphans.extend(chunk_hash for chunk_hash in batch if chunk_hash not in referenced)
+
+        deleted = sum(self.chunk_repo.delete_unused(batch, cutoff) for batch in _batches(orphans, self.BATCH_SIZE))
+        return {"scanned": scanned, "orphaned": len(orphans), "deleted": deleted}
+
+    def _collect(self, store, in_progress: set) -> Dict:
+        scanned = 0
+        orphans: List[str] = []
+        for batch in _batches(store.list_ids(), self.BATCH_SIZE):
+            scanned += len(batch)
+            pdf_ids = {self.pdf_id_of(chunk_id) for chunk_id in batch} - in_progress
+            missing = pdf_ids - self.pdf_repo.existing_ids(list(pdf_ids))
+            orphans.extend(chunk_id for chunk_id in batch if self.pdf_id_of(chunk_id) in missing)
+
+        for batch in _batches(orphans, self.BATCH_SIZE):
+            store.delete(batch)
+
+        return {
+            "scanned": scanned,
+            "orphaned": len(orphans),
+            "deleted": len(orphans),
+            "compacted": store.compact()
+        }
@@ -0,0 +1,163 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from src.stores.embedding.embedding_interface import EmbeddingInterface
+
+
+class CachedEmbedding(EmbeddingInterface):
+    """
+    Caching decorator for any EmbeddingInterface.
+
+    Vectors are keyed by (provider, model, text hash) and looked up in an
+    in-process LRU first, then in a SQLite file holding float32 vectors. Only
+    texts missing from both tiers reach the wrapped provider. Both tiers are
+    size bounded and evict the least recently used entries.
+    """
+
+    def __init__(self, embedding: EmbeddingInterface, provider: str, model_name: str,
+                 memory_size: int = 10000, disk_path: Optional[str] = None,
+                 disk_size: int = 500000):
+        self.embedding = embedding
+        self.model_name = model_name
+        self.namespace = f"{provider}:{model_name}"
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._disk = None
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False, timeout=30)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._disk.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)"
+            )
+            self._disk.commit()
+            self._recount()
+
+    def __getattr__(self, name):
+        # Only called for missing attributes; without this guard a missing
+        # self.embedding (unpickling, copy, failed __init__) would recurse forever
+        if name == "embedding":
+            raise AttributeError(name)
+        # Expose provider specific helpers such as get_dimension()
+        return getattr(self.embedding, name)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory and key not in found:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self._counters["memory_hits"] += 1
+
+            disk_keys = list({key for key in keys if key not in found})
+            if disk_keys and self._disk is not None:
+                from_disk = self._disk_get(disk_keys)
+                self._counters["disk_hits"] += len(from_disk)
+                for key, vector in from_disk.items():
+                    found[key] = vector
+                    self._remember(key, vector)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            vectors = self.embedding.embed(list(missing.values()))
+            with self._lock:
+                self._counters["misses"] += len(missing)
+                for key, vector in zip(missing, vectors):
+                    found[key] = vector
+                    self._remember(key, vector)
+                if self._disk is not None:
+                    self._disk_put(list(zip(missing, vectors)))
+
+        return [found[key] for key in keys]
+
+    def _remember(self, key: str, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, List[float]]:
+        vectors = {}
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._disk.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            for key, blob in rows:
+                vectors[key] = array("f", blob).tolist()
+            if rows:
+                self._disk.execute(
+                    f"UPDATE embeddings SET last_access = ? WHERE key IN ({placeholders})",
+                    [time.time(), *batch]
+                )
+        self._disk.commit()
+        return vectors
+
+    def _recount(self):
+        (self._disk_rows,) = self._disk.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        self._added_since_count = 0
+
+    def _disk_put(self, items: List[tuple]):
+        now = time.time()
+        # Keys are content hashes, so a row another thread stored meanwhile is identical
+        added = max(self._disk.executemany(
+            "INSERT OR IGNORE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)",
+            [(key, array("f", vector).tobytes(), now) for key, vector in items]
+        ).rowcount, 0)
+        self._disk_rows += added
+        self._added_since_count += added
+
+        # The running count only sees this process's inserts. Other processes
+        # sharing the file add rows too, so the table is recounted before
+        # evicting and after every tenth of the capacity added here; eviction
+        # goes down to that margin below the capacity so recounts stay rare.
+        margin = max(1, self.disk_size // 10)
+        if self._disk_rows > self.disk_size or self._added_since_count >= margin:
+            self._recount()
+        if self._disk_rows > self.disk_size:
+            evicted = self._disk.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_access LIMIT ?)",
+                (self._disk_rows - (self.disk_size - margin),)
+            ).rowcount
+            self._disk_rows -= evicted
+            self._counters["evictions"] += evicted
+        self._disk.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                "namespace": self.namespace,
+                **self._counters,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_rows if self._disk is not None else 0,
+            }
@@ -1,12 +1,31 @@
 from src.stores.embedding.embedding_interface import EmbeddingInterface
-from src.stores.embedding.providers import GeminiEmbedding , HuggingFaceEmbedding
+from src.stores.embedding.cached_embedding import CachedEmbedding
+from src.core.config import settings
 
 class EmbeddingFactory:
     @staticmethod
     def create(provider: str, api_key: str = None, **kwargs) -> EmbeddingInterface:
+        # Only the selected provider module (and its SDK) is imported
         if provider == "gemini":
-            return GeminiEmbedding(api_key)
+            from src.stores.embedding.providers.gemini_embedding import GeminiEmbedding
+            embedding = GeminiEmbedding(
+                api_key,
+                batch_size=settings.GEMINI_EMBED_BATCH_SIZE,
+                max_concurrency=settings.GEMINI_EMBED_CONCURRENCY
+            )
         elif provider == "huggingface":
-            return HuggingFaceEmbedding(api_key, kwargs.get("model_name", "all-MiniLM-L6-v2"))
+            from src.stores.embedding.providers.huggingface_embedding import HuggingFaceEmbedding
+            embedding = HuggingFaceEmbedding(api_key, kwargs.get("model_name", "all-MiniLM-L6-v2"))
         else:
             raise ValueError(f"Unknown embedding provider: {provider}")
+
+        if not kwargs.get("cache", settings.EMBEDDING_CACHE_ENABLED):
+            return embedding
+        return CachedEmbedding(
+            embedding,
+            provider,
+            embedding.model_name,
+            memory_size=settings.EMBEDDING_CACHE_MEMORY_SIZE,
+            disk_path=settings.EMBEDDING_CACHE_PATH or None,
+            disk_size=settings.EMBEDDING_CACHE_DISK_SIZE
+        )
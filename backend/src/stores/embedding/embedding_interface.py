@@ -1,7 +1,12 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List
 
 class EmbeddingInterface(ABC):
     @abstractmethod
     def embed(self, texts: List[str]) -> List[List[float]]:
-        pass
\ No newline at end of file
+        pass
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Async embedding; blocking providers run in a worker thread"""
+        return await asyncio.to_thread(self.embed, texts)
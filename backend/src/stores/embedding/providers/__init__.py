@@ -1,2 +1,16 @@
-from .gemini_embedding import GeminiEmbedding
-from .huggingface_embedding import HuggingFaceEmbedding
\ No newline at end of file
+import importlib
+
+# Provider modules pull in heavy SDKs (sentence_transformers, google.generativeai);
+# they are only imported when one of their classes is first accessed.
+_PROVIDERS = {
+    "GeminiEmbedding": ".gemini_embedding",
+    "HuggingFaceEmbedding": ".huggingface_embedding",
+}
+
+__all__ = list(_PROVIDERS)
+
+
+def __getattr__(name):
+    if name not in _PROVIDERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_PROVIDERS[name], __name__), name)
@@ -1,18 +1,96 @@
+import time
+import random
+import threading
 import google.generativeai as genai
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+from google.api_core import exceptions as google_exceptions
 from src.stores.embedding.embedding_interface import EmbeddingInterface
 
+
+def _is_rate_limited(error: Exception) -> bool:
+    if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)):
+        return True
+    return getattr(error, "code", None) == 429 or "quota" in str(error).lower()
+
+
+class _AdaptiveLimiter:
+    """
+    Bounds the number of requests in flight. The bound is halved when the API
+    reports a quota error and grows back by one slot per window of successes.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        with self._condition:
+            while self.in_flight >= max(1, int(self.limit)):
+                self._condition.wait()
+            self.in_flight += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        with self._condition:
+            self.limit = min(self.max_concurrency, self.limit + 1 / max(self.limit, 1))
+            self._condition.notify_all()
+
+    def on_throttled(self):
+        with self._condition:
+            self.limit = max(1.0, self.limit / 2)
+
+
 class GeminiEmbedding(EmbeddingInterface):
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-    
+    def __init__(self, api_key: str, model_name: str = "models/embedding-001",
+                 batch_size: int = 100, max_concurrency: int = 4, max_retries: int = 6,
+                 embed_fn: Optional[Callable] = None):
+        """
+        Gemini embeddings sent as batched requests, with up to max_concurrency
+        batches in flight. Quota errors shrink the concurrency and are retried
+        with exponential backoff. embed_fn replaces genai.embed_content, e.g.
+        with a local fake of the endpoint.
+        """
+        if embed_fn is None:
+            genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self._embed_fn = embed_fn or genai.embed_content
+        self._limiter = _AdaptiveLimiter(max_concurrency)
+
     def embed(self, texts: List[str]) -> List[List[float]]:
-        embeddings = []
-        for text in texts:
-            result = genai.embed_content(
-                model="models/embedding-001",
-                content=text,
-                task_type="retrieval_document"
-            )
-            embeddings.append(result['embedding'])
-        return embeddings
\ No newline at end of file
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) <= 1:
+            return [emb for batch in batches for emb in self._embed_batch(batch)]
+
+        workers = min(len(batches), self._limiter.max_concurrency)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(self._embed_batch, batches)
+            return [emb for batch in results for emb in batch]
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._limiter:
+                    result = self._embed_fn(
+                        model=self.model_name,
+                        content=batch,
+                        task_type="retrieval_document"
+                    )
+                self._limiter.on_success()
+                return result['embedding']
+            except Exception as e:
+                if not _is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                self._limiter.on_throttled()
+                delay = min(60.0, 2 ** attempt) * (0.5 + random.random())
+                print(f"⚠️ Gemini embedding quota hit, retrying in {delay:.1f}s")
+                time.sleep(delay)
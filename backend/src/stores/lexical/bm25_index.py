@@ -0,0 +1,317 @@
+import os
+import re
+import json
+import math
+import hashlib
+import threading
+from collections import Counter
+from typing import List, Dict, Optional, Iterable, Iterator
+from src.stores.vectordb.vectordb_interface import matches_filter
+
+
+_TOKEN_RE = re.compile(r"\w+(?:[./\-]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word tokens. Compound tokens such as "12.3", "r-32" or
+    "2019/45" are kept whole so verbatim article numbers and drug names match
+    exactly, and their parts are indexed too.
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(part for part in re.split(r"[./\-]", token) if part)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: List[List[Dict]], top_k: int, k: int = 60) -> List[Dict]:
+    """
+    Merge ranked result lists by summing 1 / (k + rank) per id. Each result
+    keeps the fields of its first occurrence; "score" becomes the fused score.
+    """
+    fused: Dict[str, Dict] = {}
+    for ranking in rankings:
+        for rank, result in enumerate(ranking, start=1):
+            entry = fused.setdefault(result["id"], {**result, "score": 0.0})
+            entry["score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda result: -result["score"])[:top_k]
+
+
+def _read_line(reader, offset: int, size: int) -> Dict:
+    """One JSON line of a docs file, read without moving the handle's position"""
+    return json.loads(os.pread(reader.fileno(), size, offset))
+
+
+class _Partition:
+    """
+    Inverted index of one conversation (or of the global documents).
+
+    On disk a partition is a JSON line per document with its id, text,
+    metadata and term frequencies (docs.jsonl), and the rows deleted since the
+    last compaction (tombstones.jsonl). compact() writes the next generation
+    of both files and switches partition.json to it last. Postings are
+    rebuilt in memory on load.
+    """
+
+    def __init__(self, directory: str, key: str):
+        self.directory = directory
+        self.key = key
+        self.manifest_path = os.path.join(directory, "partition.json")
+
+        os.makedirs(directory, exist_ok=True)
+        self.generation = 0
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.generation = json.load(f).get("generation", 0)
+        else:
+            self._write_manifest()
+        self._load()
+
+    def _paths(self, generation: int):
+        prefix = f"{generation}." if generation else ""
+        return tuple(os.path.join(self.directory, prefix + name)
+                     for name in ("docs.jsonl", "tombstones.jsonl"))
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"key": self.key, "generation": self.generation}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _load(self):
+        self.docs_path, self.tombstones_path = self._paths(self.generation)
+        self.ids: List[str] = []
+        self.metadata: List[Dict] = []
+        self.offsets: List[int] = []
+        self.sizes: List[int] = []
+        self.lengths: List[int] = []
+        self.terms: List[List[str]] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.row_of: Dict[str, int] = {}
+        self.total_length = 0
+
+        if os.path.exists(self.docs_path):
+            with open(self.docs_path, "r+b") as f:
+                offset = 0
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        # Partial line left by a crash
+                        f.truncate(offset)
+                        break
+                    self._index(row["id"], row["metadata"], row["tf"], offset, len(line))
+                    offset += len(line)
+        else:
+            open(self.docs_path, "ab").close()
+
+        # Tombstones hold row numbers, which stay stable until compaction
+        if os.path.exists(self.tombstones_path):
+            with open(self.tombstones_path) as f:
+                for line in f:
+                    row = int(line)
+                    if row < len(self.ids) and self.row_of.get(self.ids[row]) == row:
+                        self._unindex(row)
+
+        # Kept open so that hits are read without reopening the file. A search
+        # still holding the previous generation's handle keeps it readable
+        # until it is done; the handle is closed once nothing references it.
+        self.reader = open(self.docs_path, "rb")
+
+    def _index(self, row_id: str, metadata: Dict, tf: Dict[str, int], offset: int, size: int):
+        # Re-adding an existing id replaces it
+        if row_id in self.row_of:
+            self._unindex(self.row_of[row_id])
+        row = len(self.ids)
+        self.ids.append(row_id)
+        self.metadata.append(metadata)
+        self.offsets.append(offset)
+        self.sizes.append(size)
+        self.terms.append(list(tf))
+        length = sum(tf.values())
+        self.lengths.append(length)
+        self.total_length += length
+        self.row_of[row_id] = row
+        for term, count in tf.items():
+            self.postings.setdefault(term, {})[row] = count
+
+    def _unindex(self, row: int):
+        del self.row_of[self.ids[row]]
+        self.total_length -= self.lengths[row]
+        for term in self.terms[row]:
+            postings = self.postings[term]
+            del postings[row]
+            if not postings:
+                del self.postings[term]
+        self.terms[row] = []
+
+    @property
+    def size(self) -> int:
+        return len(self.row_of)
+
+    def append(self, ids: List[str], texts: List[str], metadata: List[Dict]):
+        with open(self.docs_path, "ab") as f:
+            offset = f.tell()
+            for row_id, text, meta in zip(ids, texts, metadata):
+                tf = dict(Counter(tokenize(text)))
+                line = (json.dumps({"id": row_id, "text": text, "metadata": meta, "tf": tf}) + "\n").encode("utf-8")
+                f.write(line)
+                self._index(row_id, meta, tf, offset, len(line))
+                offset += len(line)
+
+    def delete(self, ids: Iterable[str]) -> int:
+        rows = [self.row_of[row_id] for row_id in ids if row_id in self.row_of]
+        if not rows:
+            return 0
+        with open(self.tombstones_path, "a") as f:
+            for row in rows:
+                self._unindex(row)
+                f.write(f"{row}\n")
+        return len(rows)
+
+    def span(self, row: int):
+        """Handle, offset and size of a document's line, for _read_line"""
+        return self.reader, self.offsets[row], self.sizes[row]
+
+    def compact(self) -> int:
+        """Rewrite the partition without deleted documents"""
+        removed = len(self.ids) - self.size
+        if not removed:
+            return 0
+
+        # The new generation only becomes current once it is fully written, so
+        # a crash never pairs old tombstone row numbers with renumbered docs
+        previous = self._paths(self.generation)
+        docs_path, tombstones_path = self._paths(self.generation + 1)
+        with open(docs_path, "wb") as dst:
+            for row in sorted(self.row_of.values()):
+                dst.write(os.pread(self.reader.fileno(), self.sizes[row], self.offsets[row]))
+        open(tombstones_path, "w").close()
+        self.generation += 1
+        self._write_manifest()
+
+        for path in previous:
+            if os.path.exists(path):
+                os.remove(path)
+        self._load()
+        return removed
+
+
+class BM25Index:
+    def __init__(self, path: str = "./lexical_index", k1: float = 1.5, b: float = 0.75):
+        """
+        Persistent BM25 inverted index over chunk texts, partitioned by
+        conversation_id like the NumPy vector store. Documents are appended
+        incrementally; a lookup only touches the postings of the query terms
+        in the selected partitions.
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.partitions: Dict[str, _Partition] = {}
+        self._lock = threading.RLock()
+
+        os.makedirs(path, exist_ok=True)
+        for name in sorted(os.listdir(path)):
+            partition_file = os.path.join(path, name, "partition.json")
+            if os.path.exists(partition_file):
+                with open(partition_file) as f:
+                    key = json.load(f)["key"]
+                self.partitions[key] = _Partition(os.path.join(path, name), key)
+
+    def _partition(self, key: str) -> _Partition:
+        if key not in self.partitions:
+            name = "global" if key == "" else "conv_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+            self.partitions[key] = _Partition(os.path.join(self.path, name), key)
+        return self.partitions[key]
+
+    def _selected_partitions(self, filter: Optional[Dict]) -> List[_Partition]:
+        if not filter or "conversation_id" not in filter:
+            return list(self.partitions.values())
+        keys = filter["conversation_id"]
+        keys = keys if isinstance(keys, (list, tuple, set)) else [keys]
+        return [self.partitions[key or ""] for key in keys if (key or "") in self.partitions]
+
+    def add_documents(self, texts: List[str], metadata: List[Dict], ids: List[str]):
+        with self._lock:
+            groups: Dict[str, List[int]] = {}
+            for i, meta in enumerate(metadata):
+                groups.setdefault(meta.get("conversation_id") or "", []).append(i)
+            for key, rows in groups.items():
+                self._partition(key).append(
+                    [ids[i] for i in rows],
+                    [texts[i] for i in rows],
+                    [metadata[i] for i in rows]
+                )
+
+    def search(self, query: str, top_k: int, filter: Optional[Dict] = None) -> List[Dict]:
+        terms = set(tokenize(query))
+        with self._lock:
+            partitions = self._selected_partitions(filter)
+            if not terms or not partitions:
+                return []
+
+            # Corpus statistics over the searched partitions only
+            docs = sum(partition.size for partition in partitions)
+            if not docs:
+                return []
+            avg_length = sum(partition.total_length for partition in partitions) / docs
+            conditions = {field: value for field, value in (filter or {}).items()
+                          if field != "conversation_id"}
+
+            scores: Dict[tuple, float] = {}
+            for term in terms:
+                df = sum(len(partition.postings.get(term, ())) for partition in partitions)
+                if not df:
+                    continue
+                idf = math.log(1 + (docs - df + 0.5) / (df + 0.5))
+                for partition in partitions:
+                    for row, tf in partition.postings.get(term, {}).items():
+                        norm = self.k1 * (1 - self.b + self.b * partition.lengths[row] / max(avg_length, 1e-9))
+                        key = (partition.key, row)
+                        scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            hits = []
+            for (key, row), score in sorted(scores.items(), key=lambda item: -item[1]):
+                partition = self.partitions[key]
+                if conditions and not matches_filter(partition.metadata[row], conditions):
+                    continue
+                hits.append((partition.ids[row], partition.metadata[row], score, partition.span(row)))
+                if len(hits) == top_k:
+                    break
+
+        # Texts are read outside the lock; the handles stay valid across compaction
+        return [
+            {"id": row_id, "text": _read_line(*span)["text"], "metadata": metadata, "score": score}
+            for row_id, metadata, score, span in hits
+        ]
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            for partition in self.partitions.values():
+                partition.delete(ids)
+
+    def delete_by_metadata(self, filter: Dict):
+        with self._lock:
+            conditions = {field: value for field, value in filter.items() if field != "conversation_id"}
+            for partition in self._selected_partitions(filter):
+                partition.delete([
+                    row_id for row_id, row in list(partition.row_of.items())
+                    if matches_filter(partition.metadata[row], conditions)
+                ])
+
+    def list_ids(self) -> Iterator[str]:
+        with self._lock:
+            ids = [row_id for partition in self.partitions.values() for row_id in partition.row_of]
+        yield from ids
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(partition.size for partition in self.partitions.values())
+
+    def compact(self) -> int:
+        """Drop deleted documents from disk; returns the number removed"""
+        with self._lock:
+            return sum(partition.compact() for partition in self.partitions.values())
@@ -1,14 +1,18 @@
 from src.stores.llm.llm_interface import LLMInterface
-from src.stores.llm.providers import GeminiLLM , NgrokLLM , HuggingFaceTransformerLLM , HuggingFaceLLM
 
 class LLMFactory:
     @staticmethod
     def create(provider: str, api_key: str = None, **kwargs) -> LLMInterface:
+        # Only the selected provider module (and its SDK) is imported
         if provider == "gemini":
+            from src.stores.llm.providers.gemini_llm import GeminiLLM
             return GeminiLLM(api_key)
         elif provider == "ngrok":
+            from src.stores.llm.providers.ngrok_llm import NgrokLLM
             return NgrokLLM(kwargs.get("ngrok_url", "https://667dea226da7.ngrok-free.app"))
         elif provider == "huggingface":
-            return HuggingFaceTransformerLLM(api_key,kwargs.get("base_model", "unsloth/llama-3-8b-bnb-4bit") ,kwargs.get("adapter_model", "ihebmbarek/driver_model"))
+            from src.stores.llm.providers.huggingface_transformer_llm import HuggingFaceTransformerLLM
+            return HuggingFaceTransformerLLM(api_key,kwargs.get("base_model", "unsloth/llama-3-8b-bnb-4bit") ,kwargs.get("adapter_model", "ihebmbarek/driver_model"),
+                                             stream_timeout=kwargs.get("stream_timeout", 120))
         else:
             raise ValueError(f"Unknown LLM provider: {provider}")
@@ -1,6 +1,45 @@
+import re
+import asyncio
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterator
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+# What providers answer when they cannot (or fail to) produce a reply
+FALLBACK_ANSWER = "I'm not sure based on the context."
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast token estimate: ~4 characters per token, at least one per word or symbol"""
+    return max(len(text) // 4, len(_PIECE_RE.findall(text)))
+
 
 class LLMInterface(ABC):
+    # True when count_tokens uses the model's own tokenizer
+    exact_token_count = False
+
     @abstractmethod
     def generate(self, prompt: str) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    def count_tokens(self, text: str) -> int:
+        """Prompt tokens of text; estimated unless the provider has a local tokenizer"""
+        return estimate_tokens(text)
+
+    async def agenerate(self, prompt: str) -> str:
+        """Async generation; blocking providers run in a worker thread"""
+        return await asyncio.to_thread(self.generate, prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield the response as it is generated; providers without streaming yield it whole"""
+        yield self.generate(prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Async streaming; blocking iterators are advanced in a worker thread"""
+        iterator = self.stream(prompt)
+        done = object()
+        while True:
+            piece = await asyncio.to_thread(next, iterator, done)
+            if piece is done:
+                break
+            yield piece
@@ -1,4 +1,18 @@
-from .gemini_llm import GeminiLLM
-from .huggingface_llm import HuggingFaceLLM
-from .huggingface_transformer_llm import HuggingFaceTransformerLLM
-from .ngrok_llm import NgrokLLM
\ No newline at end of file
+import importlib
+
+# Provider modules pull in heavy SDKs (transformers, peft, google.generativeai);
+# they are only imported when one of their classes is first accessed.
+_PROVIDERS = {
+    "GeminiLLM": ".gemini_llm",
+    "HuggingFaceLLM": ".huggingface_llm",
+    "HuggingFaceTransformerLLM": ".huggingface_transformer_llm",
+    "NgrokLLM": ".ngrok_llm",
+}
+
+__all__ = list(_PROVIDERS)
+
+
+def __getattr__(name):
+    if name not in _PROVIDERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_PROVIDERS[name], __name__), name)
@@ -1,5 +1,6 @@
 import google.generativeai as genai
-from src.stores.llm.llm_interface import LLMInterface
+from typing import AsyncIterator, Iterator
+from src.stores.llm.llm_interface import LLMInterface, FALLBACK_ANSWER
 
 class GeminiLLM(LLMInterface):
     def __init__(self, api_key: str):
@@ -25,11 +26,55 @@ class GeminiLLM(LLMInterface):
     })
     
     def generate(self, prompt: str) -> str:
+        response = self.model.generate_content(self._split_prompt(prompt))
+        return self._parse_response(response)
+
+    async def agenerate(self, prompt: str) -> str:
+        """Native async call, no worker thread needed"""
+        response = await self.model.generate_content_async(self._split_prompt(prompt))
+        return self._parse_response(response)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        response = self.model.generate_content(self._split_prompt(prompt), stream=True)
+        streamed = False
+        for chunk in response:
+            text = self._chunk_text(chunk)
+            if text:
+                streamed = True
+                yield text
+        if not streamed:
+            yield FALLBACK_ANSWER
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Native async streaming, no worker thread needed"""
+        response = await self.model.generate_content_async(self._split_prompt(prompt), stream=True)
+        streamed = False
+        async for chunk in response:
+            text = self._chunk_text(chunk)
+            if text:
+                streamed = True
+                yield text
+        if not streamed:
+            yield FALLBACK_ANSWER
+
+    @staticmethod
+    def _chunk_text(chunk) -> str:
+        try:
+            if chunk.candidates and chunk.candidates[0].content and chunk.candidates[0].content.parts:
+                return "".join(part.text for part in chunk.candidates[0].content.parts)
+        except Exception as e:
+            print("❌ Error while parsing Gemini stream chunk:", e)
+        return ""
+
+    @staticmethod
+    def _split_prompt(prompt: str) -> list:
         parts = prompt.split("Question:", 1)
         context_block = parts[0] if parts else ""
         question_block = "Question:" + parts[1] if len(parts) == 2 else prompt
+        return [context_block.strip(), question_block.strip()]
 
-        response = self.model.generate_content([context_block.strip(), question_block.strip()])
+    @staticmethod
+    def _parse_response(response) -> str:
         print("response")
         print(response)
         print("response")
@@ -41,17 +86,16 @@ class GeminiLLM(LLMInterface):
                 and response.candidates[0].content.parts
             ):
                 text = response.candidates[0].content.parts[0].text.strip()
-                return text if text else  "I'm not sure based on the context."
+                return text if text else FALLBACK_ANSWER
             # ✅ Handle cases where generation was stopped or empty
             finish_reason = getattr(response.candidates[0], "finish_reason", None)
             print(f"⚠️ Gemini stopped early. Finish reason: {finish_reason}")
-            return "I'm not sure based on the context."
+            return FALLBACK_ANSWER
             
         except Exception as e:
             print("❌ Error while parsing Gemini response:", e)
-            return "I'm not sure based on the context."
+            return FALLBACK_ANSWER
 
         # return response.text.strip()        
         # response = self.model.generate_content(prompt)
         # return response.text
-    
\ No newline at end of file
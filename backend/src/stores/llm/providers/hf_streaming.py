@@ -0,0 +1,56 @@
+from queue import Empty
+from threading import Event, Thread
+from typing import Iterator
+from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+
+class _Cancelled(StoppingCriteria):
+    """Stops generate() once the consumer has gone away"""
+
+    def __init__(self, cancelled: Event):
+        self.cancelled = cancelled
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self.cancelled.is_set()
+
+
+def stream_generate(model, tokenizer, prompt: str, timeout: float, **generate_kwargs) -> Iterator[str]:
+    """
+    Run model.generate in a worker thread and yield decoded text as tokens
+    arrive. An exception raised by generate is re-raised here, and waiting
+    more than `timeout` seconds for the next piece raises TimeoutError, so
+    the caller never blocks forever. Generation stops when the consumer
+    stops iterating.
+    """
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True,
+                                    timeout=timeout)
+    inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+    cancelled = Event()
+    errors = []
+
+    def run():
+        try:
+            model.generate(**inputs, streamer=streamer,
+                           stopping_criteria=StoppingCriteriaList([_Cancelled(cancelled)]),
+                           **generate_kwargs)
+        except BaseException as e:
+            errors.append(e)
+            # Wake up the consumer, which then raises the error
+            streamer.end()
+
+    generation = Thread(target=run, name="llm-stream", daemon=True)
+    generation.start()
+    try:
+        try:
+            for text in streamer:
+                if errors:
+                    break
+                if text:
+                    yield text
+        except Empty:
+            raise TimeoutError(f"LLM produced no output for {timeout} s") from None
+        if errors:
+            raise errors[0]
+    finally:
+        cancelled.set()
+        generation.join(timeout)
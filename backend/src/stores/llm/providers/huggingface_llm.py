@@ -1,8 +1,13 @@
+from typing import Iterator
 from transformers import pipeline
 from src.stores.llm.llm_interface import LLMInterface
+from src.stores.llm.providers.hf_streaming import stream_generate
 
 class HuggingFaceLLM(LLMInterface):
-    def __init__(self, api_key: str = None, model_name: str = "ihebmbarek/llama3-healthcare-full"):
+    exact_token_count = True
+
+    def __init__(self, api_key: str = None, model_name: str = "ihebmbarek/llama3-healthcare-full",
+                 stream_timeout: float = 120):
         """
         Local LLM using Transformers pipeline.
         Popular models:
@@ -10,9 +15,11 @@ class HuggingFaceLLM(LLMInterface):
         - distilgpt2: Even faster, smaller
         - microsoft/DialoGPT-medium: Better for conversations
         - google/flan-t5-base: Instruction-following
+        stream_timeout: longest wait for the next streamed piece, in seconds
         """
         print(f"Using model: {model_name}")
         self.model_name = model_name
+        self.stream_timeout = stream_timeout
         self.pipeline = pipeline(
             "text-generation",
             model=model_name,
@@ -31,3 +38,19 @@ class HuggingFaceLLM(LLMInterface):
             num_return_sequences=1
         )
         return result[0]['generated_text']
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.pipeline.tokenizer.encode(text, add_special_tokens=False))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield decoded text as tokens are generated"""
+        return stream_generate(
+            self.pipeline.model,
+            self.pipeline.tokenizer,
+            prompt,
+            timeout=self.stream_timeout,
+            max_new_tokens=500,
+            do_sample=True,
+            temperature=0.7,
+            top_p=0.9
+        )
@@ -1,22 +1,29 @@
+from typing import Iterator
 from transformers import pipeline , AutoModelForCausalLM , AutoTokenizer
 from peft import PeftModel
 from src.stores.llm.llm_interface import LLMInterface
+from src.stores.llm.providers.hf_streaming import stream_generate
 
 class HuggingFaceTransformerLLM(LLMInterface):
+    exact_token_count = True
+
     def __init__(self, 
                 api_key: str = None,
                 base_model: str = "unsloth/llama-3-8b-bnb-4bit",
                 adapter_model:str = "ihebmbarek/driver_model", 
-                device: int = -1
+                device: int = -1,
+                stream_timeout: float = 120
                 ):
         """
         Local LLM using a base model + LoRA adapter.
         - base_model: The original large model (e.g. Llama 3)
         - adapter_model: Your LoRA fine-tuned adapter
+        - stream_timeout: longest wait for the next streamed piece, in seconds
         """
         print(f"🔹 Loading base model: {base_model}")
         print(f"🔹 Applying adapter: {adapter_model}")
 
+        self.stream_timeout = stream_timeout
         self.tokenizer = AutoTokenizer.from_pretrained(adapter_model)
 
         # load base model
@@ -51,3 +58,19 @@ class HuggingFaceTransformerLLM(LLMInterface):
             num_return_sequences=1
         )
         return result[0]['generated_text']
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.pipeline.tokenizer.encode(text, add_special_tokens=False))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield decoded text as tokens are generated"""
+        return stream_generate(
+            self.pipeline.model,
+            self.pipeline.tokenizer,
+            prompt,
+            timeout=self.stream_timeout,
+            max_new_tokens=500,
+            do_sample=True,
+            temperature=0.7,
+            top_p=0.9
+        )
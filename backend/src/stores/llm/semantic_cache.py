@@ -0,0 +1,128 @@
+import time
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class _Entry:
+    __slots__ = ("scope", "vector", "chunk_ids", "pdf_ids", "answer", "created_at")
+
+    def __init__(self, scope: str, vector: np.ndarray, chunk_ids: frozenset,
+                 pdf_ids: frozenset, answer: str):
+        self.scope = scope
+        self.vector = vector
+        self.chunk_ids = chunk_ids
+        self.pdf_ids = pdf_ids
+        self.answer = answer
+        self.created_at = time.monotonic()
+
+
+class SemanticAnswerCache:
+    """
+    Answers of previous questions, looked up by cosine similarity of the
+    question embedding. A cached answer is only reused when the question is
+    close enough (>= threshold), is in the same scope (conversation) and was
+    generated from the same set of retrieved chunks, so answers go stale as
+    soon as the documents behind them change.
+
+    Entries expire after ttl_seconds and the least recently used are evicted
+    beyond max_entries.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl_seconds: float = 3600,
+                 max_entries: int = 1000):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stale": 0, "expired": 0,
+                          "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _expire(self):
+        if not self.ttl_seconds:
+            return
+        deadline = time.monotonic() - self.ttl_seconds
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry.created_at < deadline]
+        for entry_id in expired:
+            del self._entries[entry_id]
+        self._counters["expired"] += len(expired)
+
+    def lookup(self, scope: str, question_embedding: List[float],
+               chunk_ids: List[str]) -> Optional[str]:
+        """Cached answer for a similar question backed by the same chunks, or None"""
+        query = self._normalize(question_embedding)
+        chunks = frozenset(chunk_ids)
+        with self._lock:
+            self._expire()
+            candidates = [(entry_id, entry) for entry_id, entry in self._entries.items()
+                          if entry.scope == scope and entry.vector.shape == query.shape]
+            if candidates:
+                similarities = np.stack([entry.vector for _, entry in candidates]) @ query
+                similar = [
+                    candidates[i] for i in np.argsort(-similarities)
+                    if similarities[i] >= self.threshold
+                ]
+                for entry_id, entry in similar:
+                    if entry.chunk_ids == chunks:
+                        self._entries.move_to_end(entry_id)
+                        self._counters["hits"] += 1
+                        return entry.answer
+                if similar:
+                    self._counters["stale"] += 1
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, scope: str, question_embedding: List[float], results: List[Dict], answer: str):
+        """Remember the answer generated from the retrieved results"""
+        entry = _Entry(
+            scope,
+            self._normalize(question_embedding),
+            frozenset(result["id"] for result in results),
+            frozenset(result["metadata"].get("pdf_id") for result in results),
+            answer
+        )
+        with self._lock:
+            self._entries[self._next_id] = entry
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def delete_by_metadata(self, filter: Dict):
+        """
+        Drop answers that used a PDF ({"pdf_id": ...}) or belong to a
+        conversation ({"conversation_id": ...}); same call as the chunk indexes.
+        """
+        pdf_id = filter.get("pdf_id")
+        conversation_id = filter.get("conversation_id")
+        with self._lock:
+            stale = [
+                entry_id for entry_id, entry in self._entries.items()
+                if (pdf_id is not None and pdf_id in entry.pdf_ids)
+                or (conversation_id is not None and entry.scope == conversation_id)
+            ]
+            for entry_id in stale:
+                del self._entries[entry_id]
+            self._counters["invalidations"] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
@@ -0,0 +1,117 @@
+import gc
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RegistryKey = Tuple[str, str, Optional[str], Tuple]
+
+
+class _Entry:
+    def __init__(self):
+        self.instance = None
+        self.refcount = 0
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded providers (LLMs, embedding models, vector
+    store clients, ...), keyed by (kind, provider, model name, options).
+
+    Services borrow an instance with acquire() and give it back with
+    release(); each distinct key is loaded once, however many services use
+    it. Instances stay loaded when their reference count drops to zero so
+    that re-creating a service is free; unload() and unload_unused() free
+    them explicitly.
+    """
+
+    def __init__(self):
+        self._entries: Dict[RegistryKey, _Entry] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, provider: str, model_name: Optional[str] = None,
+            options: Optional[Dict] = None) -> RegistryKey:
+        return kind, provider, model_name, tuple(sorted((options or {}).items()))
+
+    def acquire(self, key: RegistryKey, factory: Callable[[], Any]) -> Any:
+        """Return the instance for key, calling factory() only if it is not loaded yet"""
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            entry.refcount += 1
+
+        # Loads of different keys run in parallel; the same key loads once
+        try:
+            with entry.lock:
+                if entry.instance is None:
+                    started = time.perf_counter()
+                    entry.instance = factory()
+                    entry.load_seconds = time.perf_counter() - started
+                    entry.loaded_at = time.time()
+                    print(f"📦 Loaded {key[0]} {key[1]}:{key[2]} in {entry.load_seconds:.2f}s")
+                return entry.instance
+        except Exception:
+            with self._lock:
+                entry.refcount -= 1
+                if entry.instance is None and entry.refcount == 0:
+                    self._entries.pop(key, None)
+            raise
+
+    def release(self, key: RegistryKey):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.refcount > 0:
+                entry.refcount -= 1
+
+    def unload(self, key: RegistryKey, force: bool = False) -> bool:
+        """Drop a loaded instance; refused while it is borrowed unless force is set"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry.refcount > 0 and not force):
+                return False
+            del self._entries[key]
+            instance, entry.instance = entry.instance, None
+
+        close = getattr(instance, "close", None)
+        if callable(close):
+            close()
+        del instance
+        self._free_memory()
+        return True
+
+    def unload_unused(self) -> List[RegistryKey]:
+        """Unload every instance nobody is borrowing; returns their keys"""
+        with self._lock:
+            unused = [key for key, entry in self._entries.items()
+                      if entry.refcount == 0 and entry.instance is not None]
+        return [key for key in unused if self.unload(key)]
+
+    @staticmethod
+    def _free_memory():
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            return [
+                {
+                    "kind": kind,
+                    "provider": provider,
+                    "model": model_name,
+                    "options": dict(options),
+                    "refcount": entry.refcount,
+                    "loaded": entry.instance is not None,
+                    "load_seconds": entry.load_seconds,
+                }
+                for (kind, provider, model_name, options), entry in self._entries.items()
+            ]
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,105 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class CrossEncoderReranker:
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+                 batch_size: int = 32, cache_size: int = 10000, max_length: int = 512):
+        """
+        Reorders retrieved chunks by a cross-encoder relevance score computed on
+        CPU. All (query, chunk) pairs of a request are scored in one batched
+        predict call; scores are cached by (query hash, chunk id) in an LRU.
+        Popular models:
+        - cross-encoder/ms-marco-MiniLM-L-6-v2: Fast, English
+        - cross-encoder/mmarco-mMiniLMv2-L12-H384-v1: Multilingual
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        from sentence_transformers import CrossEncoder
+        self.model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+
+        self._cache: "OrderedDict[tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Moving average of the scoring cost of one pair, used for the latency budget
+        self._seconds_per_pair: Optional[float] = None
+        self._counters = {"reranked": 0, "skipped": 0, "cache_hits": 0, "scored_pairs": 0}
+
+    @staticmethod
+    def _query_hash(query: str) -> str:
+        return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+    def score(self, query: str, candidates: List[Dict]) -> List[float]:
+        """Relevance score of each candidate ({"id", "text", ...}) for the query"""
+        query_hash = self._query_hash(query)
+        keys = [(query_hash, candidate["id"]) for candidate in candidates]
+
+        scores: Dict[tuple, float] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[key] = self._cache[key]
+            self._counters["cache_hits"] += len(scores)
+
+        missing = [(key, candidate["text"]) for key, candidate in zip(keys, candidates) if key not in scores]
+        if missing:
+            started = time.perf_counter()
+            predicted = self.model.predict(
+                [(query, text) for _, text in missing],
+                batch_size=self.batch_size,
+                show_progress_bar=False
+            )
+            per_pair = (time.perf_counter() - started) / len(missing)
+            with self._lock:
+                self._seconds_per_pair = per_pair if self._seconds_per_pair is None \
+                    else 0.8 * self._seconds_per_pair + 0.2 * per_pair
+                self._counters["scored_pairs"] += len(missing)
+                for (key, _), score in zip(missing, predicted):
+                    scores[key] = float(score)
+                    self._cache[key] = float(score)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return [scores[key] for key in keys]
+
+    def estimate_seconds(self, query: str, candidates: List[Dict]) -> float:
+        """Expected scoring time of the candidates that are not cached"""
+        query_hash = self._query_hash(query)
+        with self._lock:
+            if self._seconds_per_pair is None:
+                return 0.0
+            uncached = sum((query_hash, candidate["id"]) not in self._cache for candidate in candidates)
+            return uncached * self._seconds_per_pair
+
+    def rerank(self, query: str, candidates: List[Dict], top_k: int,
+               budget_seconds: Optional[float] = None) -> List[Dict]:
+        """
+        Return the top_k candidates by cross-encoder score, each with a
+        "rerank_score" field. If scoring is expected to take longer than
+        budget_seconds, the candidates are returned in their retrieval order.
+        """
+        if len(candidates) <= 1:
+            return candidates[:top_k]
+        if budget_seconds is not None and self.estimate_seconds(query, candidates) > budget_seconds:
+            with self._lock:
+                self._counters["skipped"] += 1
+            return candidates[:top_k]
+
+        scores = self.score(query, candidates)
+        with self._lock:
+            self._counters["reranked"] += 1
+        ranked = sorted(zip(scores, range(len(candidates))), key=lambda item: -item[0])
+        return [{**candidates[i], "rerank_score": score} for score, i in ranked[:top_k]]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                **self._counters,
+                "cache_entries": len(self._cache),
+                "ms_per_pair": self._seconds_per_pair * 1000 if self._seconds_per_pair else None,
+            }
@@ -1,2 +1,18 @@
-from .chroma_db import ChromaDB
-from .pinecone_db import PineconeDB
\ No newline at end of file
+import importlib
+
+# Provider modules pull in heavy SDKs (chromadb, pinecone); they are only
+# imported when one of their classes is first accessed.
+_PROVIDERS = {
+    "ChromaDB": ".chroma_db",
+    "PineconeDB": ".pinecone_db",
+    "NumpyDB": ".numpy_db",
+    "HNSWDB": ".hnsw_db",
+}
+
+__all__ = list(_PROVIDERS)
+
+
+def __getattr__(name):
+    if name not in _PROVIDERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_PROVIDERS[name], __name__), name)
@@ -1,5 +1,5 @@
 import chromadb
-from typing import List, Dict
+from typing import List, Dict, Optional, Iterator
 from src.stores.vectordb.vectordb_interface import VectorDBInterface
 
 class ChromaDB(VectorDBInterface):
@@ -16,12 +16,42 @@ class ChromaDB(VectorDBInterface):
             ids=ids
         )
     
-    def search(self, query_embedding: List[float], top_k: int) -> List[Dict]:
+    @staticmethod
+    def _where(filter: Optional[Dict]) -> Optional[Dict]:
+        """Translate a metadata filter into a Chroma where clause"""
+        if not filter:
+            return None
+        clauses = [
+            {field: {"$in": list(value)} if isinstance(value, (list, tuple, set)) else value}
+            for field, value in filter.items()
+        ]
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def search(self, query_embedding: List[float], top_k: int,
+               filter: Optional[Dict] = None) -> List[Dict]:
         results = self.collection.query(
             query_embeddings=[query_embedding],
-            n_results=top_k
+            n_results=top_k,
+            where=self._where(filter)
         )
         return [
-            {"text": doc, "metadata": meta, "score": score}
-            for doc, meta, score in zip(results['documents'][0], results['metadatas'][0], results['distances'][0])
+            {"id": id, "text": doc, "metadata": meta, "score": score}
+            for id, doc, meta, score in zip(results['ids'][0], results['documents'][0],
+                                            results['metadatas'][0], results['distances'][0])
         ]
+
+    def delete(self, ids: List[str]):
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def delete_by_metadata(self, filter: Dict):
+        self.collection.delete(where=self._where(filter))
+
+    def list_ids(self, batch_size: int = 1000) -> Iterator[str]:
+        offset = 0
+        while True:
+            page = self.collection.get(include=[], limit=batch_size, offset=offset)
+            if not page['ids']:
+                return
+            yield from page['ids']
+            offset += len(page['ids'])
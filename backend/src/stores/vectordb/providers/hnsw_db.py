@@ -0,0 +1,373 @@
+import os
+import json
+import threading
+import numpy as np
+import hnswlib
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Iterator
+from src.stores.vectordb.vectordb_interface import VectorDBInterface, matches_filter
+
+
+class _ReadWriteLock:
+    """Many readers or one writer; used so searches and inserts run concurrently"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+class HNSWDB(VectorDBInterface):
+    def __init__(self, path: str = "./hnsw_index", M: int = 16, ef_construction: int = 200,
+                 ef_search: int = 64, snapshot_every: int = 10000, seed: int = 100):
+        """
+        Approximate nearest-neighbour index (hnswlib HNSW graph), using cosine
+        distance.
+        - M: links per node (2*M on the bottom layer); more links, better recall
+        - ef_construction: candidate list size while inserting
+        - ef_search: candidate list size while searching; the recall/latency knob
+        - snapshot_every: inserted rows between graph snapshots
+
+        Every insert and delete is appended to disk as it happens (vectors,
+        one JSON line per row, deleted row numbers), so nothing is lost
+        between snapshots. The graph snapshot only saves rebuilding on load:
+        rows added after it are re-inserted from the log. close() writes a
+        final snapshot.
+        """
+        self.path = path
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.snapshot_every = snapshot_every
+        self.seed = seed
+
+        self._rw = _ReadWriteLock()
+        self._lock = threading.Lock()  # row bookkeeping and log files
+
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    # ==================== persistence ====================
+
+    def _file(self, name: str, generation: Optional[int] = None) -> str:
+        return os.path.join(self.path, f"{self.generation if generation is None else generation}.{name}")
+
+    def _write_current(self):
+        tmp_file = os.path.join(self.path, "CURRENT.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"generation": self.generation, "dim": self.dim}, f)
+        os.replace(tmp_file, os.path.join(self.path, "CURRENT"))
+
+    def _load(self):
+        self.generation, self.dim = 0, None
+        current_file = os.path.join(self.path, "CURRENT")
+        if os.path.exists(current_file):
+            with open(current_file) as f:
+                current = json.load(f)
+            self.generation, self.dim = current["generation"], current["dim"]
+
+        self.ids: List[str] = []
+        self.metadata: List[Dict] = []
+        self.offsets: List[int] = []
+        self.deleted = set()
+        self.index = None
+        self._capacity = 0
+        self._pending = 0
+        self._unsaved = 0
+        if self.dim is None:
+            self.row_of: Dict[str, int] = {}
+            return
+
+        rows_file = self._file("rows.jsonl")
+        end = 0
+        if os.path.exists(rows_file):
+            with open(rows_file, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    row = json.loads(line)
+                    self.ids.append(row["id"])
+                    self.metadata.append(row["metadata"])
+                    self.offsets.append(end)
+                    end += len(line)
+
+        # A crash between the two appends leaves a partial row; drop it
+        vectors_file = self._file("vectors.f32")
+        vector_rows = os.path.getsize(vectors_file) // (4 * self.dim) if os.path.exists(vectors_file) else 0
+        n = min(len(self.ids), vector_rows)
+        if os.path.exists(rows_file):
+            os.truncate(rows_file, self.offsets[n] if n < len(self.offsets) else end)
+        del self.ids[n:], self.metadata[n:], self.offsets[n:]
+        if os.path.exists(vectors_file):
+            os.truncate(vectors_file, n * 4 * self.dim)
+
+        tombstones_file = self._file("tombstones")
+        if os.path.exists(tombstones_file):
+            with open(tombstones_file) as f:
+                self.deleted = {int(line) for line in f if line.strip() and int(line) < n}
+        self.row_of = {row_id: row for row, row_id in enumerate(self.ids) if row not in self.deleted}
+
+        # Graph from the snapshot, then the rows logged after it
+        self._capacity = max(1024, 2 * n)
+        self.index = hnswlib.Index(space="cosine", dim=self.dim)
+        snapshot_rows = 0
+        snapshot_file = self._file("snapshot.json")
+        if os.path.exists(snapshot_file):
+            with open(snapshot_file) as f:
+                snapshot_rows = json.load(f)["rows"]
+        if 0 < snapshot_rows <= n:
+            self.index.load_index(self._file("index.bin"), max_elements=self._capacity)
+        else:
+            snapshot_rows = 0
+            self.index.init_index(max_elements=self._capacity, ef_construction=self.ef_construction,
+                                  M=self.M, random_seed=self.seed)
+        if snapshot_rows < n:
+            vectors = np.memmap(vectors_file, dtype=np.float32, mode="r", shape=(n, self.dim))
+            self.index.add_items(np.array(vectors[snapshot_rows:]), np.arange(snapshot_rows, n))
+            del vectors
+        self._unsaved = n - snapshot_rows
+
+        for row in self.deleted:
+            try:
+                self.index.mark_deleted(row)
+            except RuntimeError:
+                pass  # already deleted in the snapshot
+        self.index.set_ef(self.ef_search)
+
+    def save(self):
+        """Snapshot the graph so reloading does not re-insert every row"""
+        with self._rw.write():
+            self._save()
+
+    def _save(self):
+        if self.index is None:
+            return
+        tmp_file = self._file("index.bin.tmp")
+        self.index.save_index(tmp_file)
+        os.replace(tmp_file, self._file("index.bin"))
+        tmp_file = self._file("snapshot.json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"rows": len(self.ids)}, f)
+        os.replace(tmp_file, self._file("snapshot.json"))
+        self._unsaved = 0
+
+    def close(self):
+        if self._unsaved:
+            self.save()
+
+    # ==================== VectorDBInterface ====================
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+    def _reserve(self, count: int, dim: int):
+        """Create or grow the graph (exclusive) so count more rows fit"""
+        with self._rw.write():
+            if self.index is None:
+                self.dim = dim
+                self._capacity = max(1024, 2 * count)
+                self.index = hnswlib.Index(space="cosine", dim=dim)
+                self.index.init_index(max_elements=self._capacity, ef_construction=self.ef_construction,
+                                      M=self.M, random_seed=self.seed)
+                self.index.set_ef(self.ef_search)
+                self._write_current()
+            self._pending += count
+            self._grow()
+
+    def _grow(self):
+        """Resize the graph for the current and reserved rows; caller holds the write lock"""
+        needed = len(self.ids) + self._pending
+        if needed > self._capacity:
+            self._capacity = max(needed, 2 * self._capacity)
+            self.index.resize_index(self._capacity)
+
+    def add_documents(self, texts: List[str], embeddings: List[List[float]],
+                     metadata: List[Dict], ids: List[str]):
+        if not ids:
+            return
+        vectors = self._normalize(embeddings)
+        self._reserve(len(ids), int(vectors.shape[1]))
+
+        with self._rw.read():
+            with self._lock:
+                self._pending -= len(ids)
+                # Re-adding an id replaces it
+                replaced = [self.row_of[row_id] for row_id in ids if row_id in self.row_of]
+                self._append_tombstones(replaced)
+
+                first = len(self.ids)
+                with open(self._file("vectors.f32"), "ab") as f:
+                    f.write(np.ascontiguousarray(vectors).tobytes())
+                with open(self._file("rows.jsonl"), "ab") as f:
+                    offset = f.tell()
+                    for row_id, text, meta in zip(ids, texts, metadata):
+                        line = (json.dumps({"id": row_id, "text": text, "metadata": meta}) + "\n").encode("utf-8")
+                        f.write(line)
+                        self.row_of[row_id] = len(self.ids)
+                        self.ids.append(row_id)
+                        self.metadata.append(meta)
+                        self.offsets.append(offset)
+                        offset += len(line)
+                self._unsaved += len(ids)
+
+            self.index.add_items(vectors, np.arange(first, first + len(ids)))
+            for row in replaced:
+                self.index.mark_deleted(row)
+
+        if self._unsaved >= self.snapshot_every:
+            self.save()
+
+    def _append_tombstones(self, rows: List[int]):
+        if not rows:
+            return
+        with open(self._file("tombstones"), "a") as f:
+            f.writelines(f"{row}\n" for row in rows)
+        self.deleted.update(rows)
+
+    def _texts(self, rows: List[int]) -> List[str]:
+        if not rows:
+            # The log does not exist until the first insert has been appended
+            return []
+        with open(self._file("rows.jsonl"), "rb") as f:
+            texts = []
+            for row in rows:
+                f.seek(self.offsets[row])
+                texts.append(json.loads(f.readline())["text"])
+            return texts
+
+    def set_ef_search(self, ef_search: int):
+        with self._rw.write():
+            self.ef_search = ef_search
+            if self.index is not None:
+                self.index.set_ef(ef_search)
+
+    def search(self, query_embedding: List[float], top_k: int,
+               filter: Optional[Dict] = None) -> List[Dict]:
+        with self._rw.read():
+            if self.index is None:
+                return []
+            query = self._normalize(query_embedding)
+            # The filter is applied inside the graph search, so ef bounds the work
+            allowed = (lambda row: matches_filter(self.metadata[row], filter)) if filter else None
+            k = min(top_k, len(self.row_of))
+            rows, distances = [], []
+            if k > 0:
+                try:
+                    labels, dists = self.index.knn_query(query, k=k, num_threads=1, filter=allowed)
+                    rows, distances = labels[0].tolist(), dists[0].tolist()
+                except RuntimeError:
+                    # Fewer than k rows pass the filter: score those few exactly
+                    rows, distances = self._exact_search(query, k, filter)
+
+            texts = self._texts(rows)
+            return [
+                {"id": self.ids[row], "text": text,
+                 "metadata": self.metadata[row], "score": 1.0 - dist}
+                for row, dist, text in zip(rows, distances, texts)
+            ]
+
+    def _exact_search(self, query: np.ndarray, k: int, filter: Optional[Dict]):
+        with self._lock:
+            rows = sorted(row for row in self.row_of.values() if matches_filter(self.metadata[row], filter))
+        if not rows:
+            return [], []
+        vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r",
+                            shape=(max(rows) + 1, self.dim))
+        distances = 1.0 - vectors[rows] @ query
+        order = np.argsort(distances)[:k]
+        return [rows[i] for i in order], distances[order].tolist()
+
+    def delete(self, ids: List[str]):
+        """Tombstone rows; they are dropped from the graph and disk by compact()"""
+        with self._rw.read():
+            with self._lock:
+                rows = [self.row_of.pop(row_id) for row_id in ids if row_id in self.row_of]
+                self._append_tombstones(rows)
+            for row in rows:
+                self.index.mark_deleted(row)
+
+    def delete_by_metadata(self, filter: Dict):
+        with self._lock:
+            ids = [row_id for row_id, row in self.row_of.items()
+                   if matches_filter(self.metadata[row], filter)]
+        self.delete(ids)
+
+    def list_ids(self) -> Iterator[str]:
+        with self._lock:
+            ids = list(self.row_of)
+        yield from ids
+
+    def compact(self) -> int:
+        """
+        Rebuild the graph and the log from live rows only. The new files are
+        written under the next generation and CURRENT is switched last, so a
+        crash leaves the previous generation intact.
+        """
+        with self._rw.write():
+            removed = len(self.ids) - len(self.row_of)
+            if not removed:
+                return 0
+            live = sorted(self.row_of.values())
+            previous = self.generation
+            vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r",
+                                shape=(len(self.ids), self.dim))[live]
+            texts = self._texts(live)
+            self.generation += 1
+
+            with open(self._file("vectors.f32"), "wb") as f:
+                f.write(np.ascontiguousarray(vectors).tobytes())
+            with open(self._file("rows.jsonl"), "wb") as f:
+                for row, text in zip(live, texts):
+                    f.write((json.dumps({"id": self.ids[row], "text": text,
+                                         "metadata": self.metadata[row]}) + "\n").encode("utf-8"))
+            self.index = hnswlib.Index(space="cosine", dim=self.dim)
+            self.index.init_index(max_elements=max(1024, 2 * len(live)), ef_construction=self.ef_construction,
+                                  M=self.M, random_seed=self.seed)
+            if live:
+                self.index.add_items(vectors, np.arange(len(live)))
+            self.index.save_index(self._file("index.bin"))
+            with open(self._file("snapshot.json"), "w") as f:
+                json.dump({"rows": len(live)}, f)
+            self._write_current()
+
+            for name in ("vectors.f32", "rows.jsonl", "tombstones", "index.bin", "snapshot.json"):
+                if os.path.exists(self._file(name, previous)):
+                    os.remove(self._file(name, previous))
+            # Inserts that reserved room before the rebuild still need it
+            pending = self._pending
+            self._load()
+            self._pending = pending
+            self._grow()
+            return removed
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self.row_of)
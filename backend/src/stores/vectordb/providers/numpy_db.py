@@ -0,0 +1,312 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+from typing import List, Dict, Optional, Iterable, Iterator
+from src.stores.vectordb.vectordb_interface import VectorDBInterface
+
+
+class _Partition:
+    """
+    Vectors of one conversation (or of the global documents).
+
+    On disk a partition is a raw float32 matrix (vectors.f32) that is only ever
+    appended to and read through np.memmap, a JSON line per row with its id,
+    text and metadata (rows.jsonl), and the row numbers deleted since the last
+    compaction (tombstones.rows). compact() writes the next generation of
+    these files and switches partition.json to it last.
+    """
+
+    def __init__(self, directory: str, key: str, dim: int):
+        self.directory = directory
+        self.key = key
+        self.dim = dim
+        self.manifest_path = os.path.join(directory, "partition.json")
+
+        os.makedirs(directory, exist_ok=True)
+        self.generation = 0
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.generation = json.load(f).get("generation", 0)
+        else:
+            self._write_manifest()
+        self._load()
+
+    def _paths(self, generation: int):
+        prefix = f"{generation}." if generation else ""
+        return tuple(os.path.join(self.directory, prefix + name)
+                     for name in ("vectors.f32", "rows.jsonl", "tombstones.rows"))
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"key": self.key, "generation": self.generation}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _load(self):
+        self.vectors_path, self.rows_path, self.tombstones_path = self._paths(self.generation)
+        self.ids: List[str] = []
+        self.metadata: List[Dict] = []
+        self.offsets: List[int] = []
+        if os.path.exists(self.rows_path):
+            with open(self.rows_path, "rb") as f:
+                offset = 0
+                for line in f:
+                    row = json.loads(line)
+                    self.ids.append(row["id"])
+                    self.metadata.append(row["metadata"])
+                    self.offsets.append(offset)
+                    offset += len(line)
+
+        # Rows written after the last complete vector (or vice versa) after a crash are dropped
+        vector_rows = os.path.getsize(self.vectors_path) // (4 * self.dim) \
+            if os.path.exists(self.vectors_path) else 0
+        n = min(len(self.ids), vector_rows)
+        if n < len(self.ids):
+            with open(self.rows_path, "r+b") as f:
+                f.truncate(self.offsets[n])
+            del self.ids[n:], self.metadata[n:], self.offsets[n:]
+        if os.path.exists(self.vectors_path):
+            os.truncate(self.vectors_path, n * 4 * self.dim)
+
+        self.alive = np.ones(n, dtype=bool)
+        if os.path.exists(self.tombstones_path):
+            with open(self.tombstones_path) as f:
+                for line in f:
+                    if line.strip() and int(line) < n:
+                        self.alive[int(line)] = False
+        # An id appears again when it was re-added; the newest live row wins
+        self.row_of = {row_id: row for row, row_id in enumerate(self.ids) if self.alive[row]}
+
+        self._map()
+
+    def _map(self):
+        n = len(self.ids)
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(n, self.dim)) \
+            if n else np.empty((0, self.dim), dtype=np.float32)
+
+    @property
+    def size(self) -> int:
+        return int(self.alive.sum())
+
+    def append(self, vectors: np.ndarray, ids: List[str], texts: List[str], metadata: List[Dict]):
+        # Re-adding an existing id replaces it
+        self.delete([row_id for row_id in ids if row_id in self.row_of])
+
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.rows_path, "ab") as f:
+            offset = f.tell()
+            for row_id, text, meta in zip(ids, texts, metadata):
+                line = (json.dumps({"id": row_id, "text": text, "metadata": meta}) + "\n").encode("utf-8")
+                f.write(line)
+                self.row_of[row_id] = len(self.ids)
+                self.ids.append(row_id)
+                self.metadata.append(meta)
+                self.offsets.append(offset)
+                offset += len(line)
+
+        self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+        self._map()
+
+    def delete(self, ids: Iterable[str]) -> int:
+        rows = [(row_id, self.row_of.pop(row_id)) for row_id in ids if row_id in self.row_of]
+        if not rows:
+            return 0
+        with open(self.tombstones_path, "a") as f:
+            for _, row in rows:
+                self.alive[row] = False
+                f.write(f"{row}\n")
+        return len(rows)
+
+    def texts(self, rows: List[int]) -> List[str]:
+        with open(self.rows_path, "rb") as f:
+            texts = []
+            for row in rows:
+                f.seek(self.offsets[row])
+                texts.append(json.loads(f.readline())["text"])
+            return texts
+
+    def search(self, query: np.ndarray, top_k: int, mask: Optional[np.ndarray] = None):
+        """Return (scores, rows) of the best top_k live rows"""
+        if not len(self.ids):
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        scores = self.vectors @ query
+        allowed = self.alive if mask is None else self.alive & mask
+        scores = np.where(allowed, scores, -np.inf)
+        k = min(top_k, int(allowed.sum()))
+        if k <= 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        rows = np.argpartition(-scores, k - 1)[:k]
+        rows = rows[np.argsort(-scores[rows])]
+        return scores[rows], rows
+
+    def compact(self) -> int:
+        """Rewrite the partition without deleted rows"""
+        removed = len(self.ids) - self.size
+        if not removed:
+            return 0
+        keep = np.flatnonzero(self.alive)
+        texts = self.texts(keep.tolist())
+        vectors = np.array(self.vectors[keep])
+        ids = [self.ids[row] for row in keep]
+        metadata = [self.metadata[row] for row in keep]
+
+        # The new generation only becomes current once it is fully written
+        previous = self._paths(self.generation)
+        vectors_path, rows_path, tombstones_path = self._paths(self.generation + 1)
+        for path in (vectors_path, rows_path, tombstones_path):
+            if os.path.exists(path):
+                os.remove(path)
+        with open(vectors_path, "wb") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(rows_path, "wb") as f:
+            for row_id, text, meta in zip(ids, texts, metadata):
+                f.write((json.dumps({"id": row_id, "text": text, "metadata": meta}) + "\n").encode("utf-8"))
+        self.generation += 1
+        self._write_manifest()
+
+        self.vectors = None
+        for path in previous:
+            if os.path.exists(path):
+                os.remove(path)
+        self._load()
+        return removed
+
+
+class NumpyDB(VectorDBInterface):
+    def __init__(self, path: str = "./numpy_index", metric: str = "cosine"):
+        """
+        In-process exact vector index. Vectors are partitioned by conversation_id,
+        kept as memory-mapped float32 matrices and scored with one matrix-vector
+        product plus argpartition per partition.
+        - metric: "cosine" (vectors are normalized on insert) or "dot"
+        """
+        if metric not in ("cosine", "dot"):
+            raise ValueError(f"Unknown metric: {metric}")
+        self.path = path
+        self.metric = metric
+        self.dim = None
+        self.partitions: Dict[str, _Partition] = {}
+        self._lock = threading.RLock()
+
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            self.dim, self.metric = manifest["dim"], manifest["metric"]
+            for name in sorted(os.listdir(path)):
+                partition_file = os.path.join(path, name, "partition.json")
+                if os.path.exists(partition_file):
+                    with open(partition_file) as f:
+                        key = json.load(f)["key"]
+                    self.partitions[key] = _Partition(os.path.join(path, name), key, self.dim)
+
+    def _partition(self, key: str) -> _Partition:
+        if key not in self.partitions:
+            name = "global" if key == "" else "conv_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+            self.partitions[key] = _Partition(os.path.join(self.path, name), key, self.dim)
+        return self.partitions[key]
+
+    def _prepare(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+            vectors = vectors / np.maximum(norms, 1e-12)
+        return vectors
+
+    def add_documents(self, texts: List[str], embeddings: List[List[float]],
+                     metadata: List[Dict], ids: List[str]):
+        if not ids:
+            return
+        vectors = self._prepare(embeddings)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(os.path.join(self.path, "manifest.json"), "w") as f:
+                    json.dump({"dim": self.dim, "metric": self.metric}, f)
+
+            groups: Dict[str, List[int]] = {}
+            for i, meta in enumerate(metadata):
+                groups.setdefault(meta.get("conversation_id") or "", []).append(i)
+            for key, rows in groups.items():
+                self._partition(key).append(
+                    vectors[rows],
+                    [ids[i] for i in rows],
+                    [texts[i] for i in rows],
+                    [metadata[i] for i in rows]
+                )
+
+    def _selected_partitions(self, filter: Optional[Dict]) -> List[_Partition]:
+        if not filter or "conversation_id" not in filter:
+            return list(self.partitions.values())
+        keys = filter["conversation_id"]
+        keys = keys if isinstance(keys, (list, tuple, set)) else [keys]
+        return [self.partitions[key or ""] for key in keys if (key or "") in self.partitions]
+
+    @staticmethod
+    def _mask(partition: _Partition, filter: Optional[Dict]) -> Optional[np.ndarray]:
+        """Row mask for filter fields other than the partition key"""
+        conditions = {field: value for field, value in (filter or {}).items() if field != "conversation_id"}
+        if not conditions:
+            return None
+        accepted = {
+            field: set(value) if isinstance(value, (list, tuple, set)) else {value}
+            for field, value in conditions.items()
+        }
+        return np.fromiter(
+            (all(meta.get(field) in values for field, values in accepted.items())
+             for meta in partition.metadata),
+            dtype=bool, count=len(partition.metadata)
+        )
+
+    def search(self, query_embedding: List[float], top_k: int,
+               filter: Optional[Dict] = None) -> List[Dict]:
+        with self._lock:
+            if self.dim is None:
+                return []
+            query = self._prepare(query_embedding)
+            candidates = []
+            for partition in self._selected_partitions(filter):
+                scores, rows = partition.search(query, top_k, self._mask(partition, filter))
+                candidates.extend((float(score), partition, int(row)) for score, row in zip(scores, rows))
+
+            candidates.sort(key=lambda candidate: -candidate[0])
+            results = []
+            for score, partition, row in candidates[:top_k]:
+                results.append({
+                    "id": partition.ids[row],
+                    "text": partition.texts([row])[0],
+                    "metadata": partition.metadata[row],
+                    "score": score
+                })
+            return results
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            for partition in self.partitions.values():
+                partition.delete(ids)
+
+    def delete_by_metadata(self, filter: Dict):
+        with self._lock:
+            for partition in self._selected_partitions(filter):
+                mask = self._mask(partition, filter)
+                rows = np.flatnonzero(partition.alive if mask is None else partition.alive & mask)
+                partition.delete([partition.ids[row] for row in rows])
+
+    def list_ids(self) -> Iterator[str]:
+        with self._lock:
+            ids = [partition.ids[row] for partition in self.partitions.values()
+                   for row in np.flatnonzero(partition.alive)]
+        yield from ids
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(partition.size for partition in self.partitions.values())
+
+    def compact(self) -> int:
+        """Drop deleted rows from disk; returns the number of rows removed"""
+        with self._lock:
+            return sum(partition.compact() for partition in self.partitions.values())
@@ -1,5 +1,5 @@
 from pinecone import Pinecone
-from typing import List, Dict
+from typing import List, Dict, Optional, Iterator
 from src.stores.vectordb.vectordb_interface import VectorDBInterface
 
 class PineconeDB(VectorDBInterface):
@@ -15,9 +15,47 @@ class PineconeDB(VectorDBInterface):
             vectors.append((id, emb, meta))
         self.index.upsert(vectors=vectors)
     
-    def search(self, query_embedding: List[float], top_k: int) -> List[Dict]:
-        results = self.index.query(vector=query_embedding, top_k=top_k, include_metadata=True)
+    @staticmethod
+    def _filter(filter: Optional[Dict]) -> Optional[Dict]:
+        """Translate a metadata filter into a Pinecone filter expression"""
+        if not filter:
+            return None
+        return {
+            field: {"$in": list(value)} if isinstance(value, (list, tuple, set)) else {"$eq": value}
+            for field, value in filter.items()
+        }
+
+    def search(self, query_embedding: List[float], top_k: int,
+               filter: Optional[Dict] = None) -> List[Dict]:
+        results = self.index.query(
+            vector=query_embedding,
+            top_k=top_k,
+            include_metadata=True,
+            filter=self._filter(filter)
+        )
         return [
-            {"text": match['metadata'].get('text', ''), "metadata": match['metadata']}
+            {"id": match['id'], "text": match['metadata'].get('text', ''),
+             "metadata": match['metadata'], "score": match.get('score')}
             for match in results['matches']
         ]
+
+    def delete(self, ids: List[str]):
+        for start in range(0, len(ids), 1000):
+            self.index.delete(ids=ids[start:start + 1000])
+
+    def delete_by_metadata(self, filter: Dict):
+        try:
+            self.index.delete(filter=self._filter(filter))
+        except Exception:
+            # Serverless indexes cannot delete by metadata; chunk ids are
+            # prefixed with their pdf_id, so PDF deletes can go through list()
+            if set(filter) != {"pdf_id"}:
+                raise
+            pdf_ids = filter["pdf_id"] if isinstance(filter["pdf_id"], (list, tuple, set)) else [filter["pdf_id"]]
+            for pdf_id in pdf_ids:
+                for ids in self.index.list(prefix=f"{pdf_id}_chunk_"):
+                    self.delete(list(ids))
+
+    def list_ids(self) -> Iterator[str]:
+        for ids in self.index.list():
+            yield from ids
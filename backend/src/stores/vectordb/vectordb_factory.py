@@ -1,12 +1,26 @@
 from src.stores.vectordb.vectordb_interface import VectorDBInterface
-from src.stores.vectordb.providers import PineconeDB , ChromaDB
+from src.core.config import settings
 
 class VectorDBFactory:
     @staticmethod
     def create(provider: str, **kwargs) -> VectorDBInterface:
+        # Only the selected provider module (and its SDK) is imported
         if provider == "chroma":
+            from src.stores.vectordb.providers.chroma_db import ChromaDB
             return ChromaDB(kwargs.get("collection_name", "rag_collection"))
         elif provider == "pinecone":
+            from src.stores.vectordb.providers.pinecone_db import PineconeDB
             return PineconeDB(kwargs.get("api_key"), kwargs.get("index_name", "rag-index"))
+        elif provider == "numpy":
+            from src.stores.vectordb.providers.numpy_db import NumpyDB
+            return NumpyDB(kwargs.get("path", "./numpy_index"), kwargs.get("metric", "cosine"))
+        elif provider == "hnsw":
+            from src.stores.vectordb.providers.hnsw_db import HNSWDB
+            return HNSWDB(
+                kwargs.get("path", "./hnsw_index"),
+                M=kwargs.get("M", settings.HNSW_M),
+                ef_construction=kwargs.get("ef_construction", settings.HNSW_EF_CONSTRUCTION),
+                ef_search=kwargs.get("ef_search", settings.HNSW_EF_SEARCH)
+            )
         else:
             raise ValueError(f"Unknown vector DB provider: {provider}")
@@ -1,5 +1,14 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Optional, Iterator
+
+def matches_filter(metadata: Dict, filter: Optional[Dict]) -> bool:
+    """Whether a document's metadata satisfies a search filter"""
+    for field, value in (filter or {}).items():
+        accepted = value if isinstance(value, (list, tuple, set)) else [value]
+        if metadata.get(field) not in accepted:
+            return False
+    return True
 
 class VectorDBInterface(ABC):
     @abstractmethod
@@ -8,5 +17,39 @@ class VectorDBInterface(ABC):
         pass
     
     @abstractmethod
-    def search(self, query_embedding: List[float], top_k: int) -> List[Dict]:
-        pass
\ No newline at end of file
+    def search(self, query_embedding: List[float], top_k: int,
+               filter: Optional[Dict] = None) -> List[Dict]:
+        """
+        Return the top_k closest documents. filter maps metadata fields to a
+        value, or to a list of accepted values; all fields must match.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        """Delete documents by id"""
+        pass
+
+    @abstractmethod
+    def delete_by_metadata(self, filter: Dict):
+        """Delete every document matching a metadata filter (same format as search)"""
+        pass
+
+    @abstractmethod
+    def list_ids(self) -> Iterator[str]:
+        """Iterate over the ids of all stored documents"""
+        pass
+
+    def compact(self) -> int:
+        """Reclaim space held by deleted documents; returns the number reclaimed if known"""
+        return 0
+
+    async def aadd_documents(self, texts: List[str], embeddings: List[List[float]], 
+                             metadata: List[Dict], ids: List[str]):
+        """Async upsert; blocking clients run in a worker thread"""
+        return await asyncio.to_thread(self.add_documents, texts, embeddings, metadata, ids)
+
+    async def asearch(self, query_embedding: List[float], top_k: int,
+                      filter: Optional[Dict] = None) -> List[Dict]:
+        """Async search; blocking clients run in a worker thread"""
+        return await asyncio.to_thread(self.search, query_embedding, top_k, filter)
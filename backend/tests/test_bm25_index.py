@@ -0,0 +1,125 @@
+import threading
+import pytest
+from src.stores.lexical.bm25_index import BM25Index, _Partition, tokenize
+
+
+def _add(index, ids, texts, conversation_id="conv"):
+    index.add_documents(texts, [{"conversation_id": conversation_id, "pdf_id": "pdf"} for _ in ids], ids)
+
+
+def test_tokenize_keeps_compound_tokens():
+    assert tokenize("Article 12.3 of R-32") == ["article", "12.3", "12", "3", "of", "r-32", "r", "32"]
+
+
+def test_reload_keeps_documents_deletes_and_replacements(tmp_path):
+    index = BM25Index(str(tmp_path))
+    _add(index, ["a", "b", "c"], ["brake fluid", "tyre pressure", "engine oil"])
+    _add(index, ["a"], ["coolant level"])
+    index.delete(["b"])
+
+    reloaded = BM25Index(str(tmp_path))
+    assert sorted(reloaded.list_ids()) == ["a", "c"]
+    assert reloaded.search("brake", 5) == []
+    assert reloaded.search("tyre", 5) == []
+    assert [r["text"] for r in reloaded.search("coolant", 5)] == ["coolant level"]
+
+
+def test_compact_survives_reload(tmp_path):
+    index = BM25Index(str(tmp_path))
+    _add(index, ["a", "b", "c"], ["brake fluid", "tyre pressure", "engine oil"])
+    _add(index, ["a"], ["coolant level"])
+    index.delete(["b"])
+    assert index.compact() == 2
+
+    reloaded = BM25Index(str(tmp_path))
+    assert sorted(reloaded.list_ids()) == ["a", "c"]
+    assert reloaded.search("oil", 5)[0]["id"] == "c"
+    assert reloaded.search("coolant", 5)[0]["text"] == "coolant level"
+
+
+def test_crash_during_compaction_keeps_previous_generation(tmp_path, monkeypatch):
+    index = BM25Index(str(tmp_path))
+    _add(index, ["a", "b", "c"], ["brake fluid", "tyre pressure", "engine oil"])
+    index.delete(["a"])
+
+    def crash(self):
+        raise OSError("crashed before switching generations")
+
+    monkeypatch.setattr(_Partition, "_write_manifest", crash)
+    with pytest.raises(OSError):
+        index.compact()
+    monkeypatch.undo()
+
+    reloaded = BM25Index(str(tmp_path))
+    assert sorted(reloaded.list_ids()) == ["b", "c"]
+    assert [r["text"] for r in reloaded.search("oil", 5)] == ["engine oil"]
+    assert reloaded.compact() == 1
+    assert sorted(BM25Index(str(tmp_path)).list_ids()) == ["b", "c"]
+
+
+def test_searches_during_compaction(tmp_path):
+    index = BM25Index(str(tmp_path))
+    _add(index, [f"doc{i}" for i in range(200)], [f"engine oil change {i}" for i in range(200)])
+    errors = []
+
+    def search():
+        try:
+            for _ in range(200):
+                for result in index.search("engine oil", 5):
+                    assert result["text"].startswith("engine oil change")
+        except Exception as e:
+            errors.append(e)
+
+    def churn():
+        for i in range(0, 200, 10):
+            index.delete([f"doc{i}"])
+            index.compact()
+
+    threads = [threading.Thread(target=search) for _ in range(4)] + [threading.Thread(target=churn)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert BM25Index(str(tmp_path)).count() == 180
+
+
+def test_filtered_search_stays_in_partition(tmp_path):
+    index = BM25Index(str(tmp_path))
+    _add(index, ["a"], ["brake fluid"], conversation_id="one")
+    _add(index, ["b"], ["brake pads"], conversation_id="two")
+    _add(index, ["g"], ["brake lights"], conversation_id="")
+
+    results = index.search("brake", 5, filter={"conversation_id": ["one", ""]})
+    assert sorted(r["id"] for r in results) == ["a", "g"]
+    index.delete_by_metadata({"conversation_id": "two", "pdf_id": "pdf"})
+    assert sorted(index.list_ids()) == ["a", "g"]
+
+
+def test_concurrent_adds_and_searches(tmp_path):
+    index = BM25Index(str(tmp_path))
+    errors = []
+
+    def add(part):
+        for start in range(part * 500, (part + 1) * 500, 50):
+            ids = [f"doc{i}" for i in range(start, start + 50)]
+            _add(index, ids, [f"engine oil change {i}" for i in range(start, start + 50)])
+
+    def search():
+        try:
+            for _ in range(100):
+                index.search("engine oil", 5)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=add, args=(part,)) for part in range(4)]
+    threads += [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert index.count() == 2000
+    assert BM25Index(str(tmp_path)).count() == 2000
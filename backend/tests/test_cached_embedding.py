@@ -0,0 +1,55 @@
+from src.stores.embedding.cached_embedding import CachedEmbedding
+
+
+class FakeEmbedding:
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_disk_tier_serves_a_new_process(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    CachedEmbedding(FakeEmbedding(), "fake", "model", disk_path=path).embed(["a", "bb"])
+
+    inner = FakeEmbedding()
+    cache = CachedEmbedding(inner, "fake", "model", disk_path=path)
+    assert cache.embed(["bb", "a", "ccc"]) == [[2.0, 1.0], [1.0, 1.0], [3.0, 1.0]]
+    assert inner.calls == [["ccc"]]
+    assert cache.stats()["disk_hits"] == 2
+
+
+def test_disk_tier_is_bounded_and_counts_rows(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = CachedEmbedding(FakeEmbedding(), "fake", "model", memory_size=1,
+                            disk_path=path, disk_size=5)
+    for i in range(8):
+        cache.embed([f"text {i}", f"text {i}"])
+    # Storing a row that is already on disk does not count it twice
+    cache._disk_put([(cache._key("text 7"), [6.0, 1.0])])
+
+    (rows,) = cache._disk.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+    assert rows == cache.stats()["disk_entries"] <= 5
+    assert CachedEmbedding(FakeEmbedding(), "fake", "model", disk_path=path,
+                           disk_size=5).stats()["disk_entries"] == rows
+
+
+def test_processes_sharing_the_disk_tier_stay_bounded(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    caches = [CachedEmbedding(FakeEmbedding(), "fake", "model", memory_size=1,
+                              disk_path=path, disk_size=20) for _ in range(3)]
+    for i in range(30):
+        for n, cache in enumerate(caches):
+            cache.embed([f"text {n} {i}"])
+
+    (rows,) = caches[0]._disk.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+    # Each cache may add up to a tenth of the capacity before it recounts
+    assert rows <= 20 + 2 * 2
+
+
+def test_missing_embedding_raises_attribute_error():
+    cache = CachedEmbedding.__new__(CachedEmbedding)
+    assert not hasattr(cache, "embedding")
+    assert not hasattr(cache, "get_dimension")
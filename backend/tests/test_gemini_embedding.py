@@ -0,0 +1,122 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from google.api_core import exceptions as google_exceptions
+from src.stores.embedding.providers import gemini_embedding
+from src.stores.embedding.providers.gemini_embedding import GeminiEmbedding, _AdaptiveLimiter
+
+
+class FakeEmbedContent:
+    """Stands in for genai.embed_content: one vector per text, [index], from "text {index}" """
+
+    def __init__(self, fail_first: int = 0, error=None, delay: float = 0.0):
+        self.fail_first = fail_first
+        self.error = error or google_exceptions.ResourceExhausted("quota exceeded")
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, model, content, task_type):
+        with self._lock:
+            self.calls.append(list(content))
+            if len(self.calls) <= self.fail_first:
+                raise self.error
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            return {"embedding": [[float(text.split()[1])] for text in content]}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(gemini_embedding, "time", SimpleNamespace(sleep=sleeps.append))
+    return sleeps
+
+
+def _texts(n):
+    return [f"text {i}" for i in range(n)]
+
+
+def test_batches_keep_input_order():
+    fake = FakeEmbedContent(delay=0.01)
+    embedding = GeminiEmbedding(None, batch_size=3, max_concurrency=4, embed_fn=fake)
+
+    assert embedding.embed(_texts(20)) == [[float(i)] for i in range(20)]
+    assert sorted(len(batch) for batch in fake.calls) == [2] + [3] * 6
+    assert 1 < fake.max_in_flight <= 4
+
+
+def test_quota_errors_back_off_and_retry(sleeps):
+    fake = FakeEmbedContent(fail_first=2)
+    embedding = GeminiEmbedding(None, batch_size=10, max_concurrency=4, embed_fn=fake)
+
+    assert embedding.embed(_texts(5)) == [[float(i)] for i in range(5)]
+    assert len(fake.calls) == 3
+    assert len(sleeps) == 2
+    assert 0.5 <= sleeps[0] <= 1.5 and 1.0 <= sleeps[1] <= 3.0
+    # Halved twice, then one success grows it back by 1 / limit
+    assert embedding._limiter.limit == pytest.approx(2.0)
+
+
+def test_gives_up_after_max_retries(sleeps):
+    fake = FakeEmbedContent(fail_first=10)
+    embedding = GeminiEmbedding(None, max_retries=2, embed_fn=fake)
+
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        embedding.embed(_texts(2))
+    assert len(fake.calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_other_errors_are_not_retried(sleeps):
+    fake = FakeEmbedContent(fail_first=1, error=ValueError("bad request"))
+    embedding = GeminiEmbedding(None, embed_fn=fake)
+
+    with pytest.raises(ValueError):
+        embedding.embed(_texts(2))
+    assert len(fake.calls) == 1
+    assert sleeps == []
+
+
+def test_limiter_bounds_requests_in_flight():
+    limiter = _AdaptiveLimiter(max_concurrency=2)
+    limiter.on_throttled()
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def request():
+        with limiter:
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 1
+
+
+def test_limiter_shrinks_and_recovers():
+    limiter = _AdaptiveLimiter(max_concurrency=8)
+    for _ in range(5):
+        limiter.on_throttled()
+    assert limiter.limit == 1.0
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.limit == 8
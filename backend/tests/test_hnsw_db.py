@@ -0,0 +1,104 @@
+import threading
+import numpy as np
+from src.stores.vectordb.providers.hnsw_db import HNSWDB
+
+
+def _vectors(n, dim=32, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def _add(db, vectors, start=0, conversation=lambda i: "a"):
+    n = len(vectors)
+    db.add_documents(
+        [f"text {i}" for i in range(start, start + n)],
+        vectors,
+        [{"conversation_id": conversation(i)} for i in range(start, start + n)],
+        [f"id{i}" for i in range(start, start + n)]
+    )
+
+
+def test_rows_survive_reload_without_snapshot(tmp_path):
+    vectors = _vectors(300)
+    _add(HNSWDB(str(tmp_path)), vectors)
+
+    reloaded = HNSWDB(str(tmp_path))
+    assert reloaded.count() == 300
+    best = reloaded.search(vectors[42], 1)[0]
+    assert best["id"] == "id42"
+    assert best["text"] == "text 42"
+
+
+def test_reload_replays_rows_added_after_snapshot(tmp_path):
+    vectors = _vectors(500)
+    db = HNSWDB(str(tmp_path), snapshot_every=200)
+    _add(db, vectors[:250])
+    _add(db, vectors[250:], start=250)
+
+    reloaded = HNSWDB(str(tmp_path))
+    assert reloaded.count() == 500
+    assert reloaded.search(vectors[499], 1)[0]["id"] == "id499"
+
+
+def test_deletes_and_replacements_survive_reload(tmp_path):
+    vectors = _vectors(100)
+    db = HNSWDB(str(tmp_path))
+    _add(db, vectors)
+    db.delete(["id1"])
+    db.add_documents(["replaced"], -vectors[2:3], [{"conversation_id": "a"}], ["id2"])
+
+    reloaded = HNSWDB(str(tmp_path))
+    assert reloaded.count() == 99
+    assert "id1" not in set(reloaded.list_ids())
+    assert reloaded.search(-vectors[2], 1)[0]["text"] == "replaced"
+
+
+def test_compact_keeps_live_rows_across_reload(tmp_path):
+    vectors = _vectors(100)
+    db = HNSWDB(str(tmp_path))
+    _add(db, vectors)
+    db.delete([f"id{i}" for i in range(0, 100, 2)])
+    assert db.compact() == 50
+    db.close()
+
+    reloaded = HNSWDB(str(tmp_path))
+    assert reloaded.count() == 50
+    assert reloaded.search(vectors[51], 1)[0]["id"] == "id51"
+
+
+def test_filtered_search_returns_every_match_when_fewer_than_top_k(tmp_path):
+    vectors = _vectors(300)
+    db = HNSWDB(str(tmp_path))
+    _add(db, vectors, conversation=lambda i: "b" if i % 3 == 0 else "a")
+
+    results = db.search(vectors[3], 500, {"conversation_id": "b"})
+    assert len(results) == 100
+    assert {r["metadata"]["conversation_id"] for r in results} == {"b"}
+    assert results[0]["id"] == "id3"
+
+
+def test_concurrent_inserts_and_searches(tmp_path):
+    vectors = _vectors(4000, dim=16)
+    db = HNSWDB(str(tmp_path), snapshot_every=1000)
+    errors = []
+
+    def insert(part):
+        for start in range(part * 1000, (part + 1) * 1000, 100):
+            _add(db, vectors[start:start + 100], start=start)
+
+    def search():
+        try:
+            for _ in range(200):
+                db.search(vectors[0], 5)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=insert, args=(part,)) for part in range(4)]
+    threads += [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert db.count() == 4000
+    assert HNSWDB(str(tmp_path)).count() == 4000
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from src.repositories.ingestion_job_repository import IngestionJobRepository
+
+
+@pytest.fixture
+def repo():
+    return IngestionJobRepository(mongomock.MongoClient().db)
+
+
+def _expire(repo, job_id, seconds=600):
+    repo.collection.update_one({"job_id": job_id},
+                               {"$set": {"heartbeat_at": datetime.utcnow() - timedelta(seconds=seconds)}})
+
+
+def test_claim_leases_the_job_once(repo):
+    repo.create("job1", "pdf1", "a.pdf", "/tmp/a.pdf")
+    repo.claim("job1", "worker-a")
+    job = repo.find_by_id("job1")
+    assert job["status"] == repo.RUNNING and job["worker_id"] == "worker-a" and job["attempts"] == 1
+    assert repo.claim("job1", "worker-b") is None
+
+
+def test_only_expired_leases_are_requeued(repo):
+    for job_id in ("live", "expired"):
+        repo.create(job_id, "pdf", "a.pdf", "/tmp/a.pdf")
+        repo.claim(job_id, "worker-a")
+    _expire(repo, "live")
+    _expire(repo, "expired")
+    repo.collection.update_one({"job_id": "live"}, {"$set": {"worker_id": "worker-b"}})
+    assert repo.heartbeat("worker-b") == 1
+
+    assert repo.requeue_expired(lease_seconds=120) == 1
+    assert repo.find_by_id("live")["status"] == repo.RUNNING
+    expired = repo.find_by_id("expired")
+    assert expired["status"] == repo.QUEUED and expired["worker_id"] is None
+    assert [job["job_id"] for job in repo.find_queued()] == ["expired"]
+
+
+def test_jobs_out_of_attempts_fail_instead_of_requeueing(repo):
+    repo.create("poison", "pdf", "a.pdf", "/tmp/a.pdf")
+    for _ in range(3):
+        repo.claim("poison", "worker-a")
+        _expire(repo, "poison")
+        if repo.fail_interrupted(max_attempts=3, lease_seconds=120):
+            break
+        repo.requeue_expired(lease_seconds=120)
+
+    job = repo.find_by_id("poison")
+    assert job["status"] == repo.FAILED and job["attempts"] == 3
+    assert repo.requeue_expired(lease_seconds=120) == 0
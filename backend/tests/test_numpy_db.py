@@ -0,0 +1,49 @@
+import os
+import numpy as np
+from src.stores.vectordb.providers.numpy_db import NumpyDB
+
+
+def _vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def _add(db, vectors, ids, texts=None, conversation_id="conv"):
+    db.add_documents(texts or [f"text {i}" for i in ids], vectors,
+                     [{"conversation_id": conversation_id} for _ in ids], ids)
+
+
+def test_readded_id_survives_reload(tmp_path):
+    vectors = _vectors(3)
+    db = NumpyDB(str(tmp_path))
+    _add(db, vectors[:2], ["a", "b"])
+    _add(db, vectors[2:], ["a"], texts=["new a"])
+
+    reloaded = NumpyDB(str(tmp_path))
+    assert reloaded.count() == 2
+    assert reloaded.search(vectors[2], 1)[0]["text"] == "new a"
+    assert all(r["text"] != "text a" for r in reloaded.search(vectors[0], 2))
+
+
+def test_compact_keeps_latest_rows_across_reload(tmp_path):
+    vectors = _vectors(4)
+    db = NumpyDB(str(tmp_path))
+    _add(db, vectors[:3], ["a", "b", "c"])
+    _add(db, vectors[3:], ["a"], texts=["new a"])
+    db.delete(["b"])
+    assert db.compact() == 2
+
+    reloaded = NumpyDB(str(tmp_path))
+    assert sorted(reloaded.list_ids()) == ["a", "c"]
+    assert reloaded.search(vectors[3], 1)[0]["text"] == "new a"
+    partition_dir = next(entry.path for entry in os.scandir(tmp_path) if entry.is_dir())
+    assert sorted(os.listdir(partition_dir)) == ["1.rows.jsonl", "1.vectors.f32", "partition.json"]
+
+
+def test_filtered_search_stays_in_partition(tmp_path):
+    vectors = _vectors(6)
+    db = NumpyDB(str(tmp_path))
+    _add(db, vectors[:3], ["a", "b", "c"], conversation_id="one")
+    _add(db, vectors[3:], ["d", "e", "f"], conversation_id="two")
+
+    results = db.search(vectors[0], 5, {"conversation_id": "two"})
+    assert {r["id"] for r in results} == {"d", "e", "f"}
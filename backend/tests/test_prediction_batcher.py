@@ -0,0 +1,103 @@
+import threading
+import time
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+from src.services.prediction_batcher import PredictionBatcher
+
+
+class FakeModel:
+    """predict_many that doubles each row and records the batches it saw"""
+
+    def __init__(self, delay: float = 0.0, bad_rows=()):
+        self.delay = delay
+        self.bad_rows = set(bad_rows)
+        self.batches = []
+
+    def __call__(self, rows):
+        self.batches.append(list(rows))
+        time.sleep(self.delay)
+        if self.bad_rows & set(rows):
+            raise ValueError("bad row")
+        return [row * 2 for row in rows]
+
+
+def _predict_concurrently(batcher, rows):
+    results, errors = {}, {}
+
+    def predict(row):
+        try:
+            results[row] = batcher.predict(row)
+        except Exception as e:
+            errors[row] = e
+
+    threads = [threading.Thread(target=predict, args=(row,)) for row in rows]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_rows_share_batches():
+    model = FakeModel(delay=0.02)
+    batcher = PredictionBatcher(model, max_batch_size=8, max_wait_ms=20)
+
+    results, errors = _predict_concurrently(batcher, range(40))
+    batcher.shutdown()
+
+    assert not errors
+    assert results == {row: row * 2 for row in range(40)}
+    assert all(len(batch) <= 8 for batch in model.batches)
+    stats = batcher.stats()
+    assert stats["rows"] == 40
+    assert stats["batches"] == len(model.batches) < 40
+    assert stats["avg_batch_size"] == 40 / stats["batches"]
+
+
+def test_failing_row_only_fails_its_own_request():
+    model = FakeModel(bad_rows={3})
+    batcher = PredictionBatcher(model, max_batch_size=16, max_wait_ms=50)
+
+    results, errors = _predict_concurrently(batcher, range(8))
+    batcher.shutdown()
+
+    assert list(errors) == [3] and isinstance(errors[3], ValueError)
+    assert results == {row: row * 2 for row in range(8) if row != 3}
+    assert batcher.stats()["failed_batches"] >= 1
+
+
+def test_full_queue_is_rejected():
+    release = threading.Event()
+
+    def blocked(rows):
+        release.wait()
+        return rows
+
+    batcher = PredictionBatcher(blocked, max_batch_size=1, max_wait_ms=0, max_queue_size=2)
+    first = batcher.submit(0)
+    while batcher.stats()["queue_depth"]:
+        time.sleep(0.001)  # the worker is now blocked on the first row
+    queued = [batcher.submit(1), batcher.submit(2)]
+
+    with pytest.raises(HTTPException) as raised:
+        batcher.submit(3)
+    assert raised.value.status_code == 503
+    assert batcher.stats()["rejected"] == 1
+
+    release.set()
+    assert [future.result() for future in [first, *queued]] == [0, 1, 2]
+    batcher.shutdown()
+
+
+def test_shutdown_scores_queued_rows():
+    model = FakeModel()
+    batcher = PredictionBatcher(model, max_batch_size=64, max_wait_ms=1000)
+    futures = [batcher.submit(row) for row in range(5)]
+    batcher.shutdown()
+
+    assert [future.result() for future in futures] == [0, 2, 4, 6, 8]
+    with pytest.raises(RuntimeError):
+        batcher.submit(5)
@@ -0,0 +1,27 @@
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from bson import ObjectId
+from src.repositories.prediction_repository import PredictionRepository
+
+
+def test_retried_rows_are_saved_once():
+    repo = PredictionRepository(mongomock.MongoClient().db)
+    request_ids = [ObjectId() for _ in range(3)]
+    rows = [{"age": age} for age in (30, 40, 50)]
+
+    # A failed batch had already saved its first row before the retry
+    repo.save_predictions(rows[:1], ["Insomnia"], request_ids[:1])
+    saved = repo.save_predictions(rows, ["Insomnia", "None", "Sleep Apnea"], request_ids)
+
+    assert [doc["_id"] for doc in saved] == [str(request_id) for request_id in request_ids]
+    assert repo.collection.count_documents({}) == 3
+    assert sorted(doc["age"] for doc in repo.get_all_predictions()) == [30, 40, 50]
+
+
+def test_rows_without_request_ids_get_new_ids():
+    repo = PredictionRepository(mongomock.MongoClient().db)
+    repo.save_predictions([{"age": 30}], ["None"])
+    repo.save_predictions([{"age": 30}], ["None"])
+    assert repo.collection.count_documents({}) == 2